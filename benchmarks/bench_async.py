@@ -0,0 +1,101 @@
+# bench_async.py Cycle time with blocking show() vs show_async().
+# Each cycle "fetches and renders" for a fixed time, then sends the frame.
+# With show_async() that work overlaps the previous panel refresh.
+# Also checks a refresh left running when asyncio.run() returns is finished
+# by the next show_async() in a later loop, and that show_partial() then
+# sends one full frame and goes back to partial refreshes.
+
+# Run from the repository root: python -m benchmarks.bench_async [cycles]
+
+import asyncio
+import sys
+import time
+
+import sim
+
+sim.install()
+
+from machine import Pin, SPI
+from sim.ssd1680 import SSD1680
+from driver.epd29_ssd1680 import EPD
+from display.frame_buffer_wrapper import FrameBufferWrapper
+
+WORK_MS = 1500  # Simulated network fetch and render time per cycle
+
+
+def make_display(full_refresh_every=1):
+    spi = SPI(1, baudrate=4000000)
+    dc = Pin(17, Pin.OUT)
+    panel = SSD1680(spi, dc)
+    epd = EPD(spi, Pin(5, Pin.OUT), dc, Pin(16, Pin.OUT), panel.busy)
+    return FrameBufferWrapper(epd, full_refresh_every), panel
+
+
+def draw(fb, cycle):
+    fb.fill(0)
+    fb.fill_rect(10 + cycle * 7, 10, 20, 20, 1)
+
+
+def check_ram(fb, panel):
+    fb.epd._prepare_frame()
+    if panel.frame(0x24) != fb.epd._obuf:
+        raise AssertionError("Controller RAM out of step with framebuffer")
+
+
+def blocking(cycles):
+    fb, panel = make_display()
+    start = time.ticks_ms()
+    for cycle in range(cycles):
+        time.sleep_ms(WORK_MS)
+        draw(fb, cycle)
+        fb.show()
+    check_ram(fb, panel)
+    return time.ticks_diff(time.ticks_ms(), start)
+
+
+async def pipelined(cycles):
+    fb, panel = make_display()
+    start = time.ticks_ms()
+    for cycle in range(cycles):
+        await asyncio.sleep_ms(WORK_MS)
+        draw(fb, cycle)
+        await fb.show_async()
+    await fb.epd.complete.wait()
+    check_ram(fb, panel)
+    return time.ticks_diff(time.ticks_ms(), start)
+
+
+def check_loop_exit():
+    fb, panel = make_display(full_refresh_every=12)
+    epd = fb.epd
+    draw(fb, 0)
+    epd.show()
+    for cycle in (1, 2):  # Each asyncio.run() ends mid refresh
+        draw(fb, cycle)
+        if not asyncio.run(epd.show_async([(0, 0, 60, 40)])):
+            raise AssertionError("show_async() did not refresh partially")
+    # The last refresh was never finished: one full frame, then partial again
+    draw(fb, 3)
+    if epd.show_partial([(0, 0, 60, 40)]):
+        raise AssertionError("show_partial() used the stale old image RAM")
+    draw(fb, 4)
+    if not epd.show_partial([(0, 0, 60, 40)]):
+        raise AssertionError("show_partial() fell back to a full refresh")
+    if not epd.ready():
+        raise AssertionError("Panel still reported busy")
+    check_ram(fb, panel)
+    if panel.frame(0x26) != panel.frame(0x24):
+        raise AssertionError("Old image RAM not updated after the refresh")
+    print("Refresh across event loops: ok")
+
+
+def main(cycles=10):
+    check_loop_exit()
+    t_sync = blocking(cycles)
+    t_async = asyncio.run(pipelined(cycles))
+    print("show()       {:6d} ms/cycle".format(t_sync // cycles))
+    print("show_async() {:6d} ms/cycle".format(t_async // cycles))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
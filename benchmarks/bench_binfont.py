@@ -0,0 +1,138 @@
+# bench_binfont.py Python-module fonts against the binary font container.
+# Checks that every glyph and the rendered dashboard strings are identical,
+# that a warm glyph cache needs no further glyph reads, then compares load
+# time and resident heap. Module loading is timed from
+# source (compile + exec), as on a board without precompiled .mpy files.
+# The binary figure excludes the file object, whose 4 KiB read buffer is a
+# CPython artefact.
+
+# Run from the repository root: python -m benchmarks.bench_binfont [rounds]
+
+import sys
+import time
+import tracemalloc
+
+import sim
+
+sim.install()
+
+import framebuf
+from display.bin_font import BinFont
+from display.writer import GlyphCache, Writer
+from tools.font_to_bin import convert
+
+FONTS = ("freesans14", "freesans17", "freesans20")
+WIDTH = 296
+HEIGHT = 128
+
+STRINGS = (
+    "12:05",
+    "Thu 16 Oct",
+    "Kyiv 21`C",
+    "Hum:48% Rain:0.0mm",
+    "Site Views:",
+    "1.2k",
+    "DNS Queries: 15.3k",
+    "Blocked Ads: 2.1k",
+    "\xb0 € \x7f unsupported",
+)
+
+
+def load_module(name):
+    path = "fonts/{}.py".format(name)
+    with open(path) as f:
+        src = f.read()
+    namespace = {"__name__": name}
+    exec(compile(src, path, "exec"), namespace)
+    return namespace
+
+
+class Module:  # Attribute access to an exec'd namespace
+    def __init__(self, namespace):
+        self.__dict__.update(namespace)
+
+
+def render(font, text):
+    fb = framebuf.FrameBuffer(
+        bytearray(WIDTH * HEIGHT // 8), WIDTH, HEIGHT, framebuf.MONO_VLSB
+    )
+    fb.width = WIDTH
+    fb.height = HEIGHT
+    wri = Writer(fb, font, verbose=False)
+    wri.set_textpos(0, 0)
+    wri.printstring(text)
+    return bytes(fb._fb_buf)
+
+
+def check(name, module, binfont):
+    with open("fonts/{}.bin".format(name), "rb") as f:
+        if f.read() != convert(module):
+            raise AssertionError(
+                "{}.bin is stale, rerun tools.font_to_bin".format(name)
+            )
+    for fn in ("height", "max_width", "hmap", "reverse", "monospaced"):
+        if getattr(module, fn)() != getattr(binfont, fn)():
+            raise AssertionError("{}: {}() differs".format(name, fn))
+    for code in range(0, 300):
+        a = module.get_ch(chr(code))
+        b = binfont.get_ch(chr(code))
+        if bytes(a[0]) != bytes(b[0]) or a[1:] != b[1:]:
+            raise AssertionError("{}: glyph {} differs".format(name, code))
+    for text in STRINGS:
+        if render(module, text) != render(binfont, text):
+            raise AssertionError("{}: {!r} renders differently".format(name, text))
+
+
+def measure(load, rounds):
+    t = time.perf_counter()
+    for _ in range(rounds):
+        load()
+    elapsed = (time.perf_counter() - t) / rounds
+    tracemalloc.start()
+    obj = load()
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, resident, obj
+
+
+def main(rounds=20):
+    Writer.glyph_cache = GlyphCache()
+    for name in FONTS:
+        module = Module(load_module(name))
+        binfont = BinFont("fonts/{}.bin".format(name))
+        check(name, module, binfont)
+        binfont.close()
+    print("Glyphs and rendered strings identical for {}".format(", ".join(FONTS)))
+
+    for name in FONTS:
+        path = "fonts/{}.bin".format(name)
+        _, mem_file, f = measure(lambda: open(path, "rb"), 1)
+        f.close()
+        t_mod, mem_mod, _ = measure(lambda: load_module(name), rounds)
+        t_bin, mem_bin, font = measure(lambda: BinFont(path), rounds)
+        mem_bin -= mem_file
+        for text in STRINGS:
+            render(font, text)
+        # Once the glyph cache holds them, glyphs are not read again
+        reads = font.reads
+        run_cache, Writer.run_cache = Writer.run_cache, None
+        for text in STRINGS:
+            render(font, text)
+        Writer.run_cache = run_cache
+        if font.reads != reads:
+            raise AssertionError(
+                "{}: {} glyph reads with a warm glyph cache".format(
+                    name, font.reads - reads
+                )
+            )
+        print(
+            "{}: module {:6.2f} ms {:6d} B resident | binary {:6.2f} ms {:5d} B resident, "
+            "{} glyph reads for the dashboard strings".format(
+                name, t_mod * 1000, mem_mod, t_bin * 1000, mem_bin, font.reads
+            )
+        )
+        font.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,89 @@
+# bench_busy.py Latency from the BUSY falling edge to the driver noticing it.
+# A stand-in BUSY pin is scripted to fall after a random delay; latency runs
+# from the virtual time the pin actually fell to the wait returning. Compares
+# the 100ms polling loop with the pin interrupt backend, blocking and asyncio.
+
+# Run from the repository root: python -m benchmarks.bench_busy [trials]
+
+import asyncio
+import random
+import sys
+
+import sim
+
+sim.install()
+
+from machine import Pin, SPI
+from driver.epd29_ssd1680 import EPD
+from sim import mptime
+
+
+def make_epd(busy_irq):
+    busy = Pin(4, Pin.IN)
+    epd = EPD(
+        SPI(1),
+        Pin(5, Pin.OUT),
+        Pin(17, Pin.OUT),
+        Pin(16, Pin.OUT),
+        busy,
+        busy_irq=busy_irq,
+    )
+    return epd, busy
+
+
+def latency_ms(epd, busy, wait):
+    busy.value(1)
+    delay = random.randint(200, 3000)
+    # Timers run once the clock has passed them, so take the edge's time from
+    # the schedule rather than from inside the callback.
+    fell = mptime.now_us() + delay * 1000
+    busy.schedule(delay, 0)
+    wait(epd)
+    done = mptime.now_us()
+    if done < fell or busy.value():
+        raise AssertionError("Wait returned while BUSY was still high")
+    return (done - fell) / 1000
+
+
+def run(name, busy_irq, wait, trials):
+    epd, busy = make_epd(busy_irq)
+    lat = sorted(latency_ms(epd, busy, wait) for _ in range(trials))
+    print(
+        "{:14s} latency min {:6.1f} ms  median {:6.1f} ms  max {:6.1f} ms".format(
+            name, lat[0], lat[len(lat) // 2], lat[-1]
+        )
+    )
+
+
+def blocking(epd):
+    epd.wait_until_ready()
+
+
+def in_asyncio(epd):
+    asyncio.run(epd.wait_until_ready_async())
+
+
+# The refresh events fire around a show() with the interrupt backend.
+def check_events():
+    from sim.ssd1680 import SSD1680
+
+    spi = SPI(1)
+    dc = Pin(17, Pin.OUT)
+    panel = SSD1680(spi, dc)
+    epd = EPD(spi, Pin(5, Pin.OUT), dc, Pin(16, Pin.OUT), panel.busy)
+    epd.show()
+    if not (epd.updated.is_set() and epd.complete.is_set()):
+        raise AssertionError("updated/complete events not set by show()")
+    print("show(): updated and complete set, refresh {} ms".format(epd.refresh_ms))
+
+
+def main(trials=50):
+    run("poll blocking", False, blocking, trials)
+    run("irq blocking", True, blocking, trials)
+    run("poll asyncio", False, in_asyncio, trials)
+    run("irq asyncio", True, in_asyncio, trials)
+    check_events()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,161 @@
+# bench_cache.py Weather and website requests over simulated hours of
+# dashboard cycles (both due every CYCLE_S seconds) on the virtual clock,
+# with and without the HTTPClient response cache, against the local HTTP
+# server in sim/servers.py. Upstream, the weather changes every 10 minutes
+# and is served with Cache-Control: max-age=600 and Last-Modified; the
+# website views change every 30 minutes and carry only an ETag. Reports
+# requests, 304s, cache hits, body bytes received and bodies parsed.
+# Also checks the widgets always show the latest upstream values, that
+# no-store and no-cache are honoured and that a 304 without Cache-Control
+# keeps the stored max-age.
+
+# Run from the repository root: python -m benchmarks.bench_cache [hours]
+
+import asyncio
+import contextlib
+import io
+import json
+import sys
+
+import sim
+
+sim.install()
+
+from sim import config
+
+sys.modules.setdefault("config", config)
+
+from sim import mptime
+from sim.servers import HTTPServer
+from widgets.http_client import HTTPClient, Response, ResponseCache, max_age
+from widgets.weather import WeatherAPI
+from widgets.website_views import WebsiteStats
+
+CYCLE_S = 300  # main.Dashboard.DISPLAY_UPDATE_INTERVAL
+WEATHER_S = 600  # How often the weather changes upstream
+VIEWS_S = 1800  # How often the view count changes upstream
+START = (2025, 10, 16, 6, 0, 0)
+
+
+def weather_body(version):
+    return json.dumps(
+        {
+            "coord": {"lon": 30.5167, "lat": 50.4333},
+            "weather": [
+                {"id": 500, "main": "Rain", "description": "light rain", "icon": "10d"}
+            ],
+            "main": {
+                "temp": 10 + version % 7,
+                "feels_like": 9.4,
+                "pressure": 1013,
+                "humidity": 81,
+            },
+            "wind": {"speed": 3.1, "deg": 310},
+            "sys": {"country": "UA", "sunrise": 1760588163, "sunset": 1760626874},
+            "name": "Kyiv",
+        }
+    ).encode()
+
+
+def views_body(version):
+    return json.dumps(
+        {"pages": [{"path": "/", "count": 1000 + version}], "total": 1400 + version}
+    ).encode()
+
+
+class Upstream:
+    def __init__(self):
+        self.bytes = 0  # Body bytes sent; the server turns matches into 304s
+        self.httpd = HTTPServer()
+        self.httpd.route("GET", "http://api.openweathermap.org/", handler=self.weather)
+        self.httpd.route("GET", "http://stats.example.com/", handler=self.views)
+
+    def weather(self, method, url, headers, body):
+        version = mptime.mp_time() // WEATHER_S
+        modified = "v{}".format(version)  # Compared verbatim, like a date
+        body = weather_body(version)
+        if headers.get("If-Modified-Since") != modified:
+            self.bytes += len(body)
+        return 200, {"Cache-Control": "max-age=600", "Last-Modified": modified}, body
+
+    def views(self, method, url, headers, body):
+        version = mptime.mp_time() // VIEWS_S
+        body = views_body(version)
+        etag = '"{}"'.format(version)
+        if headers.get("If-None-Match") != etag:
+            self.bytes += len(body)
+        return 200, {"ETag": etag}, body
+
+
+async def cycle(weather, website, http):
+    await asyncio.gather(weather.update_weather_async(), website.update_views_async())
+    await http.close()
+
+
+def run(name, entries, hours):
+    mptime.set_wall(START)
+    upstream = Upstream()
+    http = HTTPClient(cache_entries=entries)
+    http.lookup = upstream.httpd.lookup
+    weather = WeatherAPI("key", "703448", update_interval=CYCLE_S - 1, http=http)
+    website = WebsiteStats(
+        "http://stats.example.com/api/views", update_interval=CYCLE_S - 1, http=http
+    )
+    requests = hits = not_modified = misses = 0
+    for _ in range(hours * 3600 // CYCLE_S):
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(cycle(weather, website, http))
+        requests += http.requests
+        hits += http.cache.hits
+        not_modified += http.cache.not_modified
+        misses += http.cache.misses
+        http.reset_stats()
+        now = mptime.mp_time()
+        if weather.get_temperature() != 10 + (now // WEATHER_S) % 7:
+            raise AssertionError("Stale weather shown")
+        if website.get_root_views() != 1000 + now // VIEWS_S:
+            raise AssertionError("Stale views shown")
+        mptime.advance_us(CYCLE_S * 1000000)
+    upstream.httpd.close()
+    # Without the cache every request is a miss
+    parsed = misses if entries else requests
+    print(
+        "{:10s} {:4d} requests {:4d} 304s {:4d} hits {:7d} body bytes {:4d} bodies parsed".format(
+            name, requests, not_modified, hits, upstream.bytes, parsed
+        )
+    )
+
+
+def check_directives():
+    if max_age("no-store, max-age=60") is not None:
+        raise AssertionError("no-store response would be kept")
+    if max_age("no-cache") != 0 or max_age("public, max-age=600", "100") != 500:
+        raise AssertionError("max-age misread")
+    print("Cache-Control directives read correctly")
+
+
+def check_revalidated():
+    cache = ResponseCache()
+    url = "http://example.com/stats"
+    headers = {"Cache-Control": "max-age=600", "ETag": '"v1"'}
+    cache.store(url, None, Response(200, headers, b"{}"))
+    entry = cache.lookup(url, None)
+    cache.revalidated(entry, {"ETag": '"v2"'})
+    if entry.fresh_ms != 600000 or entry.etag != '"v2"':
+        raise AssertionError("304 without Cache-Control changed the stored max-age")
+    cache.revalidated(entry, {"Cache-Control": "max-age=60"})
+    if entry.fresh_ms != 60000:
+        raise AssertionError("304 Cache-Control not applied")
+    print("304 headers update only what they carry")
+
+
+def main(hours=6):
+    mptime.install_wall_clock()
+    run("no cache", 0, hours)
+    run("cache", 4, hours)
+    check_directives()
+    check_revalidated()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
@@ -0,0 +1,157 @@
+# bench_fetch.py Time to update all widgets one after another (as the old
+# blocking update_data() did) and gathered concurrently, against the local
+# HTTP and NTP servers in sim/servers.py with per-endpoint delays. Checks the
+# widgets parsed the expected values, and that one endpoint slower than the
+# request timeout only costs the timeout while the others still update.
+
+# Run from the repository root: python -m benchmarks.bench_fetch
+
+import asyncio
+import contextlib
+import io
+import sys
+import time
+
+import sim
+
+sim.install()
+
+from sim import config
+
+sys.modules.setdefault("config", config)
+
+from sim.servers import HTTPServer, NTPServer
+from widgets.clock import Clock
+from widgets.http_client import HTTPClient
+from widgets.pihole_stats import PiholeStats
+from widgets.weather import WeatherAPI
+from widgets.website_views import WebsiteStats
+
+NTP_MS = 150
+WEATHER_MS = 400
+PIHOLE_MS = (300, 200, 100)  # Auth, summary, logout
+WEBSITE_MS = 500
+
+
+def make_server(website_ms):
+    httpd = HTTPServer()
+    weather = {
+        "name": "Kyiv",
+        "sys": {"country": "UA"},
+        "main": {"temp": 14.6, "humidity": 81},
+        "rain": {"1h": 0.4},
+    }
+    httpd.route(
+        "GET",
+        "http://api.openweathermap.org/",
+        [{"json": weather, "delay_ms": WEATHER_MS}],
+    )
+    auth = {
+        "session": {"valid": True, "sid": "sid1", "csrf": "csrf1", "validity": 1800}
+    }
+    httpd.route(
+        "POST",
+        "http://192.168.1.2/api/auth",
+        [{"json": auth, "delay_ms": PIHOLE_MS[0]}],
+    )
+    summary = {"queries": {"total": 15300, "blocked": 2100}, "gravity": {}}
+    httpd.route(
+        "GET",
+        "http://192.168.1.2/api/stats/summary",
+        [{"json": summary, "delay_ms": PIHOLE_MS[1]}],
+    )
+    httpd.route(
+        "POST",
+        "http://192.168.1.2/api/logout",
+        [{"status": 204, "delay_ms": PIHOLE_MS[2]}],
+    )
+    views = {"pages": [{"path": "/", "count": 1234}]}
+    httpd.route(
+        "GET", "http://stats.example.com/", [{"json": views, "delay_ms": website_ms}]
+    )
+    return httpd
+
+
+def make_widgets(httpd, ntpd, max_concurrent, timeout):
+    http = HTTPClient(max_concurrent=max_concurrent, timeout=timeout)
+    http.lookup = httpd.lookup
+    clock = Clock(timezone_offset=3)
+    ntpd.attach(clock.ntp_client)
+    return (
+        clock,
+        WeatherAPI("key", "703448", http=http),
+        PiholeStats("192.168.1.2", password="pw", http=http),
+        WebsiteStats("http://stats.example.com/api/views", http=http),
+    )
+
+
+def updates(widgets):
+    clock, weather, pihole, website = widgets
+    return (
+        clock.update_time_async(),
+        weather.update_weather_async(),
+        pihole.update_stats_async(),
+        website.update_views_async(),
+    )
+
+
+async def sequential(widgets):
+    return [await update for update in updates(widgets)]
+
+
+async def concurrent(widgets):
+    return await asyncio.gather(*updates(widgets))
+
+
+def run(name, gather, max_concurrent=4, timeout=10, website_ms=WEBSITE_MS):
+    httpd = make_server(website_ms)
+    ntpd = NTPServer(time.time, NTP_MS)
+    widgets = make_widgets(httpd, ntpd, max_concurrent, timeout)
+    t = time.perf_counter()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        results = asyncio.run((concurrent if gather else sequential)(widgets))
+    elapsed = (time.perf_counter() - t) * 1000
+    httpd.close()
+    ntpd.close()
+    print(
+        "{:26s} {:6.0f} ms  {} requests  results {}".format(
+            name, elapsed, len(httpd.log), results
+        )
+    )
+    return elapsed, widgets, results
+
+
+def check(widgets, website=True):
+    _, weather, pihole, site = widgets
+    if weather.get_formatted_display()[0] != "Kyiv,UA 15`C":
+        raise AssertionError(
+            "Weather not parsed: {}".format(weather.get_formatted_display())
+        )
+    if (pihole.get_queries_total(), pihole.get_queries_blocked()) != (15300, 2100):
+        raise AssertionError("Pi-hole stats not parsed")
+    if website and site.get_root_views() != 1234:
+        raise AssertionError("Website views not parsed")
+
+
+def main():
+    serial, widgets, _ = run("sequential", False)
+    check(widgets)
+    for cap in (1, 2, 4):
+        elapsed, widgets, _ = run("gathered, {} at once".format(cap), True, cap)
+        check(widgets)
+    print(
+        "Gathered with 4 at once: {:.1f}x faster than sequential".format(
+            serial / elapsed
+        )
+    )
+
+    # The website answers after 3 s, the request timeout is 1 s.
+    elapsed, widgets, results = run("slow website, 1 s timeout", True, 4, 1, 3000)
+    check(widgets, website=False)
+    if results[3] is not False or elapsed > 1500:
+        raise AssertionError("Slow endpoint was not cut off by the timeout")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# bench_glyphs.py Render the four dashboard sections repeatedly and report
+# glyph cache hit/miss counts and time per frame, with and without the cache.
+# The word run cache is disabled here (see bench_runs.py).
+
+# Run from the repository root: python -m benchmarks.bench_glyphs [frames]
+
+import sys
+import time
+
+import sim
+
+sim.install()
+
+import framebuf
+from display.writer import GlyphCache, Writer
+from fonts import freesans14, freesans17, freesans20
+
+WIDTH = 296
+HEIGHT = 128
+
+# Representative values for each section, as produced by the widgets.
+TIMES = ("12:05", "12:10", "12:15", "12:20")
+SECTIONS = (
+    # (font, row, left column of section, section width, text)
+    (freesans20, 10, 0, WIDTH // 2, None),  # Time
+    (freesans14, 35, 0, WIDTH // 2, "Sun May 4"),
+    (freesans20, 10, WIDTH // 2, WIDTH // 2, "Kyiv,UA 21`C"),
+    (freesans14, 35, WIDTH // 2, WIDTH // 2, "Hum:48% Rain:0.0mm"),
+    (freesans20, 74, 0, WIDTH // 2, "Site Views:"),
+    (freesans17, 99, 0, WIDTH // 2, "1.2k"),
+    (freesans17, 74, WIDTH // 2, WIDTH // 2, "DNS Queries: 15.3k"),
+    (freesans17, 99, WIDTH // 2, WIDTH // 2, "Blocked Ads: 2.1k"),
+)
+
+
+# Same steps as the Dashboard.render_*_section methods: centre then print.
+def render_frame(fb, frame):
+    fb.fill(0)
+    for font, row, col, width, text in SECTIONS:
+        if text is None:
+            text = TIMES[frame % len(TIMES)]
+        wri = Writer(fb, font, verbose=False)
+        x = col + (width - wri.stringlen(text)) // 2
+        wri.set_textpos(row, x)
+        wri.printstring(text)
+
+
+def run(name, cache, frames):
+    Writer.glyph_cache = cache
+    Writer.run_cache = None  # Per-glyph path only, see bench_runs
+    fb = framebuf.FrameBuffer(
+        bytearray(WIDTH * HEIGHT // 8), WIDTH, HEIGHT, framebuf.MONO_VLSB
+    )
+    fb.width = WIDTH
+    fb.height = HEIGHT
+    t = time.perf_counter()
+    for frame in range(frames):
+        render_frame(fb, frame)
+    elapsed = (time.perf_counter() - t) / frames
+    print("{:9s} {:7.2f} ms/frame  {}".format(name, elapsed * 1000, cache.stats()))
+    return bytes(fb._fb_buf)
+
+
+def main(frames=1000):
+    uncached = run("no cache", GlyphCache(0), frames)
+    cached = run("cache", GlyphCache(), frames)
+    if uncached != cached:
+        raise AssertionError("Cached rendering differs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,173 @@
+# bench_icons.py Decode speed and size of run-length compressed icons.
+# Draws synthetic weather icons (sun, cloud, rain, snow, mist) at two sizes,
+# encodes them with tools/png_to_icons.py and decodes them into a frame
+# buffer laid out like the display's. Compares against blitting the raw
+# bitmap from RAM and checks both give the same pixels.
+
+# Run from the repository root: python -m benchmarks.bench_icons [rounds]
+
+import os
+import sys
+import tempfile
+import time
+
+import sim
+
+sim.install()
+
+import framebuf
+from display.icons import IconSet, draw_rle
+from tools.png_to_icons import build
+
+WIDTH = 296
+HEIGHT = 128
+
+
+def disc(rows, cx, cy, r):
+    for y in range(len(rows)):
+        for x in range(len(rows[0])):
+            if (x - cx) ** 2 + (y - cy) ** 2 <= r * r:
+                rows[y][x] = 1
+
+
+def cloud(rows, s):
+    disc(rows, s * 0.35, s * 0.55, s * 0.2)
+    disc(rows, s * 0.55, s * 0.45, s * 0.25)
+    disc(rows, s * 0.75, s * 0.6, s * 0.16)
+    for y in range(int(s * 0.6), int(s * 0.76)):
+        for x in range(int(s * 0.35), int(s * 0.75)):
+            rows[y][x] = 1
+
+
+def synthetic(size):
+    s = size
+    icons = {}
+
+    def blank():
+        return [[0] * s for _ in range(s)]
+
+    sun = blank()
+    disc(sun, s / 2, s / 2, s * 0.25)
+    for k in range(s):  # Rays along the diagonals and axes
+        for x, y in ((k, k), (s - 1 - k, k), (s // 2, k), (k, s // 2)):
+            if abs(k - s / 2) > s * 0.32:
+                sun[y][x] = 1
+    icons["01d"] = sun
+
+    moon = blank()
+    disc(moon, s / 2, s / 2, s * 0.3)
+    for y in range(s):
+        for x in range(s):
+            if (x - s * 0.62) ** 2 + (y - s * 0.4) ** 2 <= (s * 0.26) ** 2:
+                moon[y][x] = 0
+    icons["01n"] = moon
+
+    clouds = blank()
+    cloud(clouds, s)
+    icons["04d"] = clouds
+
+    rain = blank()
+    cloud(rain, s)
+    for x0 in (0.35, 0.5, 0.65):
+        for k in range(int(s * 0.12)):
+            rain[int(s * 0.8) + k][int(s * x0) - k // 2] = 1
+    icons["10d"] = rain
+
+    snow = blank()
+    cloud(snow, s)
+    for x0 in (0.35, 0.55, 0.75):
+        disc(snow, s * x0, s * 0.88, s * 0.04)
+    icons["13d"] = snow
+
+    mist = blank()
+    for y0 in (0.3, 0.45, 0.6, 0.75):
+        for y in range(int(s * y0), int(s * y0) + max(1, s // 16)):
+            for x in range(int(s * 0.15), int(s * 0.85)):
+                mist[y][x] = 1
+    icons["50d"] = mist
+    return {code: (s, s, rows) for code, rows in icons.items()}
+
+
+def raw_bitmap(rows, size):
+    stride = (size + 7) // 8
+    buf = bytearray(stride * size)
+    for y, row in enumerate(rows):
+        for x, bit in enumerate(row):
+            if bit:
+                buf[y * stride + x // 8] |= 0x80 >> (x % 8)
+    return framebuf.FrameBuffer(buf, size, size, framebuf.MONO_HLSB), len(buf)
+
+
+def target():
+    fb = framebuf.FrameBuffer(
+        bytearray(WIDTH * HEIGHT // 8), WIDTH, HEIGHT, framebuf.MONO_VLSB
+    )
+    return fb
+
+
+class CountingTarget(framebuf.FrameBuffer):
+    hlines = 0
+
+    def hline(self, x, y, w, c):
+        CountingTarget.hlines += 1
+        super().hline(x, y, w, c)
+
+
+def main(rounds=50):
+    tmp = tempfile.mkdtemp()
+    for size in (32, 48):
+        icons = synthetic(size)
+        path = os.path.join(tmp, "icons{}.bin".format(size))
+        with open(path, "wb") as f:
+            f.write(build(icons))
+        iconset = IconSet(path)
+        raws = {code: raw_bitmap(rows, size) for code, (_, _, rows) in icons.items()}
+
+        # Same pixels either way
+        for code in icons:
+            a = target()
+            iconset.draw(a, code, 200, 40)
+            b = target()
+            b.blit(raws[code][0], 200, 40)
+            if bytes(a._fb_buf) != bytes(b._fb_buf):
+                raise AssertionError("{} decodes differently".format(code))
+        if not iconset.draw(target(), "10n", 0, 0):
+            raise AssertionError("Night icon did not fall back to day art")
+
+        data = {code: iconset.get(code) for code in icons}
+        fb = CountingTarget(
+            bytearray(WIDTH * HEIGHT // 8), WIDTH, HEIGHT, framebuf.MONO_VLSB
+        )
+        CountingTarget.hlines = 0
+        t = time.perf_counter()
+        for _ in range(rounds):
+            for code in icons:
+                draw_rle(fb, data[code], 200, 40, size)
+        t_rle = (time.perf_counter() - t) / (rounds * len(icons))
+        hlines = CountingTarget.hlines / (rounds * len(icons))
+
+        t = time.perf_counter()
+        for _ in range(rounds):
+            for code in icons:
+                fb.blit(raws[code][0], 200, 40)
+        t_raw = (time.perf_counter() - t) / (rounds * len(icons))
+
+        rle_bytes = sum(len(d) for d in data.values())
+        raw_bytes = sum(n for _, n in raws.values())
+        print(
+            "{0}x{0}: RLE {1:5d} B ({2:4.0%} of raw {3:5d} B), decode {4:6.3f} ms/icon "
+            "({5:4.1f} hlines) | raw blit {6:6.3f} ms/icon".format(
+                size,
+                rle_bytes,
+                rle_bytes / raw_bytes,
+                raw_bytes,
+                t_rle * 1000,
+                hlines,
+                t_raw * 1000,
+            )
+        )
+        iconset.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
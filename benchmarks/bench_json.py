@@ -0,0 +1,108 @@
+# bench_json.py Peak heap of reading an API response the old way (the body,
+# its text and ujson.loads() of it, all held at once) against streaming it
+# through json_stream.Extractor in HTTPClient.CHUNK byte pieces, for the
+# recorded responses in sim/fixtures/dashboard.json and one synthetic large
+# document. Peaks come from gc.mem_alloc() with the collector disabled; on
+# CPython that is tracemalloc's high-water mark, on MicroPython (which does
+# not reuse memory until a collection) it is everything allocated, so the
+# streaming figure there grows with the number of chunks.
+# Also checks the extracted values match ujson.loads() for any chunk size.
+
+# Run from the repository root: python -m benchmarks.bench_json
+
+import gc
+
+import sim
+
+sim.install()
+
+import ujson
+
+from widgets.http_client import HTTPClient
+from widgets.json_stream import extract
+from widgets.pihole_stats import PiholeStats
+from widgets.weather import WeatherAPI
+
+FIXTURES = "sim/fixtures/dashboard.json"
+
+FIELDS = {
+    "weather": WeatherAPI.FIELDS,
+    "auth": PiholeStats.AUTH_FIELDS,
+    "summary": PiholeStats.STATS_FIELDS,
+}
+
+
+def allocated(func):
+    gc.collect()
+    gc.disable()
+    try:
+        a = gc.mem_alloc()
+        func()
+        return gc.mem_alloc() - a
+    finally:
+        gc.enable()
+
+
+def lookup(doc, path):
+    for key in path:
+        if isinstance(key, int):
+            if not isinstance(doc, list) or key >= len(doc):
+                return None
+        elif not isinstance(doc, dict) or key not in doc:
+            return None
+        doc = doc[key]
+    return doc
+
+
+def check(body, paths):
+    doc = ujson.loads(body)
+    want = {}
+    for path in paths:
+        value = lookup(doc, path)
+        if value is not None and not isinstance(value, (dict, list)):
+            want[path] = value
+    for chunk in (1, 7, HTTPClient.CHUNK):
+        got = extract(body, paths, chunk)
+        if got != want:
+            raise AssertionError("Chunks of {}: {} != {}".format(chunk, got, want))
+
+
+def documents():
+    with open(FIXTURES) as f:
+        fixtures = ujson.load(f)
+    for route in fixtures["routes"]:
+        name = route["url"].rstrip("/").split("/")[-1]
+        if name in FIELDS:
+            for n, spec in enumerate(route["responses"]):
+                yield "{} {}".format(name, n), ujson.dumps(
+                    spec["json"]
+                ).encode(), FIELDS[name]
+    # A forecast sized response: the wanted fields then 40 entries to skip
+    doc = ujson.loads(ujson.dumps(fixtures["routes"][0]["responses"][0]["json"]))
+    doc["list"] = [
+        {"dt": 1760612400 + 10800 * n, "main": doc["main"], "weather": doc["weather"]}
+        for n in range(40)
+    ]
+    yield "weather, 40 forecasts", ujson.dumps(doc).encode(), FIELDS["weather"]
+
+
+def main():
+    print(
+        "{:24s} {:>6s} {:>12s} {:>12s}".format(
+            "response", "bytes", "loads peak", "stream peak"
+        )
+    )
+    total_loads = total_stream = 0
+    for name, body, paths in documents():
+        check(body, paths)
+        # bytearray() stands for the body buffer the old code read
+        loads = allocated(lambda: ujson.loads(bytearray(body).decode()))
+        stream = allocated(lambda: extract(body, paths, HTTPClient.CHUNK))
+        total_loads += loads
+        total_stream += stream
+        print("{:24s} {:6d} {:12d} {:12d}".format(name, len(body), loads, stream))
+    print("Streaming peak is {:.0f}% of loads".format(100 * total_stream / total_loads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# bench_keepalive.py TCP handshakes and DNS lookups per update cycle with and
+# without keep-alive, against the local HTTP server in sim/servers.py. Two
+# cycles are run as Dashboard does them: all widgets gathered, then the
+# pool closed (Wi-Fi goes off between cycles). The widgets are made afresh
+# each cycle, so the Pi-hole logs in and fetches its summary every time.
+# Also checks chunked bodies are decoded and that a pooled connection the
+# server has closed is replaced transparently.
+
+# Run from the repository root: python -m benchmarks.bench_keepalive
+
+import asyncio
+import contextlib
+import io
+import sys
+import time
+
+import sim
+
+sim.install()
+
+from sim import config
+
+sys.modules.setdefault("config", config)
+
+from sim.servers import HTTPServer, NTPServer
+from benchmarks.bench_fetch import check, make_server, make_widgets, updates
+from widgets.http_client import HTTPClient
+
+CYCLES = 2
+
+
+async def cycle(widgets, http):
+    results = await asyncio.gather(*updates(widgets))
+    await http.close()
+    return results
+
+
+def run(name, keep_alive):
+    httpd = make_server(0)
+    ntpd = NTPServer(time.time)
+    print(name)
+    http = None
+    for n in range(CYCLES):
+        # Fresh widgets so every update is due, one client as in Dashboard
+        widgets = make_widgets(httpd, ntpd, 4, 10)
+        if http is None:
+            http = widgets[1].http
+            http.keep_alive = keep_alive
+        for w in widgets[1:]:
+            w.http = http
+        http.reset_stats()
+        before = httpd.connections
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            results = asyncio.run(cycle(widgets, http))
+        if not all(results):
+            raise AssertionError("Update failed: {}".format(log.getvalue()))
+        check(widgets)
+        print(
+            "  cycle {}: {} (server saw {} connections)".format(
+                n, http.stats(), httpd.connections - before
+            )
+        )
+    httpd.close()
+    ntpd.close()
+
+
+async def fetch_twice(http, url, pause):
+    first = await http.get(url)
+    await asyncio.sleep(pause)
+    second = await http.get(url)
+    return first, second
+
+
+def check_chunked():
+    httpd = HTTPServer()
+    body = {"pages": [{"path": "/", "count": n} for n in range(50)]}
+    httpd.route("GET", "http://stats.example.com/", [{"json": body, "chunked": True}])
+    http = HTTPClient()
+    http.lookup = httpd.lookup
+    first, second = asyncio.run(fetch_twice(http, "http://stats.example.com/api", 0))
+    httpd.close()
+    if first.json() != body or second.json() != body:
+        raise AssertionError("Chunked body decoded wrongly")
+    if http.connects != 1:
+        raise AssertionError("Chunked response did not keep the connection")
+    print(
+        "Chunked body of {} bytes decoded, connection reused".format(len(first.content))
+    )
+
+
+def check_stale():
+    httpd = HTTPServer(idle_timeout=0.2)  # Drops idle connections after 0.2 s
+    httpd.route("GET", "http://stats.example.com/", [{"json": {"/": 1}}])
+    http = HTTPClient()
+    http.lookup = httpd.lookup
+    first, second = asyncio.run(fetch_twice(http, "http://stats.example.com/api", 0.5))
+    httpd.close()
+    if second.json() != {"/": 1} or http.connects != 2:
+        raise AssertionError("Stale connection not replaced")
+    print("Connection closed by the server while idle was replaced")
+
+
+def main():
+    run("Connection: close", False)
+    run("Keep-alive", True)
+    check_chunked()
+    check_stale()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# bench_layout.py Dashboard rendering: redraw everything and diff the frame
+# against the layout engine, which redraws and reports only changed slots.
+# The clock changes every cycle, the other widgets now and then. Checks that
+# the layout frame always matches a full redraw, that the panel RAM holds it
+# after each refresh and no copy of the previous frame is kept, and that a
+# string too wide for its region (which the Writer would wrap) leaves nothing
+# behind once a short one replaces it.
+
+# Run from the repository root: python -m benchmarks.bench_layout [cycles]
+
+import sys
+import time
+
+import sim
+
+sim.install()
+
+from machine import Pin, SPI
+from sim.ssd1680 import SSD1680
+from driver.epd29_ssd1680 import EPD
+from display.frame_buffer_wrapper import FrameBufferWrapper
+from display.layout import Layout, Region
+from display.writer import Writer
+from fonts import freesans14, freesans17, freesans20
+
+
+# EPaperDisplay without config.py: frame buffer and Writer registry only.
+class Display:
+    def __init__(self):
+        spi = SPI(1, baudrate=4000000)
+        dc = Pin(17, Pin.OUT)
+        self.panel = SSD1680(spi, dc)
+        self.epd = EPD(spi, Pin(5, Pin.OUT), dc, Pin(16, Pin.OUT), self.panel.busy)
+        self.fb = FrameBufferWrapper(self.epd)
+        self.width = self.fb.width
+        self.height = self.fb.height
+        self._writers = {}
+
+    def writer(self, font):
+        wri = self._writers.get(font)
+        if wri is None:
+            wri = Writer(self.fb, font, verbose=False)
+            self._writers[font] = wri
+        return wri
+
+
+class Widgets:
+    def __init__(self):
+        self.cycle = 0
+
+    def time(self):
+        minutes = 12 * 60 + 5 * self.cycle
+        return "{:02d}:{:02d}".format(minutes // 60 % 24, minutes % 60), "Thu 16 Oct"
+
+    def weather(self):
+        return "Kyiv {}`C".format(14 + self.cycle // 6 % 3), "Hum:48% Rain:0mm"
+
+    def website(self):
+        return "Site Views:", "{}".format(1200 + self.cycle // 4)
+
+    def pihole(self):
+        return "DNS: 15.3k", "Ads: {:.1f}k".format(2.1 + self.cycle // 12 / 10)
+
+
+def make_layout(display, widgets):
+    w, h = display.width, display.height
+    layout = Layout(display)
+    layout.section(
+        Region(0, 0, w // 2, h // 2), widgets.time, ((freesans20, 10), (freesans14, 35))
+    )
+    layout.section(
+        Region(w // 2, 0, w - w // 2, h // 2),
+        widgets.weather,
+        ((freesans20, 10), (freesans14, 35)),
+    )
+    layout.section(
+        Region(0, h // 2, w // 2, h - h // 2),
+        widgets.website,
+        ((freesans20, 10), (freesans17, 35)),
+    )
+    layout.section(
+        Region(w // 2, h // 2, w - w // 2, h - h // 2),
+        widgets.pihole,
+        ((freesans17, 10), (freesans17, 35)),
+    )
+    return layout
+
+
+# Count measurements made through any Writer.
+class Counter:
+    calls = 0
+
+    def __init__(self):
+        orig = Writer.stringlen
+
+        def stringlen(wri, string, oh=False):
+            Counter.calls += 1
+            return orig(wri, string, oh)
+
+        Writer.stringlen = stringlen
+
+
+def run(name, incremental, cycles):
+    display = Display()
+    widgets = Widgets()
+    layout = make_layout(display, widgets)
+    reference = make_layout(Display(), widgets)  # Always redrawn in full
+    fb = display.fb
+    Counter.calls = 0
+    render_s = 0
+    total_bytes = 0
+    total_ms = 0
+    for cycle in range(cycles):
+        widgets.cycle = cycle
+        t = time.perf_counter()
+        if not incremental:
+            layout.invalidate()
+        rects = layout.update()
+        if incremental:
+            fb.show(rects=rects, full=rects is None)
+        else:
+            fb.show()
+        layout.sent()
+        render_s += time.perf_counter() - t
+        total_bytes += fb.stats.transfer_bytes
+        total_ms += fb.stats.refresh_ms
+
+        calls = Counter.calls
+        reference.invalidate()
+        reference.update()
+        Counter.calls = calls
+        if fb.buffer != reference.fb.buffer:
+            raise AssertionError(
+                "Cycle {}: frame differs from full redraw".format(cycle)
+            )
+        epd = display.epd
+        epd._prepare_frame()
+        if display.panel.frame(0x24) != epd._obuf:
+            raise AssertionError("Cycle {}: controller RAM out of step".format(cycle))
+    if incremental and fb.prev is not None:
+        raise AssertionError("Previous frame kept although the layout passed its rects")
+    print(
+        "{:8s} {:7.2f} ms render+diff {:5.1f} measures {:6.0f} bytes {:5.0f} ms/cycle  ({})".format(
+            name,
+            render_s * 1000 / cycles,
+            Counter.calls / cycles,
+            total_bytes / cycles,
+            total_ms / cycles,
+            fb.stats,
+        )
+    )
+
+
+# A city name too wide for the top right region, then a short one: the
+# frame must match a full redraw and every rectangle stay in the region.
+def check_wrap():
+    texts = ["Dnipropetrovsk,UA 15`C", "Kyiv,UA 15`C"]
+    display = Display()
+    w, h = display.width, display.height
+    region = Region(w // 2, 0, w - w // 2, h // 2)
+    current = texts[0]
+    layout = Layout(display)
+    layout.section(
+        region,
+        lambda: (current, "Hum:48% Rain:0mm"),
+        ((freesans20, 10), (freesans14, 35)),
+    )
+    reference = Layout(Display())
+    reference.section(
+        region,
+        lambda: (current, "Hum:48% Rain:0mm"),
+        ((freesans20, 10), (freesans14, 35)),
+    )
+    fb = display.fb
+    for current in texts:
+        rects = layout.update()
+        for x, y, rw, rh in rects or ():
+            if (
+                x < region.x
+                or y < region.y
+                or x + rw > region.x + region.width
+                or y + rh > region.y + region.height
+            ):
+                raise AssertionError(
+                    "Rectangle {} outside region".format((x, y, rw, rh))
+                )
+        fb.show(rects=rects, full=rects is None)
+        layout.sent()
+        reference.invalidate()
+        reference.update()
+        if fb.buffer != reference.fb.buffer:
+            raise AssertionError("{!r}: frame differs from full redraw".format(current))
+        epd = display.epd
+        epd._prepare_frame()
+        if display.panel.frame(0x24) != epd._obuf:
+            raise AssertionError("{!r}: controller RAM out of step".format(current))
+    print("wrap     ok")
+
+
+def main(cycles=24):
+    Counter()
+    check_wrap()
+    run("redraw", False, cycles)
+    run("layout", True, cycles)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 24)
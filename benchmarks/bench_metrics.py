@@ -0,0 +1,127 @@
+# bench_metrics.py Cost of the metrics hooks: a timer block and a timed call
+# with metrics disabled and enabled, against the bare code, and the bytes a
+# cycle of recording allocates, for timer blocks and decorated calls apart.
+# CPython boxes tick counts above 256, so it reports some bytes per timer
+# block; MicroPython keeps them as small ints and the ring buffer and timers
+# are preallocated, so timer blocks allocate nothing there. Decorated calls
+# allocate their argument tuple either way. Decorating while disabled must
+# return the function itself.
+# Also checks the ring buffer keeps the last cycles in order.
+
+# Run from the repository root: python -m benchmarks.bench_metrics [calls]
+
+import gc
+import sys
+import time
+
+import sim
+
+sim.install()
+
+import metrics
+
+
+def work():
+    pass
+
+
+timed_work = work  # Decorated by main() once metrics are on or off
+
+
+def bare(calls):
+    for _ in range(calls):
+        work()
+
+
+def with_timer(calls):
+    for _ in range(calls):
+        with metrics.timer(metrics.RENDER):
+            work()
+
+
+def with_decorator(calls):
+    for _ in range(calls):
+        timed_work()
+
+
+def per_call_ns(func, calls):
+    t = time.perf_counter()
+    func(calls)
+    return (time.perf_counter() - t) * 1e9 / calls
+
+
+# One cycle's worth of recording, as main.Dashboard does it.
+def cycle():
+    for field in (metrics.WIFI, metrics.NTP, metrics.WEATHER, metrics.PARSE):
+        with metrics.timer(field):
+            work()
+    metrics.record(metrics.BUSY, 452000)
+    metrics.add(metrics.UPLOAD, -452000)
+    metrics.record(metrics.FREE_BEFORE, 80000)
+
+
+def decorated_calls():
+    for _ in range(4):
+        timed_work()
+
+
+def allocated(func):
+    gc.collect()
+    gc.disable()
+    try:
+        a = gc.mem_alloc()
+        func()
+        return gc.mem_alloc() - a
+    finally:
+        gc.enable()
+
+
+def check_ring(history):
+    metrics.enable(history)
+    for n in range(history + 3):
+        metrics.record(metrics.FREE_AFTER, n)
+        metrics.end_cycle()
+    for age in range(history):
+        row = metrics.last(age)
+        if row[metrics.FREE_AFTER] != history + 2 - age:
+            raise AssertionError("Ring buffer out of order at age {}".format(age))
+    if metrics.last(history) is not None:
+        raise AssertionError("Ring buffer returned more than its history")
+
+
+def main(calls=200000):
+    global timed_work
+    base = per_call_ns(bare, calls)
+    print("{:10s} {:7.1f} ns/call".format("bare", base))
+    for state in ("disabled", "enabled"):
+        if state == "enabled":
+            metrics.enable()
+        else:
+            metrics.disable()
+        timed_work = metrics.timed(metrics.RENDER)(work)
+        if state == "disabled" and timed_work is not work:
+            raise AssertionError("timed() wrapped a function while disabled")
+        for name, func in (("timer", with_timer), ("decorator", with_decorator)):
+            ns = per_call_ns(func, calls)
+            print(
+                "{:10s} {:7.1f} ns/call  (+{:.1f}) metrics {}".format(
+                    name, ns, ns - base, state
+                )
+            )
+    for name, func in (("timer blocks", cycle), ("decorated calls", decorated_calls)):
+        metrics.enable()
+        func()  # Warm up
+        enabled = allocated(func)
+        metrics.disable()
+        disabled = allocated(func)
+        print(
+            "Bytes allocated by a cycle's {}: {} ({} enabled, {} disabled)".format(
+                name, enabled - disabled, enabled, disabled
+            )
+        )
+    check_ring(metrics.HISTORY)
+    metrics.disable()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
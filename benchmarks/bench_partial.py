@@ -0,0 +1,58 @@
+# bench_partial.py Transfer size and refresh time of partial vs full refresh.
+# Simulates a clock-only change every other cycle against the SSD1680 model
+# (unchanged cycles are skipped) and checks that controller RAM always ends
+# up holding the full frame.
+
+# Run from the repository root: python -m benchmarks.bench_partial [cycles]
+
+import sys
+
+import sim
+
+sim.install()
+
+from machine import Pin, SPI
+from sim.ssd1680 import SSD1680
+from driver.epd29_ssd1680 import EPD
+from display.frame_buffer_wrapper import FrameBufferWrapper
+
+
+def make_display(full_refresh_every):
+    spi = SPI(1, baudrate=4000000)
+    dc = Pin(17, Pin.OUT)
+    panel = SSD1680(spi, dc)
+    epd = EPD(spi, Pin(5, Pin.OUT), dc, Pin(16, Pin.OUT), panel.busy)
+    return FrameBufferWrapper(epd, full_refresh_every), panel
+
+
+def run(name, full_refresh_every, cycles):
+    fb, panel = make_display(full_refresh_every)
+    total_bytes = 0
+    total_ms = 0
+    for cycle in range(cycles):
+        fb.fill(0)
+        fb.rect(0, 0, fb.width, fb.height, 1)
+        fb.fill_rect(30 + (cycle // 2 % 4) * 20, 10, 16, 20, 1)  # "Clock digits"
+        fb.show()
+        epd = fb.epd
+        epd._prepare_frame()
+        if panel.frame(0x24) != epd._obuf:
+            raise AssertionError("Controller RAM out of step with framebuffer")
+        if epd.partial_refresh and panel.frame(0x26) != epd._obuf:
+            raise AssertionError("Controller RAM out of step with framebuffer")
+        total_bytes += fb.stats.transfer_bytes
+        total_ms += fb.stats.refresh_ms
+    print(
+        "{:8s} {:7.0f} bytes/cycle {:7.0f} ms/cycle  ({})".format(
+            name, total_bytes / cycles, total_ms / cycles, fb.stats
+        )
+    )
+
+
+def main(cycles=24):
+    run("full", 1, cycles)
+    run("partial", 12, cycles)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 24)
@@ -0,0 +1,170 @@
+# bench_pihole.py Pi-hole requests over a simulated day of dashboard cycles
+# (an update_stats() call every CYCLE_S seconds, stats due hourly) on the
+# virtual clock, against the local HTTP server in sim/servers.py. Compares
+# logging out after every update, as PiholeStats used to, with keeping the
+# session. With Pi-hole's default 1800 s timeout the session cannot last an
+# hour, so it is left to expire and each update is a login and the summary.
+# At 3000 s one GET /auth renewal reaches the next update, so it is renewed
+# instead of logging in again; past the update interval (7200 s) an update
+# is the summary alone.
+# Also checks a session saved to a file is resumed after a soft reset and
+# that a session Pi-hole has forgotten (401) costs one re-authentication,
+# while a failed renewal (500) keeps it.
+
+# Run from the repository root: python -m benchmarks.bench_pihole
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+
+import sim
+
+sim.install()
+
+from sim import mptime
+from sim.servers import HTTPServer
+from widgets.http_client import HTTPClient
+from widgets.pihole_stats import PiholeStats
+
+CYCLE_S = 300  # main.Dashboard.DISPLAY_UPDATE_INTERVAL
+DAY_S = 24 * 3600
+UPDATE_S = 3600
+BASE = "http://192.168.1.2/api"
+
+SUMMARY = {"queries": {"total": 15300, "blocked": 2100}}
+
+
+def make_server(validity, summary=None):
+    httpd = HTTPServer()
+    session = {"valid": True, "sid": "sid1", "csrf": "csrf1", "validity": validity}
+    httpd.route("POST", BASE + "/auth", [{"json": {"session": session}}])
+    httpd.route("GET", BASE + "/auth", [{"json": {"session": session}}])
+    httpd.route("GET", BASE + "/stats/summary", summary or [{"json": SUMMARY}])
+    httpd.route("POST", BASE + "/logout", [{"status": 204}])
+    return httpd
+
+
+def make_pihole(httpd, session_file=None):
+    http = HTTPClient()
+    http.lookup = httpd.lookup
+    return PiholeStats(
+        "192.168.1.2",
+        password="pw",
+        update_interval=UPDATE_S,
+        http=http,
+        session_file=session_file,
+    )
+
+
+def count(httpd, method, path):
+    return sum(1 for m, url, _, _ in httpd.log if m == method and url == BASE + path)
+
+
+async def cycles(pihole, n, logout):
+    for _ in range(n):
+        updated = pihole.last_update
+        await pihole.update_stats_async()
+        if logout and pihole.last_update != updated:
+            await pihole.logout_async()
+        await pihole.http.close()
+        mptime.advance_us(CYCLE_S * 1000000)
+
+
+def quietly(coro):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(coro)
+
+
+def run(name, validity, logout):
+    httpd = make_server(validity)
+    pihole = make_pihole(httpd)
+    quietly(cycles(pihole, DAY_S // CYCLE_S, logout))
+    httpd.close()
+    updates = count(httpd, "GET", "/stats/summary")
+    auths = count(httpd, "POST", "/auth")
+    renewals = count(httpd, "GET", "/auth")
+    logouts = count(httpd, "POST", "/logout")
+    total = len(httpd.log)
+    print(
+        "{:34s} {:3d} updates {:3d} logins {:3d} renewals {:3d} logouts  {:3d} requests, {:.1f} per update".format(
+            name, updates, auths, renewals, logouts, total, total / updates
+        )
+    )
+    return updates, auths, renewals, logouts
+
+
+def check_resume():
+    path = os.path.join(tempfile.mkdtemp(), "pihole_session.json")
+    httpd = make_server(1800)
+    quietly(make_pihole(httpd, path).update_stats_async())
+    first = len(httpd.log)
+    mptime.advance_us(CYCLE_S * 1000000)
+    # A soft reset: a new instance, the file and the RTC survive
+    with contextlib.redirect_stdout(io.StringIO()):
+        pihole = make_pihole(httpd, path)
+    quietly(pihole.update_stats_async(force=True))
+    httpd.close()
+    resumed = httpd.log[first:]
+    if [(m, url) for m, url, _, _ in resumed] != [("GET", BASE + "/stats/summary")]:
+        raise AssertionError("Saved session not resumed: {}".format(resumed))
+    if resumed[0][2].get("X-FTL-SID") != "sid1":
+        raise AssertionError("Saved SID not sent")
+    print("Session resumed after a soft reset: 1 request, no login")
+
+
+def check_expired():
+    httpd = make_server(1800, [{"status": 401}, {"json": SUMMARY}])
+    pihole = make_pihole(httpd)
+    pihole.session_sid = "forgotten"
+    pihole.session_expires = mptime.mp_time() + 1800
+    quietly(pihole.update_stats_async(force=True))
+    httpd.close()
+    calls = [(m, url[len(BASE) :]) for m, url, _, _ in httpd.log]
+    if calls != [
+        ("GET", "/stats/summary"),
+        ("POST", "/auth"),
+        ("GET", "/stats/summary"),
+    ]:
+        raise AssertionError("Unexpected requests after a 401: {}".format(calls))
+    if pihole.get_queries_total() != 15300 or pihole.session_sid != "sid1":
+        raise AssertionError("Stats or session not updated after a 401")
+    print("Forgotten session: 401, one login, stats fetched")
+
+
+def check_renew_error():
+    httpd = make_server(1800)
+    httpd.route("GET", BASE + "/auth", [{"status": 500}])
+    pihole = make_pihole(httpd)
+    pihole.session_sid = "sid1"
+    pihole.session_expires = mptime.mp_time() + pihole.renew_margin // 2
+    renewed = quietly(pihole.renew_session_async())
+    httpd.close()
+    if renewed or pihole.session_sid != "sid1":
+        raise AssertionError("Session dropped after a failed renewal")
+    print("Failed renewal (500): session kept")
+
+
+def main():
+    mptime.install_wall_clock()
+    mptime.set_wall((2025, 10, 16, 6, 0, 0))
+    updates, auths, _, logouts = run("logout after each update", 1800, True)
+    if (auths, logouts) != (updates, updates):
+        raise AssertionError("Expected a login and logout per update")
+    updates, auths, renewals, logouts = run("session kept, timeout 1800 s", 1800, False)
+    if auths != updates or logouts or renewals:
+        raise AssertionError("Expected a login and no renewals per update")
+    for validity in (3000, 7200):
+        updates, auths, _, logouts = run(
+            "session kept, timeout {} s".format(validity), validity, False
+        )
+        if auths != 1 or logouts:
+            raise AssertionError("Session was not kept")
+    check_resume()
+    check_expired()
+    check_renew_error()
+
+
+if __name__ == "__main__":
+    main()
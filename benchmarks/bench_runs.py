@@ -0,0 +1,60 @@
+# bench_runs.py Render the dashboard sections repeatedly with and without the
+# word run cache. Reports blits per frame, time per frame, the cache's memory
+# use and the glyph blits it saved, and checks the frames are identical.
+
+# Run from the repository root: python -m benchmarks.bench_runs [frames]
+
+import sys
+import time
+
+import sim
+
+sim.install()
+
+import framebuf
+from benchmarks.bench_glyphs import HEIGHT, WIDTH, render_frame
+from display.writer import GlyphCache, RunCache, Writer
+
+
+class CountingFrameBuffer(framebuf.FrameBuffer):
+    def __init__(self):
+        super().__init__(
+            bytearray(WIDTH * HEIGHT // 8), WIDTH, HEIGHT, framebuf.MONO_VLSB
+        )
+        self.width = WIDTH
+        self.height = HEIGHT
+        self.blits = 0
+
+    def blit(self, *args):
+        self.blits += 1
+        super().blit(*args)
+
+
+def run(name, cache, frames):
+    Writer.glyph_cache = GlyphCache()
+    Writer.run_cache = cache
+    fb = CountingFrameBuffer()
+    t = time.perf_counter()
+    for frame in range(frames):
+        render_frame(fb, frame)
+    elapsed = (time.perf_counter() - t) / frames
+    print(
+        "{:9s} {:7.2f} ms/frame {:5.1f} blits/frame  {}".format(
+            name,
+            elapsed * 1000,
+            fb.blits / frames,
+            cache.stats() if cache is not None else "",
+        )
+    )
+    return bytes(fb._fb_buf)
+
+
+def main(frames=1000):
+    glyphs = run("glyphs", None, frames)
+    runs = run("runs", RunCache(), frames)
+    if glyphs != runs:
+        raise AssertionError("Run cache rendering differs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
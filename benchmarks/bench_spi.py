@@ -0,0 +1,114 @@
+# bench_spi.py Count SPI transactions and bytes per EPD.show() on the host.
+# Compares the bulk upload against the previous one-write-per-byte path and
+# checks that both send the same bytes in the same order.
+
+# Run from the repository root: python -m benchmarks.bench_spi [iterations]
+
+import random
+import sys
+import time
+
+import sim
+
+sim.install()
+
+from machine import Pin, SPI
+from driver.epd29_ssd1680 import EPD
+
+
+def make_epd():
+    spi = SPI(1, baudrate=4000000)
+    epd = EPD(spi, Pin(5, Pin.OUT), Pin(17, Pin.OUT), Pin(16, Pin.OUT), Pin(4, Pin.IN))
+    for x in range(0, epd.width, 3):  # Non-trivial content
+        epd.vline(x, 0, epd.height, 1)
+    return epd, spi
+
+
+# Previous transfer path: rotate on the fly, one spi.write() per byte.
+def legacy_upload(epd, buf1=bytearray(1)):
+    mvb = epd._mvb
+    spi = epd._spi
+    epd._dc(0)
+    spi.write(b"\x24")
+    epd._dc(1)
+    wid = epd.width
+    tbc = epd.height // 8
+    iidx = wid * (tbc - 1)
+    idx = iidx
+    vbc = 0
+    hpc = 0
+    for _ in range(len(mvb)):
+        buf1[0] = mvb[idx] ^ 0xFF
+        spi.write(buf1)
+        idx -= wid
+        vbc += 1
+        vbc %= tbc
+        if not vbc:
+            hpc += 1
+            idx = iidx + hpc
+
+
+def bulk_upload(epd):
+    epd._prepare_frame()
+    epd._command(b"\x24", epd._obuf)
+
+
+def run(name, upload, epd, spi, iterations):
+    spi.reset_counters()
+    t = time.perf_counter()
+    for _ in range(iterations):
+        upload(epd)
+    elapsed = (time.perf_counter() - t) / iterations
+    print(
+        "{:8s} {:6d} writes/frame {:6d} bytes/frame {:8.2f} ms/frame".format(
+            name,
+            spi.writes // iterations,
+            spi.bytes_written // iterations,
+            elapsed * 1000,
+        )
+    )
+    return elapsed
+
+
+# The per-column rotation must reproduce the on-the-fly ordering, for the
+# whole frame and for a RAM window.
+def check_ordering(epd, spi):
+    saved = bytes(epd._buffer)
+    for i in range(len(epd._buffer)):
+        epd._buffer[i] = random.getrandbits(8)
+    sent = []
+    spi.listener = sent.append
+    legacy_upload(epd)
+    expected = b"".join(sent)
+    sent.clear()
+    bulk_upload(epd)
+    spi.listener = None
+    n = epd._prepare_window(0, 0, epd._lines, 0, epd._lbytes)
+    window = bytes(epd._obuf[:n])
+    epd._buffer[:] = saved
+    if b"".join(sent) != expected:
+        raise AssertionError("Bulk upload differs from legacy byte order")
+    if window != expected[1:]:
+        raise AssertionError("Window upload differs from legacy byte order")
+    print("Byte order matches legacy path ({} bytes)".format(len(expected)))
+
+
+def main(iterations=20):
+    epd, spi = make_epd()
+    check_ordering(epd, spi)
+    t_old = run("legacy", legacy_upload, epd, spi, iterations)
+    t_new = run("bulk", bulk_upload, epd, spi, iterations)
+    for partial in (True, False):
+        epd.partial_refresh = partial
+        spi.reset_counters()
+        epd.show()
+        print(
+            "show() partial_refresh={}: {} SPI writes, {} bytes".format(
+                partial, spi.writes, spi.bytes_written
+            )
+        )
+    print("Upload speedup: {:.1f}x".format(t_old / t_new))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
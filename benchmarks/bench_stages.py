@@ -0,0 +1,268 @@
+# bench_stages.py Per-stage timing of the render path: drawing each dashboard
+# section, the frame diff in FrameBufferWrapper, the rotate/invert copy into
+# the driver's output buffer and the SPI upload in EPD. Each stage is timed
+# with ticks_us() over many iterations (min/median/p99) and its allocations
+# are counted from gc.mem_alloc() deltas with the collector disabled. The
+# panel refresh itself is not repeated: see bench_busy and bench_partial.
+# Results are written as JSON; pass an earlier result file to compare.
+
+# Run from the repository root:
+#   python -m benchmarks.bench_stages [iterations] [--out FILE] [--baseline FILE]
+# On the device (fonts/*.bin, driver, display and config.py uploaded, plus
+# this file as benchmarks/bench_stages.py):
+#   import benchmarks.bench_stages as b; b.main(100)
+
+import gc
+import sys
+
+try:
+    import sim
+except ImportError:  # On the device
+    sim = None
+else:
+    sim.install()
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+from time import ticks_diff, ticks_us
+
+from display.bin_font import BinFont
+from display.layout import Layout, Region
+from display.writer import Writer
+
+OUT = "bench_stages.json"
+ALLOC_RUNS = 5
+
+freesans14 = BinFont("fonts/freesans14.bin")
+freesans17 = BinFont("fonts/freesans17.bin")
+freesans20 = BinFont("fonts/freesans20.bin")
+
+# Representative widget output; the clock changes every iteration.
+TIMES = ("12:05", "12:10", "12:15", "12:20")
+
+
+class Widgets:
+    def __init__(self):
+        self.n = 0
+
+    def time(self):
+        return TIMES[self.n % len(TIMES)], "Thu 16 Oct"
+
+    def weather(self):
+        return "Kyiv 14`C", "Hum:48% Rain:0mm"
+
+    def website(self):
+        return "Site Views:", "1.2k"
+
+    def pihole(self):
+        return "DNS Queries: 15.3k", "Blocked Ads: 2.1k"
+
+
+# EPaperDisplay on the SSD1680 model, without config.py.
+class SimDisplay:
+    def __init__(self):
+        from machine import Pin, SPI
+        from sim.ssd1680 import SSD1680
+        from driver.epd29_ssd1680 import EPD
+        from display.frame_buffer_wrapper import FrameBufferWrapper
+
+        spi = SPI(1, baudrate=4000000)
+        dc = Pin(17, Pin.OUT)
+        self.panel = SSD1680(spi, dc)
+        self.epd = EPD(spi, Pin(5, Pin.OUT), dc, Pin(16, Pin.OUT), self.panel.busy)
+        self.fb = FrameBufferWrapper(self.epd)
+        self.width = self.fb.width
+        self.height = self.fb.height
+        self._writers = {}
+
+    def writer(self, font):
+        wri = self._writers.get(font)
+        if wri is None:
+            wri = Writer(self.fb, font, verbose=False)
+            self._writers[font] = wri
+        return wri
+
+
+def make_display():
+    if sim is not None:
+        return SimDisplay()
+    from display.display import EPaperDisplay
+
+    return EPaperDisplay()
+
+
+# Same quadrants, fonts and rows as main.Dashboard.
+def make_layout(display, widgets):
+    w, h = display.width, display.height
+    layout = Layout(display)
+    layout.section(
+        Region(0, 0, w // 2, h // 2), widgets.time, ((freesans20, 10), (freesans14, 35))
+    )
+    layout.section(
+        Region(w // 2, 0, w - w // 2, h // 2),
+        widgets.weather,
+        ((freesans20, 10), (freesans14, 35)),
+    )
+    layout.section(
+        Region(0, h // 2, w // 2, h - h // 2),
+        widgets.website,
+        ((freesans20, 10), (freesans17, 35)),
+    )
+    layout.section(
+        Region(w // 2, h // 2, w - w // 2, h - h // 2),
+        widgets.pihole,
+        ((freesans17, 10), (freesans17, 35)),
+    )
+    return layout
+
+
+# Clear a section's region and draw its text, as a full frame does.
+def section_stage(fb, section, widgets):
+    source, slots = section
+    region = slots[0].region
+
+    def stage():
+        widgets.n += 1
+        fb.fill_rect(region.x, region.y, region.width, region.height, 0)
+        for slot, text in zip(slots, source()):
+            slot._place(text)
+            slot.draw()
+
+    return stage
+
+
+def stages(display, widgets):
+    layout = make_layout(display, widgets)
+    fb = display.fb
+    epd = display.epd
+    names = ("time", "weather", "website", "pihole")
+    result = [
+        (name, section_stage(fb, s, widgets)) for name, s in zip(names, layout.sections)
+    ]
+
+    # Last frame sent differs from the current one in the clock only.
+    layout.update()
+    fb.prev = bytearray(fb.buffer)
+    widgets.n += 1
+    layout.update()
+    result.append(("diff", fb.dirty_rects))
+    result.append(("prepare", epd._prepare_frame))
+    # RAM load without the refresh command: prepare plus SPI transfer.
+    result.append(("upload", epd._upload_full))
+    return result
+
+
+def median(values):
+    return values[len(values) // 2]
+
+
+def percentile(values, pc):
+    return values[min(len(values) - 1, (len(values) * pc + 99) // 100 - 1)]
+
+
+def time_stage(stage, iterations):
+    times = []
+    for _ in range(iterations):
+        t = ticks_us()
+        stage()
+        times.append(ticks_diff(ticks_us(), t))
+    times.sort()
+    return {
+        "min_us": times[0],
+        "median_us": median(times),
+        "p99_us": percentile(times, 99),
+    }
+
+
+# Bytes allocated by one call, the median of a few runs.
+def alloc_stage(stage):
+    sizes = []
+    for _ in range(ALLOC_RUNS):
+        gc.collect()
+        gc.disable()
+        try:
+            a = gc.mem_alloc()
+            stage()
+            sizes.append(gc.mem_alloc() - a)
+        finally:
+            gc.enable()
+    sizes.sort()
+    return median(sizes)
+
+
+def compare(results, baseline):
+    old = baseline["stages"]
+    print("Against baseline:")
+    for name, now in results["stages"].items():
+        was = old.get(name)
+        if was is None:
+            continue
+        print(
+            "  {:8s} median {:+6.1f}%  p99 {:+6.1f}%  alloc {:+d} bytes".format(
+                name,
+                (now["median_us"] - was["median_us"]) * 100 / max(was["median_us"], 1),
+                (now["p99_us"] - was["p99_us"]) * 100 / max(was["p99_us"], 1),
+                now["alloc_bytes"] - was["alloc_bytes"],
+            )
+        )
+
+
+def main(iterations=200, out=OUT, baseline=None):
+    widgets = Widgets()
+    stage_list = stages(make_display(), widgets)
+    for _, stage in stage_list:
+        stage()  # Warm up font and run caches
+    results = {}
+    # Tracing allocations slows the host down, so all timing comes first.
+    for name, stage in stage_list:
+        results[name] = time_stage(stage, iterations)
+    for name, stage in stage_list:
+        results[name]["alloc_bytes"] = alloc_stage(stage)
+
+    print(
+        "{:8s} {:>9s} {:>9s} {:>9s} {:>9s}".format(
+            "stage", "min us", "median", "p99", "alloc B"
+        )
+    )
+    for name, _ in stage_list:
+        r = results[name]
+        print(
+            "{:8s} {:9d} {:9d} {:9d} {:9d}".format(
+                name, r["min_us"], r["median_us"], r["p99_us"], r["alloc_bytes"]
+            )
+        )
+    doc = {
+        "implementation": sys.implementation.name,
+        "platform": sys.platform,
+        "host": sim is not None,
+        "iterations": iterations,
+        "stages": results,
+    }
+    if out:
+        with open(out, "w") as f:
+            json.dump(doc, f)
+        print("Results written to", out)
+    if baseline:
+        with open(baseline) as f:
+            compare(doc, json.load(f))
+    return doc
+
+
+if __name__ == "__main__" and sim is not None:
+    args = sys.argv[1:]
+    opts = {}
+    while args:
+        arg = args.pop(0)
+        if arg in ("--out", "--baseline") and args:
+            opts[arg[2:]] = args.pop(0)
+        elif arg.isdigit():
+            opts["iterations"] = int(arg)
+        else:
+            print(
+                "Usage: python -m benchmarks.bench_stages [iterations] [--out FILE] [--baseline FILE]"
+            )
+            sys.exit(1)
+    main(**opts)
@@ -0,0 +1,96 @@
+# bench_subset.py Startup cost and resident memory of the dashboard fonts:
+# the font-to-py modules, the full binary fonts and binary subsets built
+# from the scanned dashboard charset. Checks that a subset renders dashboard
+# strings exactly as the full font and draws other characters with the
+# fallback glyph.
+
+# Run from the repository root: python -m benchmarks.bench_subset [rounds]
+
+import os
+import sys
+import tempfile
+
+import sim
+
+sim.install()
+
+from benchmarks.bench_binfont import FONTS, Module, load_module, measure, render
+from display.bin_font import BinFont
+from display.writer import GlyphCache, Writer
+from tools.font_subset import scan, subset
+
+STRINGS = (
+    "12:05",
+    "Thu 16 Oct",
+    "Hum:48% Rain:0.0mm",
+    "Site Views:",
+    "1.2k",
+    "No weather data",
+)
+
+
+def check(module, full, sub, chars):
+    for text in STRINGS:
+        if render(full, text) != render(sub, text):
+            raise AssertionError("{!r} renders differently".format(text))
+    missing = [c for c in map(chr, range(32, 127)) if c not in chars][:3]
+    for c in missing:
+        if sub.get_ch(c)[0] != full.get_ch("\x7f")[0] or render(sub, c) != render(
+            full, "\x7f"
+        ):
+            raise AssertionError("{!r} not drawn with the fallback glyph".format(c))
+
+
+def main(rounds=20):
+    Writer.glyph_cache = GlyphCache()
+    chars = scan()
+    print("Scanned charset: {} characters".format(len(chars)))
+    tmp = tempfile.mkdtemp()
+    total = [0] * 6
+    for name in FONTS:
+        module = Module(load_module(name))
+        data, _ = subset(module, chars)
+        sub_path = os.path.join(tmp, name + "_subset.bin")
+        with open(sub_path, "wb") as f:
+            f.write(data)
+        full_path = "fonts/{}.bin".format(name)
+        _, mem_file, f = measure(lambda: open(full_path, "rb"), 1)
+        f.close()
+        check(module, BinFont(full_path), BinFont(sub_path), chars)
+
+        row = []
+        t, mem, _ = measure(lambda: load_module(name), rounds)
+        row += [t, mem]
+        for path in (full_path, sub_path):
+            t, mem, font = measure(lambda: BinFont(path), rounds)
+            font.close()
+            row += [t, mem - mem_file]
+        print(
+            "{}: module {:5.2f} ms {:5d} B | full bin {:5.3f} ms {:4d} B {:5d} B flash "
+            "| subset {:5.3f} ms {:4d} B {:5d} B flash".format(
+                name,
+                row[0] * 1000,
+                row[1],
+                row[2] * 1000,
+                row[3],
+                os.path.getsize(full_path),
+                row[4] * 1000,
+                row[5],
+                len(data),
+            )
+        )
+        total = [a + b for a, b in zip(total, row)]
+    print(
+        "total: module {:5.2f} ms {:5d} B | full bin {:5.3f} ms {:4d} B | subset {:5.3f} ms {:4d} B".format(
+            total[0] * 1000,
+            total[1],
+            total[2] * 1000,
+            total[3],
+            total[4] * 1000,
+            total[5],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,75 @@
+# bench_text_width.py Measure strings via glyph decoding (font.get_ch) and via
+# the FontMetrics width table, checking both agree for every character. Also
+# times the memoized right-hand blank column scan used for overflow checks.
+
+# Run from the repository root: python -m benchmarks.bench_text_width [rounds]
+
+import sys
+import time
+
+from display.font_metrics import FontMetrics
+from fonts import freesans14, freesans17, freesans20
+
+STRINGS = (
+    "12:05",
+    "Sun May 4",
+    "Kyiv,UA 21`C",
+    "Hum:48% Rain:0.0mm",
+    "Site Views:",
+    "1.2k",
+    "DNS Queries: 15.3k",
+    "Blocked Ads: 2.1k",
+)
+
+
+def get_ch_width(font, string):
+    total = 0
+    for char in string:
+        total += font.get_ch(char)[2]
+    return total
+
+
+def check(font):
+    metrics = FontMetrics.of(font)
+    for code in range(0, 256):
+        char = chr(code)
+        if metrics.width(char) != font.get_ch(char)[2]:
+            raise AssertionError("Width mismatch for {!r}".format(char))
+        if metrics.truelen(char) != metrics._scan_truelen(char):
+            raise AssertionError("Truelen mismatch for {!r}".format(char))
+
+
+def timed(measure, font, rounds):
+    t = time.perf_counter()
+    for _ in range(rounds):
+        for string in STRINGS:
+            measure(font, string)
+    return (time.perf_counter() - t) / (rounds * len(STRINGS)) * 1e6
+
+
+def main(rounds=2000):
+    for name, font in (
+        ("freesans14", freesans14),
+        ("freesans17", freesans17),
+        ("freesans20", freesans20),
+    ):
+        check(font)
+        metrics = FontMetrics.of(font)
+        t_old = timed(get_ch_width, font, rounds)
+        t_new = timed(lambda _, s: metrics.text_width(s), font, rounds)
+        print(
+            "{}: get_ch {:6.2f} us/string  table {:6.2f} us/string  ({} byte table)".format(
+                name, t_old, t_new, len(metrics.widths)
+            )
+        )
+        t_scan = timed(lambda _, s: metrics._scan_truelen(s[-1]), font, rounds)
+        t_memo = timed(lambda _, s: metrics.truelen(s[-1]), font, rounds)
+        print(
+            "{}: truelen scan {:6.2f} us/glyph  memoized {:6.2f} us/glyph".format(
+                name, t_scan, t_memo
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
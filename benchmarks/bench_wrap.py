@@ -0,0 +1,124 @@
+# bench_wrap.py Word wrap of multi-line status strings: the previous
+# prefix-stripping, recursive _printline against the single-pass breaker.
+# Also checks that both produce identical frames for random text.
+
+# Run from the repository root: python -m benchmarks.bench_wrap [rounds]
+
+import random
+import sys
+import time
+
+import sim
+
+sim.install()
+
+import framebuf
+from display.writer import GlyphCache, Writer
+from fonts import freesans14
+
+WIDTH = 296
+HEIGHT = 128
+
+STATUS = (
+    "Kyiv,UA 21`C Hum:48% Rain:0.0mm Wind:3m/s NW Pressure:1013hPa "
+    "Sunrise 05:12 Sunset 20:41 DNS Queries: 15.3k Blocked Ads: 2.1k "
+    "Site Views: 1.2k Last update 12:05 Next update 12:10 Wi-Fi -61dBm"
+)
+
+
+class LegacyWriter(Writer):
+    def _printline(self, string, invert):
+        rstr = None
+        if self.wrap and self.stringlen(string, True):
+            pos = 0
+            lstr = string[:]
+            while self.stringlen(lstr, True):
+                pos = lstr.rfind(" ")
+                lstr = lstr[:pos].rstrip()
+            if pos > 0:
+                rstr = string[pos + 1 :]
+                string = lstr
+
+        for char in string:
+            self._printchar(char, invert)
+        if rstr is not None:
+            self._printchar("\n")
+            self._printline(rstr, invert)
+
+
+# Skips drawing so the timings show the line breaking cost.
+class Measure:
+    def __init__(self, cls):
+        self.cls = cls
+
+    def __call__(self, fb, text, col):
+        wri = self.cls(fb, freesans14, verbose=False)
+        wri.set_clip(True, True, True)
+        state = wri._getstate()
+
+        def advance(char, invert=False, recurse=False):
+            if char == "\n":
+                state.text_col = 0
+            else:
+                state.text_col += wri.metrics.width(char)
+
+        wri._printchar = advance
+        wri.set_textpos(0, col)
+        wri.printstring(text)
+
+
+def make_fb():
+    fb = framebuf.FrameBuffer(
+        bytearray(WIDTH * HEIGHT // 8), WIDTH, HEIGHT, framebuf.MONO_VLSB
+    )
+    fb.width = WIDTH
+    fb.height = HEIGHT
+    return fb
+
+
+def render(cls, text, col):
+    fb = make_fb()
+    wri = cls(fb, freesans14, verbose=False)
+    wri.set_clip(True, True, True)
+    wri.set_textpos(0, col)
+    wri.printstring(text)
+    return bytes(fb._fb_buf)
+
+
+def check(trials):
+    rnd = random.Random(1)
+    words = STATUS.split(" ") + ["", "x", "Supercalifragilisticexpialidocious" * 2]
+    for _ in range(trials):
+        text = " ".join(rnd.choice(words) for _ in range(rnd.randint(1, 12)))
+        if rnd.random() < 0.3:
+            text = " " * rnd.randint(1, 3) + text
+        col = rnd.randint(0, WIDTH - 1)
+        if render(LegacyWriter, text, col) != render(Writer, text, col):
+            raise AssertionError("Wrap differs for {!r} at {}".format(text, col))
+    print("Random wrap check passed ({} strings)".format(trials))
+
+
+def main(rounds=200):
+    Writer.glyph_cache = GlyphCache()
+    check(200)
+    fb = make_fb()
+    for name, cls in (("legacy", LegacyWriter), ("single pass", Writer)):
+        for n in (1, 4, 8):
+            text = " ".join([STATUS] * n)
+            measure = Measure(cls)
+            t = time.perf_counter()
+            for _ in range(rounds):
+                measure(fb, text, 0)
+            elapsed = (time.perf_counter() - t) / rounds
+            print(
+                "{:11s} {:5d} chars {:8.3f} ms/string".format(
+                    name, len(text), elapsed * 1000
+                )
+            )
+    wri = Writer(fb, freesans14, verbose=False)
+    for line, width in wri.measure_lines(STATUS, col=0):
+        print("  {:3d}px  {}".format(width, line))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,128 @@
+# bin_font.py Read fonts stored in the binary container written by
+# tools/font_to_bin.py. Only the header, width table and offset index are
+# held in RAM; glyph bitmaps are read from the file on demand and a few are
+# kept in a small LRU cache. A BinFont is a drop-in replacement for a
+# font-to-py module as far as Writer is concerned.
+
+# File layout (little endian):
+#   0  4s  magic b"BFNT"
+#   4  B   format version (1)
+#   5  B   flags: bit 0 hmap, bit 1 reverse, bit 2 monospaced, bit 3 subset
+#   6  B   height
+#   7  B   max_width
+#   8  H   min_ch
+#   10 H   max_ch
+#   12     subset fonts only (tools/font_subset.py): remap, m bytes,
+#          m = max_ch - min_ch + 1, the glyph number of chr(min_ch + k) or
+#          0 if the character was left out
+#   then   widths: n bytes, entry 0 is the glyph drawn for unsupported
+#          characters. Full fonts have n = m + 1 and entry 1 + k is
+#          chr(min_ch + k); subset fonts have n = max(remap) + 1
+#   then   offsets: n + 1 H, glyph k spans offsets[k]:offsets[k + 1] of
+#          the bitmap area
+#   then   bitmaps, rows of ceil(width / 8) bytes as in font-to-py output
+
+# Released under the MIT license see LICENSE
+
+MAGIC = b"BFNT"
+VERSION = 1
+HEADER_SIZE = 12
+
+HMAP = 1
+REVERSE = 2
+MONOSPACED = 4
+SUBSET = 8
+
+
+class BinFont:
+    def __init__(self, path, cache_glyphs=8):
+        self._file = f = open(path, "rb")
+        hdr = f.read(HEADER_SIZE)
+        if len(hdr) != HEADER_SIZE or hdr[:4] != MAGIC or hdr[4] != VERSION:
+            f.close()
+            raise ValueError("Not a binary font: {}".format(path))
+        self._flags = hdr[5]
+        self._height = hdr[6]
+        self._max_width = hdr[7]
+        self._min_ch = hdr[8] | hdr[9] << 8
+        self._max_ch = hdr[10] | hdr[11] << 8
+        m = self._max_ch - self._min_ch + 1
+        self._remap = None
+        if self._flags & SUBSET:
+            self._remap = f.read(m)
+            n = max(self._remap) + 1 if len(self._remap) == m else 0
+        else:
+            n = m + 1
+        self._widths = f.read(n)
+        self._offsets = f.read(2 * (n + 1))
+        if not n or len(self._widths) != n or len(self._offsets) != 2 * (n + 1):
+            f.close()
+            raise ValueError("Truncated binary font: {}".format(path))
+        # File offset of glyph data
+        self._bitmaps = HEADER_SIZE + (m if self._remap else 0) + 3 * n + 2
+        self.cache_glyphs = max(cache_glyphs, 1)
+        self._cache = {}  # Glyph index: [bitmap, last use]
+        self._tick = 0
+        self.reads = 0  # Glyphs read from the file
+
+    def height(self):
+        return self._height
+
+    def max_width(self):
+        return self._max_width
+
+    def hmap(self):
+        return bool(self._flags & HMAP)
+
+    def reverse(self):
+        return bool(self._flags & REVERSE)
+
+    def monospaced(self):
+        return bool(self._flags & MONOSPACED)
+
+    def min_ch(self):
+        return self._min_ch
+
+    def max_ch(self):
+        return self._max_ch
+
+    # Advance widths in FontMetrics order (fallback, then min_ch..max_ch), so
+    # metrics need no bitmap reads.
+    def widths(self):
+        remap = self._remap
+        if remap is None:
+            return self._widths
+        widths = bytearray(len(remap) + 1)
+        for k, idx in enumerate(remap):
+            widths[k + 1] = self._widths[idx]
+        widths[0] = self._widths[0]
+        return widths
+
+    def _offset(self, idx):
+        offsets = self._offsets
+        return offsets[2 * idx] | offsets[2 * idx + 1] << 8
+
+    def get_ch(self, ch):
+        k = ord(ch) - self._min_ch
+        if 0 <= k <= self._max_ch - self._min_ch:
+            idx = k + 1 if self._remap is None else self._remap[k]
+        else:
+            idx = 0
+        self._tick += 1
+        cache = self._cache
+        entry = cache.get(idx)
+        if entry is None:
+            if len(cache) >= self.cache_glyphs:
+                del cache[min(cache, key=lambda k: cache[k][1])]
+            start = self._offset(idx)
+            f = self._file
+            f.seek(self._bitmaps + start)
+            entry = [f.read(self._offset(idx + 1) - start), 0]
+            cache[idx] = entry
+            self.reads += 1
+        entry[1] = self._tick
+        return entry[0], self._height, self._widths[idx]
+
+    def close(self):
+        self._file.close()
+        self._cache = {}
@@ -3,6 +3,7 @@ import config
 from machine import Pin, SPI
 import driver.epd29_ssd1680 as epd29_ssd1680
 from display.frame_buffer_wrapper import FrameBufferWrapper
+from display.writer import Writer
 
 
 class EPaperDisplay:
@@ -32,10 +33,19 @@ class EPaperDisplay:
         # Initialize the display
         self.epd.init()
         self.fb = FrameBufferWrapper(self.epd)
+        self._writers = {}  # One quiet Writer per font, reused every frame
 
         # Clear to start
         self.clear()
 
+    def writer(self, font):
+        """Return the shared Writer for font, creating it on first use."""
+        wri = self._writers.get(font)
+        if wri is None:
+            wri = Writer(self.fb, font, verbose=False)
+            self._writers[font] = wri
+        return wri
+
     def clear(self):
         # Fill with white (0 for this specific driver)
         self.epd.fill(0)
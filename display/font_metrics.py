@@ -0,0 +1,86 @@
+# font_metrics.py Per-font glyph metrics for measuring text without decoding
+# glyphs. Works with any font exposing the font-to-py interface.
+
+# Released under the MIT license see LICENSE
+
+
+class FontMetrics:
+    _fonts = {}  # One instance per font, built on first use
+
+    @classmethod
+    def of(cls, font):
+        metrics = cls._fonts.get(font)
+        if metrics is None:
+            metrics = cls(font)
+            cls._fonts[font] = metrics
+        return metrics
+
+    def __init__(self, font):
+        self.font = font
+        # Older font-to-py output (e.g. freesans17) has no range functions
+        # and always covers 32..126.
+        self.min_ch = font.min_ch() if hasattr(font, "min_ch") else 32
+        max_ch = font.max_ch() if hasattr(font, "max_ch") else 126
+        # widths[0] is the glyph drawn for unsupported characters,
+        # widths[1 + n] the width of chr(min_ch + n).
+        if hasattr(font, "widths"):  # BinFont stores the table as is
+            widths = font.widths()
+        else:
+            widths = bytearray(max_ch - self.min_ch + 2)
+            widths[0] = font.get_ch(chr(max_ch + 1))[2]
+            for n in range(1, len(widths)):
+                widths[n] = font.get_ch(chr(self.min_ch + n - 1))[2]
+        self.widths = widths
+        # Printable width of each glyph less blank columns on the right,
+        # indexed as widths. 0 means not yet computed (the minimum is 1).
+        self.truelens = bytearray(len(widths))
+
+    def _index(self, char):
+        n = ord(char) - self.min_ch + 1
+        return n if 0 < n < len(self.widths) else 0
+
+    def width(self, char):
+        widths = self.widths
+        n = ord(char) - self.min_ch + 1
+        return widths[n] if 0 < n < len(widths) else widths[0]
+
+    def text_width(self, string):
+        widths = self.widths
+        lo = self.min_ch - 1
+        size = len(widths)
+        default = widths[0]
+        total = 0
+        for char in string:
+            n = ord(char) - lo
+            total += widths[n] if 0 < n < size else default
+        return total
+
+    # Decoded on first use per glyph, then a table lookup.
+    def truelen(self, char):
+        n = self._index(char)
+        tl = self.truelens[n]
+        if not tl:
+            tl = self._scan_truelen(char)
+            self.truelens[n] = tl
+        return tl
+
+    # Scan the glyph bitmap for its rightmost lit column.
+    def _scan_truelen(self, char):
+        glyph, ht, wd = self.font.get_ch(char)
+        div, mod = divmod(wd, 8)
+        gbytes = div + 1 if mod else div  # No. of bytes per row of glyph
+        mc = 0  # Max non-blank column
+        data = glyph[(wd - 1) // 8]  # Last byte of row 0
+        for row in range(ht):  # Glyph row
+            for col in range(wd - 1, -1, -1):  # Glyph column
+                gbyte, gbit = divmod(col, 8)
+                if gbit == 0:  # Next glyph byte
+                    data = glyph[row * gbytes + gbyte]
+                if col <= mc:
+                    break
+                if data & (1 << (7 - gbit)):  # Pixel is lit (1)
+                    mc = col  # Eventually gives rightmost lit pixel
+                    break
+            if mc + 1 == wd:
+                break  # All done: no trailing space
+        return mc + 1
@@ -1,20 +1,176 @@
 import framebuf
 
 
+class DisplayStats:
+    """Refresh counters and metrics of the last display cycle."""
+
+    def __init__(self):
+        self.full_refreshes = 0
+        self.partial_refreshes = 0
+        self.skipped = 0  # Cycles where the frame was unchanged
+        self.transfer_bytes = 0  # SPI payload sent in the last cycle
+        self.refresh_ms = 0  # Panel busy time in the last cycle
+
+    def __str__(self):
+        return "full={} partial={} skipped={} last: {} bytes, {} ms".format(
+            self.full_refreshes,
+            self.partial_refreshes,
+            self.skipped,
+            self.transfer_bytes,
+            self.refresh_ms,
+        )
+
+
 class FrameBufferWrapper(framebuf.FrameBuffer):
-    def __init__(self, epd):
+    # Changed columns closer than this are merged into one dirty rectangle.
+    MERGE_GAP = 8
+
+    def __init__(self, epd, full_refresh_every=12):
         self.epd = epd
         self.width = epd.width
         self.height = epd.height
+        # Every Nth refresh is a full one to clear partial-update ghosting.
+        # 1 disables partial refresh.
+        self.full_refresh_every = full_refresh_every
+        epd.partial_refresh = full_refresh_every > 1
+        self._partials = 0  # Partial refreshes since the last full one
+        self.stats = DisplayStats()
 
-        # Create a buffer for FrameBuffer
-        self.buffer = bytearray(self.width * self.height // 8)
+        # Draw straight into the driver's buffer so show() needs no copy
+        self.buffer = epd._buffer
+        # Last frame sent to the panel, for dirty rectangle tracking. Only
+        # allocated once show() is asked to diff; callers passing their own
+        # rects, or full=True for the whole frame, never pay for it.
+        self.prev = None
+        self._sent = False  # Nothing is on the panel before the first show
 
         # Initialize FrameBuffer parent
-        fmt = framebuf.MONO_VLSB if self.width > self.height else framebuf.MONO_HLSB
+        self._vlsb = self.width > self.height
+        fmt = framebuf.MONO_VLSB if self._vlsb else framebuf.MONO_HLSB
         super().__init__(self.buffer, self.width, self.height, fmt)
 
-    def show(self, deepsleep_after_refresh=False):
-        """Copy our buffer to the EPD's internal buffer"""
-        self.epd._buffer[:] = self.buffer
-        self.epd.show(deepsleep_after_refresh=deepsleep_after_refresh)
+    def dirty_rects(self):
+        """Return rectangles (x, y, w, h) changed since the last frame sent,
+        or None if no frame was kept to diff against."""
+        buf = self.buffer
+        prev = self.prev
+        if prev is None:
+            return None
+        if buf == prev:
+            return []
+        # Bands run along the panel's gate lines: x in landscape, y otherwise.
+        # For each line record the first and last changed byte across it.
+        if self._vlsb:
+            nlines = self.width
+            stride = self.width
+        else:
+            nlines = self.height
+            stride = (self.width + 7) // 8
+        lo = bytearray(b"\xff" * nlines)
+        hi = bytearray(nlines)
+        for idx in range(len(buf)):
+            if buf[idx] != prev[idx]:
+                a, b = divmod(idx, stride)
+                line, span = (b, a) if self._vlsb else (a, b)
+                if span < lo[line]:
+                    lo[line] = span
+                if span > hi[line]:
+                    hi[line] = span
+
+        rects = []
+        run = None  # [first line, last line, first byte, last byte]
+        for line in range(nlines):
+            if lo[line] == 0xFF:
+                continue
+            if run is not None and line - run[1] <= self.MERGE_GAP:
+                run[1] = line
+                run[2] = min(run[2], lo[line])
+                run[3] = max(run[3], hi[line])
+            else:
+                if run is not None:
+                    rects.append(self._run_rect(run))
+                run = [line, line, lo[line], hi[line]]
+        rects.append(self._run_rect(run))
+        return rects
+
+    def _run_rect(self, run):
+        l0, l1, s0, s1 = run
+        if self._vlsb:
+            return l0, s0 * 8, l1 - l0 + 1, (s1 - s0 + 1) * 8
+        return s0 * 8, l0, (s1 - s0 + 1) * 8, l1 - l0 + 1
+
+    def _next_rects(self, rects, full):
+        """Dirty rectangles to refresh: None for a full refresh, [] to skip."""
+        if full:
+            return None
+        if rects is None and self.prev is None:
+            # First diff requested: send everything and keep frames from now
+            self.prev = bytearray(len(self.buffer))
+            return None
+        if not self._sent:
+            return None
+        if rects is None:
+            rects = self.dirty_rects()
+        if rects and self._partials + 1 >= self.full_refresh_every:
+            return None
+        return rects
+
+    def _skipped(self):
+        stats = self.stats
+        stats.skipped += 1
+        stats.transfer_bytes = 0
+        stats.refresh_ms = 0
+
+    def _sent_frame(self, partial):
+        stats = self.stats
+        if partial:
+            self._partials += 1
+            stats.partial_refreshes += 1
+        else:
+            self._partials = 0
+            stats.full_refreshes += 1
+        if self.prev is not None:
+            self.prev[:] = self.buffer
+        self._sent = True
+        stats.transfer_bytes = self.epd.transfer_bytes
+        stats.refresh_ms = self.epd.refresh_ms
+
+    def show(self, deepsleep_after_refresh=False, rects=None, full=False):
+        """Refresh the panel from the shared frame buffer.
+
+        Changed regions are sent as a partial refresh, with a full refresh
+        every full_refresh_every cycles. An unchanged frame is not sent at all.
+        A caller that knows what it drew can pass rects to skip the frame diff;
+        every change must then lie inside them. full=True sends the whole
+        frame without a diff. The previous frame is only kept once a show()
+        with neither has asked for the diff.
+        """
+        rects = self._next_rects(rects, full)
+        if rects == []:
+            self._skipped()
+            return
+        if rects:
+            # Falls back to a full refresh if the panel RAM was lost
+            partial = self.epd.show_partial(
+                rects, deepsleep_after_refresh=deepsleep_after_refresh
+            )
+        else:
+            self.epd.show(deepsleep_after_refresh=deepsleep_after_refresh)
+            partial = False
+        self._sent_frame(partial)
+
+    async def show_async(self, deepsleep_after_refresh=False, rects=None, full=False):
+        """As show(), but return once the frame is in controller RAM.
+
+        The next frame can be drawn while the panel refreshes; epd.complete
+        is set when it is done. stats.refresh_ms then reports the previous
+        refresh, as the current one is still running.
+        """
+        rects = self._next_rects(rects, full)
+        if rects == []:
+            self._skipped()
+            return
+        partial = await self.epd.show_async(
+            rects, deepsleep_after_refresh=deepsleep_after_refresh
+        )
+        self._sent_frame(partial)
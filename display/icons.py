@@ -0,0 +1,97 @@
+# icons.py Run-length compressed 1-bit icons, e.g. the weather condition
+# icons named by OpenWeatherMap's weather[0].icon code ("01d", "10n", ...).
+# Icons are decoded straight into the target FrameBuffer as horizontal runs,
+# so no full-size bitmap is built. Build icon sets on the host with
+# tools/png_to_icons.py.
+
+# File layout (little endian):
+#   0  4s  magic b"RLEI"
+#   4  B   format version (1)
+#   5  B   number of icons n
+#   6  B   icon width
+#   7  B   icon height
+#   8      index: n entries of code (3s), offset (H), length (H); offsets are
+#          relative to the start of the run data
+#   then   run data. Each row is a sequence of run lengths in pixels,
+#          alternating background and foreground and starting with
+#          background, summing to the width. A run longer than 255 is split
+#          as 255, 0, remainder.
+
+# Released under the MIT license see LICENSE
+
+MAGIC = b"RLEI"
+VERSION = 1
+HEADER_SIZE = 8
+ENTRY_SIZE = 7
+
+
+# Draw run data at x, y. Only foreground runs are drawn; the background is
+# left as it is.
+def draw_rle(fb, data, x, y, width, color=1):
+    col = 0
+    fg = False
+    for run in data:
+        if fg and run:
+            fb.hline(x + col, y, run, color)
+        col += run
+        fg = not fg
+        if col >= width:
+            col = 0
+            fg = False
+            y += 1
+
+
+class IconSet:
+    def __init__(self, path):
+        self._file = f = open(path, "rb")
+        hdr = f.read(HEADER_SIZE)
+        if len(hdr) != HEADER_SIZE or hdr[:4] != MAGIC or hdr[4] != VERSION:
+            f.close()
+            raise ValueError("Not an icon set: {}".format(path))
+        n = hdr[5]
+        self.width = hdr[6]
+        self.height = hdr[7]
+        index = f.read(n * ENTRY_SIZE)
+        if len(index) != n * ENTRY_SIZE:
+            f.close()
+            raise ValueError("Truncated icon set: {}".format(path))
+        self._data = HEADER_SIZE + n * ENTRY_SIZE  # File offset of run data
+        self._index = {}  # code: (offset, length)
+        for i in range(0, len(index), ENTRY_SIZE):
+            e = index[i : i + ENTRY_SIZE]
+            self._index[e[:3].decode()] = (e[3] | e[4] << 8, e[5] | e[6] << 8)
+
+    def codes(self):
+        return sorted(self._index)
+
+    # Night icons fall back to the day ones if the set has no separate art.
+    def _entry(self, code):
+        entry = self._index.get(code)
+        if entry is None and code.endswith("n"):
+            entry = self._index.get(code[:-1] + "d")
+        return entry
+
+    def __contains__(self, code):
+        return self._entry(code) is not None
+
+    def get(self, code):
+        """Return the run data of an icon, or None if the set lacks it."""
+        entry = self._entry(code)
+        if entry is None:
+            return None
+        f = self._file
+        f.seek(self._data + entry[0])
+        return f.read(entry[1])
+
+    def draw(self, fb, code, x, y, color=1, clear=True):
+        """Draw an icon with its top left at x, y. Returns False if missing."""
+        data = self.get(code)
+        if data is None:
+            return False
+        if clear:
+            fb.fill_rect(x, y, self.width, self.height, 0 if color else 1)
+        draw_rle(fb, data, x, y, self.width, color)
+        return True
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,144 @@
+# layout.py Declarative text layout for the dashboard.
+# Regions split the screen; text slots place one string in a region with a
+# font, an alignment and a row offset. A slot keeps its last string, width and
+# column, so an unchanged value is neither measured nor drawn again, and a
+# changed one only redraws (and reports) its own rectangle. Text is drawn on
+# one line and cut to the region's width, so it never wraps or spills into a
+# neighbouring region.
+
+# Released under the MIT license see LICENSE
+
+from micropython import const
+
+LEFT = const(0)
+CENTRE = const(1)
+RIGHT = const(2)
+
+
+class Region:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+
+class TextSlot:
+    def __init__(self, writer, region, row, align=CENTRE):
+        self.writer = writer
+        self.region = region
+        # font-to-py fonts carry no baseline, so lines are anchored by the
+        # top of the glyph cell.
+        self.row = region.y + row
+        # Box limits: the region, clamped to the screen
+        self.x_end = min(region.x + region.width, writer.screenwidth)
+        y_end = min(region.y + region.height, writer.screenheight)
+        self.height = max(0, min(writer.font.height(), y_end - self.row))
+        self.align = align
+        self.text = None
+        self.shown = ""  # text as drawn: first line, cut to fit
+        self.col = region.x
+        self.width = 0
+
+    # Longest prefix of the first line of text no wider than room pixels.
+    def _fit(self, text, room):
+        nl = text.find("\n")
+        if nl >= 0:
+            text = text[:nl]
+        metrics = self.writer.metrics
+        width = self.writer.stringlen(text)
+        n = len(text)
+        while width > room and n:
+            n -= 1
+            width -= metrics.width(text[n])
+        return text[:n], width
+
+    def _place(self, text):
+        region = self.region
+        room = max(0, self.x_end - region.x)
+        self.text = text
+        self.shown, width = self._fit(text, room)
+        self.width = width
+        if self.align == LEFT:
+            self.col = region.x
+        elif self.align == RIGHT:
+            self.col = region.x + room - width
+        else:
+            self.col = region.x + (room - width) // 2
+
+    def draw(self):
+        if not self.height:
+            return
+        wri = self.writer
+        wri.reset(self.row, self.col)
+        wri.printstring(self.shown)
+
+    # Redraw with a new value. Return the rectangle covering the old and the
+    # new text, or None if the value is unchanged.
+    def update(self, fb, text):
+        if text == self.text:
+            return None
+        if self.text is None:
+            x0, x1 = 0x7FFF, -0x7FFF
+        else:
+            x0 = self.col
+            x1 = self.col + self.width
+            fb.fill_rect(x0, self.row, self.width, self.height, 0)
+        self._place(text)
+        self.draw()
+        x0 = min(x0, self.col)
+        x1 = max(x1, self.col + self.width)
+        return x0, self.row, x1 - x0, self.height
+
+
+class Layout:
+    def __init__(self, display):
+        self.display = display
+        self.fb = display.fb
+        self.sections = []  # [source, slots]
+        # Rectangles drawn since the last frame sent, None until the first
+        # full frame is out.
+        self.dirty = None
+
+    def section(self, region, source, lines, align=CENTRE):
+        """Add a region filled from source(), which returns one string per line.
+
+        lines is a sequence of (font, row) giving each line's font and its row
+        offset from the top of the region.
+        """
+        slots = [
+            TextSlot(self.display.writer(font), region, row, align)
+            for font, row in lines
+        ]
+        self.sections.append((source, slots))
+        return slots
+
+    def update(self):
+        """Draw changed slots. Return the dirty rectangles, or None to send
+        the whole frame (show(full=True))."""
+        fb = self.fb
+        if self.dirty is None:
+            fb.fill(0)
+        dirty = self.dirty
+        for source, slots in self.sections:
+            texts = source()
+            for slot, text in zip(slots, texts):
+                if dirty is None:
+                    slot._place(text)
+                    slot.draw()
+                else:
+                    rect = slot.update(fb, text)
+                    if rect is not None:
+                        dirty.append(rect)
+        return dirty
+
+    def sent(self):
+        """Call once the frame returned by update() is on the panel."""
+        self.dirty = []
+
+    def invalidate(self):
+        """Force a full redraw on the next update()."""
+        self.dirty = None
+        for _, slots in self.sections:
+            for slot in slots:
+                slot.text = None
@@ -25,6 +25,7 @@ import framebuf
 from uctypes import bytearray_at, addressof
 from sys import implementation
 import os
+from display.font_metrics import FontMetrics
 
 __version__ = (0, 5, 1)
 
@@ -37,10 +38,81 @@ class DisplayState:
         self.text_col = 0
 
 
+# Bounded cache of ready-to-blit glyph FrameBuffers, shared by all Writers.
+# Keyed by (font, char, clip_width, invert). Least recently used entries are
+# evicted once the bitmaps (plus a per-entry allowance) exceed max_bytes.
+class GlyphCache:
+    ENTRY_OVERHEAD = 48  # Approximate heap cost of the FrameBuffer and key
+    ITEMS = "glyphs"  # Label for stats()
+
+    def __init__(self, max_bytes=6144):
+        self.max_bytes = max_bytes
+        self._entries = {}  # key: [FrameBuffer, cost, last use]
+        self._tick = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tick += 1
+        entry[2] = self._tick
+        return entry[0]
+
+    def put(self, key, fbc, nbytes):
+        cost = nbytes + self.ENTRY_OVERHEAD
+        if cost > self.max_bytes:
+            return
+        entries = self._entries
+        while self.bytes + cost > self.max_bytes:
+            lru = min(entries, key=lambda k: entries[k][2])
+            self.bytes -= entries.pop(lru)[1]
+            self.evictions += 1
+        self._tick += 1
+        entries[key] = [fbc, cost, self._tick]
+        self.bytes += cost
+
+    def clear(self):
+        self._entries = {}
+        self.bytes = 0
+
+    def stats(self):
+        return "{}={} bytes={} hits={} misses={} evictions={}".format(
+            self.ITEMS,
+            len(self._entries),
+            self.bytes,
+            self.hits,
+            self.misses,
+            self.evictions,
+        )
+
+
+# Words (with their trailing spaces) pre-rendered into one FrameBuffer strip,
+# so a recurring label, day or city name is drawn with a single blit. Keyed by
+# (font, run, invert); values are (FrameBuffer, width). blits_saved counts the
+# per-glyph blits that hits replaced.
+class RunCache(GlyphCache):
+    ITEMS = "runs"
+
+    def __init__(self, max_bytes=4096):
+        super().__init__(max_bytes)
+        self.blits_saved = 0
+
+    def stats(self):
+        return "{} blits_saved={}".format(super().stats(), self.blits_saved)
+
+
 # Basic Writer class for monochrome displays
 class Writer:
 
     state = {}  # Holds a display state for each device
+    glyph_cache = GlyphCache()  # Rendered glyphs, shared by all instances
+    run_cache = RunCache()  # Rendered words. None disables.
 
     @staticmethod
     def _get_id(device):
@@ -63,6 +135,7 @@ class Writer:
         if self.devid not in Writer.state:
             Writer.state[self.devid] = DisplayState()
         self.font = font
+        self.metrics = FontMetrics.of(font)  # Width table, built once per font
         if font.height() >= device.height or font.max_width() >= device.width:
             raise ValueError("Font too large for screen")
         # Allow to work with reverse or normal font mapping
@@ -96,6 +169,13 @@ class Writer:
     def _getstate(self):
         return Writer.state[self.devid]
 
+    # Cheap reset so one instance can be reused across frames: text position
+    # and tab column only, the font checks done by __init__ still hold.
+    def reset(self, row=0, col=0):
+        self.cpos = 0
+        self.glyph = None
+        return self.set_textpos(row, col)
+
     def _newline(self):
         s = self._getstate()
         height = self.font.height()
@@ -133,63 +213,157 @@ class Writer:
                 self._printchar("\n")
 
     def _printline(self, string, invert):
-        rstr = None
-        if self.wrap and self.stringlen(string, True):  # Length > self.screenwidth
-            pos = 0
-            lstr = string[:]
-            while self.stringlen(lstr, True):  # Length > self.screenwidth
-                pos = lstr.rfind(" ")
-                lstr = lstr[:pos].rstrip()
-            if pos > 0:
-                rstr = string[pos + 1 :]
-                string = lstr
-
-        for char in string:
-            self._printchar(char, invert)
-        if rstr is not None:
+        if Writer.run_cache is not None and self._printruns(string, invert):
+            return
+        start = 0
+        while True:
+            brk = self._wrap(string, start, self._getstate().text_col)
+            end = len(string) if brk is None else brk[0]
+            for n in range(start, end):
+                self._printchar(string[n], invert)
+            if brk is None:
+                return
             self._printchar("\n")
-            self._printline(rstr, invert)  # Recurse
+            start = brk[1]
+
+    # Print a line one word at a time from RunCache strips. Only for text
+    # that fits where it starts, so no wrap, clip or scroll can occur; returns
+    # False, having drawn nothing, otherwise.
+    def _printruns(self, string, invert):
+        if "\t" in string:
+            return False
+        s = self._getstate()
+        if s.text_row + self.font.height() > self.screenheight:
+            return False
+        if s.text_col + self.metrics.text_width(string) > self.screenwidth:
+            return False
+        n = len(string)
+        start = 0
+        while start < n:
+            end = string.find(" ", start)
+            if end < 0:
+                end = n
+            while end < n and string[end] == " ":
+                end += 1
+            if end - start == 1:
+                self._printchar(string[start], invert)
+            else:
+                self._printrun(string[start:end], invert)
+            start = end
+        return True
+
+    def _printrun(self, run, invert):
+        cache = Writer.run_cache
+        key = (self.font, run, invert)
+        entry = cache.get(key)
+        if entry is None:
+            entry, nbytes = self._render_run(run, invert)
+            cache.put(key, entry, nbytes)
+        else:
+            cache.blits_saved += len(run) - 1
+        fbr, width = entry
+        s = self._getstate()
+        self.device.blit(fbr, s.text_col, s.text_row)
+        s.text_col += width
+        self.cpos += len(run)
+
+    def _render_run(self, run, invert):
+        width = self.metrics.text_width(run)
+        height = self.font.height()
+        buf = bytearray(((width + 7) >> 3) * height)
+        fbr = framebuf.FrameBuffer(buf, width, height, self.map)
+        char_w = self.metrics.width
+        x = 0
+        for char in run:
+            char_width = char_w(char)
+            fbr.blit(self._glyph_fb(char, char_width, height, invert), x, 0)
+            x += char_width
+        return (fbr, width), len(buf)
+
+    # Lay out string as printstring() would, starting from column col (default
+    # the current text column), without drawing. Returns [(text, width), ...]
+    # with one entry per output line.
+    def measure_lines(self, string, col=None):
+        sc = self._getstate().text_col if col is None else col
+        lines = []
+        for s in string.split("\n"):
+            start = 0
+            while True:
+                brk = self._wrap(s, start, sc)
+                line = s[start : len(s) if brk is None else brk[0]]
+                lines.append((line, self.metrics.text_width(line)))
+                sc = 0  # Continuation lines start at the left margin
+                if brk is None:
+                    break
+                start = brk[1]
+        return lines
+
+    # Word wrap for string[start:] printed from column sc. Returns None if it
+    # fits (or has no usable break), else (end, resume): print up to end, go
+    # to a new line and continue from resume, past the spaces. Breaks at the
+    # last space run whose preceding text fits, in one pass over the widths.
+    def _wrap(self, string, start, sc):
+        if not self.wrap:
+            return None
+        width = self.metrics.width
+        room = self.screenwidth - sc
+        n = len(string)
+        brk = None
+        w = 0  # Width of string[start:i]
+        wend = -1  # Index of the last non-space character seen
+        wprev = 0  # Width of string[start:wend]
+        i = start
+        while i < n:
+            char = string[i]
+            if char != " ":
+                wprev = w
+                wend = i
+                w += width(char)
+                i += 1
+                continue
+            j = i  # Find the end of this run of spaces
+            while j + 1 < n and string[j + 1] == " ":
+                j += 1
+            if wend >= start and not self._fits(wprev, string[wend], room):
+                return brk  # Wider lines only get longer
+            brk = (max(wend + 1, start), j + 1) if j > start else None
+            while i <= j:
+                w += width(string[i])
+                i += 1
+        if n > start and self._fits(w - width(string[-1]), string[-1], room):
+            return None
+        return brk
+
+    # True if text of width wexcl followed by char fits in room pixels. As
+    # stringlen(oh=True), blank columns on the right of char don't count.
+    def _fits(self, wexcl, char, room):
+        return wexcl + self.metrics.width(char) <= room or (
+            wexcl + self._truelen(char) <= room
+        )
 
     def stringlen(self, string, oh=False):
         if not len(string):
             return 0
+        metrics = self.metrics
+        l = metrics.text_width(string)
+        if not oh:
+            return l  # Public method. Return same value as old code.
         sc = self._getstate().text_col  # Start column
         wd = self.screenwidth
-        l = 0
-        for char in string[:-1]:
-            _, _, char_width = self.font.get_ch(char)
-            l += char_width
-            if oh and l + sc > wd:
-                return True  # All done. Save time.
         char = string[-1]
-        _, _, char_width = self.font.get_ch(char)
-        if oh and l + sc + char_width > wd:
+        char_width = metrics.width(char)
+        l -= char_width
+        if l + sc > wd:
+            return True  # All done. Save time.
+        if l + sc + char_width > wd:
             l += self._truelen(char)  # Last char might have blank cols on RHS
         else:
-            l += char_width  # Public method. Return same value as old code.
-        return l + sc > wd if oh else l
+            l += char_width
+        return l + sc > wd
 
     # Return the printable width of a glyph less any blank columns on RHS
     def _truelen(self, char):
-        glyph, ht, wd = self.font.get_ch(char)
-        div, mod = divmod(wd, 8)
-        gbytes = div + 1 if mod else div  # No. of bytes per row of glyph
-        mc = 0  # Max non-blank column
-        data = glyph[(wd - 1) // 8]  # Last byte of row 0
-        for row in range(ht):  # Glyph row
-            for col in range(wd - 1, -1, -1):  # Glyph column
-                gbyte, gbit = divmod(col, 8)
-                if gbit == 0:  # Next glyph byte
-                    data = glyph[row * gbytes + gbyte]
-                if col <= mc:
-                    break
-                if data & (1 << (7 - gbit)):  # Pixel is lit (1)
-                    mc = col  # Eventually gives rightmost lit pixel
-                    break
-            if mc + 1 == wd:
-                break  # All done: no trailing space
-        # print('Truelen', char, wd, mc + 1)  # TEST
-        return mc + 1
+        return self.metrics.truelen(char)
 
     def _get_char(self, char, recurse):
         if not recurse:  # Handle tabs
@@ -209,7 +383,10 @@ class Writer:
         if char == "\n":
             self._newline()
             return
-        glyph, char_height, char_width = self.font.get_ch(char)
+        # Widths come from the metrics table; the bitmap is only read from
+        # the font on a glyph cache miss.
+        char_height = self.font.height()
+        char_width = self.metrics.width(char)
         s = self._getstate()
         np = None  # Allow restriction on printable columns
         if s.text_row + char_height > self.screenheight:
@@ -224,7 +401,7 @@ class Writer:
                     return
             else:
                 self._newline()
-        self.glyph = glyph
+        self.glyph = char
         self.char_height = char_height
         self.char_width = char_width
         self.clip_width = char_width if np is None else np
@@ -236,15 +413,23 @@ class Writer:
         self._get_char(char, recurse)
         if self.glyph is None:
             return  # All done
-        buf = bytearray(self.glyph)
-        if invert:
-            for i, v in enumerate(buf):
-                buf[i] = 0xFF & ~v
-        fbc = framebuf.FrameBuffer(buf, self.clip_width, self.char_height, self.map)
+        fbc = self._glyph_fb(char, self.clip_width, self.char_height, invert)
         self.device.blit(fbc, s.text_col, s.text_row)
         s.text_col += self.char_width
         self.cpos += 1
 
+    def _glyph_fb(self, char, clip_width, char_height, invert):
+        key = (self.font, char, clip_width, invert)
+        fbc = Writer.glyph_cache.get(key)
+        if fbc is None:
+            buf = bytearray(self.font.get_ch(char)[0])
+            if invert:
+                for i, v in enumerate(buf):
+                    buf[i] = 0xFF & ~v
+            fbc = framebuf.FrameBuffer(buf, clip_width, char_height, self.map)
+            Writer.glyph_cache.put(key, fbc, len(buf))
+        return fbc
+
     def tabsize(self, value=None):
         if value is not None:
             self.tab = value
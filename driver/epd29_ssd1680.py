@@ -18,11 +18,18 @@
 
 import framebuf
 import asyncio
+from array import array
 from micropython import const
-from time import sleep_ms, sleep_us, ticks_ms, ticks_us, ticks_diff
+from time import sleep_ms, sleep_us, ticks_ms, ticks_diff
 from display.boolpalette import BoolPalette
 from machine import lightsleep, Pin
 
+# BUSY rises a few us after a command: don't sample it before this.
+_BUSY_SETTLE_US = const(500)
+# Blocking waits sleep this long between checks: one FreeRTOS tick on the
+# ESP32, during which the task is blocked rather than spinning.
+_BUSY_POLL_MS = const(10)
+
 
 class TimeoutError(Exception):
     def __init__(self, msg):
@@ -36,7 +43,9 @@ class EPD(framebuf.FrameBuffer):
         return int((r > 127) or (g > 127) or (b > 127))
 
     # Discard asyn: autodetect
-    def __init__(self, spi, cs, dc, rst_pin, busy, landscape=True):
+    # busy_irq: wait for the falling edge of BUSY via a pin interrupt rather
+    # than polling it every 100ms.
+    def __init__(self, spi, cs, dc, rst_pin, busy, landscape=True, busy_irq=True):
         self._spi = spi
         self._cs = cs  # Pins
         self._dc = dc
@@ -44,11 +53,22 @@ class EPD(framebuf.FrameBuffer):
         self._rst_pin = rst_pin
         self._busy = busy  # Pin High if Busy
         self._lsc = landscape
-        # ._as_busy is set immediately on start of task. Cleared
-        # when busy pin is physically 0.
-        self._as_busy = False
+        # Refresh started by show_async() and not finished yet:
+        # (windows, deepsleep_after_refresh). The completion task finishes
+        # it, or the next show_async() if that task's event loop ended
+        # first; a blocking show waits for it and sends a full frame.
+        self._pending = None
+        self._task = None  # Completion task of the last show_async()
+        # updated: frame is in controller RAM, the buffer may be redrawn.
+        # complete: the panel has finished refreshing.
         self.updated = asyncio.Event()
         self.complete = asyncio.Event()
+        # Set from the BUSY falling-edge interrupt.
+        self._busy_flag = asyncio.ThreadSafeFlag()
+        self._busy_fell = False  # The same edge, for blocking waits
+        self._busy_irq = busy_irq
+        if busy_irq:
+            busy.irq(handler=self._on_busy_fall, trigger=Pin.IRQ_FALLING)
         # Public bound variables required by nanogui.
         # Dimensions in pixels as seen by nanogui (landscape mode).
         self.width = 296 if landscape else 128
@@ -56,9 +76,28 @@ class EPD(framebuf.FrameBuffer):
         # Other public bound variable.
         # Special mode enables demos written for generic displays to run.
         self.demo_mode = False
+        # Keep the 0x26 RAM in step on full refreshes so partial refreshes can
+        # follow. Clear it when only full refreshes are used to halve the SPI
+        # traffic of each frame.
+        self.partial_refresh = True
 
         self._buffer = bytearray(self.height * self.width // 8)
         self._mvb = memoryview(self._buffer)
+        # Rotated and inverted copy of the frame, uploaded in one SPI write.
+        self._obuf = bytearray(len(self._buffer))
+        # Framebuffer offsets of one output column (landscape only): byte rows
+        # bottom to top. Adding the column index gives the source bytes.
+        self._column = self._column_offsets() if landscape else None
+        # Controller RAM geometry: gate lines, and bytes of 8 sources per line.
+        self._lines = self.width if landscape else self.height
+        self._lbytes = len(self._buffer) // self._lines
+        # True once both RAM banks hold the displayed image (partial refresh
+        # diffs new data in 0x24 against old data in 0x26).
+        self._ram_synced = False
+        # Metrics for the last refresh.
+        self.transfer_bytes = 0  # SPI payload bytes
+        self.refresh_ms = 0  # Time the panel was busy
+        self._refresh_start = 0
         mode = framebuf.MONO_VLSB if landscape else framebuf.MONO_HLSB
         self.palette = BoolPalette(mode)
         super().__init__(self._buffer, self.width, self.height, mode)
@@ -71,10 +110,9 @@ class EPD(framebuf.FrameBuffer):
         if data is not None:
             self._data(data)
 
-    def _data(self, data, buf1=bytearray(1)):
-        for b in data:
-            buf1[0] = b
-            self._spi.write(buf1)
+    def _data(self, data):
+        self._spi.write(data)
+        self.transfer_bytes += len(data)
 
     def hw_reset(self):
         self._rst(1)
@@ -82,8 +120,18 @@ class EPD(framebuf.FrameBuffer):
         self._rst(0)
         sleep_ms(200)
         self._rst(1)
+        self._ram_synced = False
         self.wait_until_ready()
 
+    async def _hw_reset_async(self):
+        self._rst(1)
+        await asyncio.sleep_ms(200)
+        self._rst(0)
+        await asyncio.sleep_ms(200)
+        self._rst(1)
+        self._ram_synced = False
+        await self.wait_until_ready_async()
+
     def init(self):
         # Hardware reset
         self.hw_reset()
@@ -132,61 +180,144 @@ class EPD(framebuf.FrameBuffer):
         self.wait_until_ready()
         # print('Init Done.')
 
+    def _on_busy_fall(self, _):
+        self._busy_fell = True
+        self._busy_flag.set()
+
     # For use in synchronous code: blocking wait on ready state.
+    # With the interrupt enabled the task sleeps a tick at a time until the
+    # handler has seen BUSY fall, so the end of a refresh is noticed within
+    # _BUSY_POLL_MS instead of up to 100ms later.
     def wait_until_ready(self):
+        if self._busy_irq:
+            self._busy_fell = False
+            sleep_us(_BUSY_SETTLE_US)
+            # The pin check covers an edge before the flag was cleared
+            while not self._busy_fell and self._busy() == 1:
+                sleep_ms(_BUSY_POLL_MS)
+            return
         sleep_ms(50)
         while not self.ready():
             sleep_ms(100)
 
+    # For use in asyncio code: yields to other tasks until BUSY falls.
+    async def wait_until_ready_async(self):
+        if not self._busy_irq:
+            await asyncio.sleep_ms(50)
+            while self._busy() == 1:
+                await asyncio.sleep_ms(100)
+            return
+        sleep_us(_BUSY_SETTLE_US)
+        # A stale flag from an earlier edge only costs one extra pin check.
+        while self._busy() == 1:
+            await self._busy_flag.wait()
+
     # Return immediate status. Pin state: 1 == busy.
     def ready(self):
-        return not (self._as_busy or (self._busy() == 1))
+        return self._busy() == 0
 
-    # draw the current frame memory.
-    def show(
-        self,
-        buf1=bytearray(1),
-        fast_refresh=False,  # USELESS for this driver, doesn't work well at all
-        deepsleep_after_refresh=False,
-        lightsleep_while_waiting_for_refresh=False,
-    ):
-        if not self.ready():
-            # Hardware reset to exit deep sleep mode
-            self.hw_reset()
+    # Finish the show_async() refresh once BUSY has fallen; called after
+    # waiting for it. Returns False while that refresh is still running.
+    def _settle(self):
+        pending = self._pending
+        if pending is None:
+            return True
+        if self._busy() == 1:
+            return False
+        self._pending = None
+        self.refresh_ms = ticks_diff(ticks_ms(), self._refresh_start)
+        windows, deepsleep_after_refresh = pending
+        if windows is None:
+            self._finish_full(deepsleep_after_refresh)
+        else:
+            self._finish_partial(windows, deepsleep_after_refresh)
+        return True
 
-        mvb = self._mvb
-        cmd = self._command
-        dat = self._data
+    # Blocking wait for a refresh show_async() left running because its
+    # event loop ended first. It is not finished here, so the old image RAM
+    # is stale and the next refresh is a full one.
+    def _wait_pending(self):
+        if self._pending is not None:
+            self.wait_until_ready()
+            self._pending = None
+            self._ram_synced = False
+
+    # Landscape transpose: controller RAM is filled column-major, bottom byte
+    # row first. The order only depends on the dimensions so compute it once.
+    def _column_offsets(self):
+        wid = self.width
+        tbc = self.height // 8  # Vertical bytes per column
+        return array("H", (wid * (tbc - 1 - k) for k in range(tbc)))
 
-        cmd(b"\x24")
+    # Gather (landscape only) and invert the framebuffer into the output buffer.
+    def _prepare_frame(self):
+        mvb = self._mvb
+        obuf = self._obuf
         if self._lsc:  # Landscape mode
-            wid = self.width
-            tbc = self.height // 8  # Vertical bytes per column
-            iidx = wid * (tbc - 1)  # Initial index
-            idx = iidx  # Index into framebuf
-            vbc = 0  # Current vertical byte count
-            hpc = 0  # Horizontal pixel count
-            for _ in range(len(mvb)):
-                buf1[0] = ~mvb[idx]
-                dat(buf1)
-                idx -= wid
-                vbc += 1
-                vbc %= tbc
-                if not vbc:
-                    hpc += 1
-                    idx = iidx + hpc
+            column = self._column
+            i = 0
+            for hpc in range(self.width):  # Horizontal pixel count
+                for off in column:
+                    obuf[i] = mvb[off + hpc] ^ 0xFF
+                    i += 1
         else:
-            for b in mvb:
-                buf1[0] = ~b
-                dat(buf1)
+            for i, b in enumerate(mvb):
+                obuf[i] = b ^ 0xFF
 
-        if fast_refresh:
-            cmd(b"\x22", b"\xff")
-        else:
-            cmd(b"\x22", b"\xf7")
+    # As _prepare_frame for RAM lines l0..l1-1, bytes k0..k1-1 of each line.
+    # Data is packed into the output buffer from offset n; returns the new end.
+    def _prepare_window(self, n, l0, l1, k0, k1):
+        mvb = self._mvb
+        obuf = self._obuf
+        column = self._column
+        lb = self._lbytes
+        for line in range(l0, l1):
+            if column is None:
+                base = line * lb
+                for i in range(base + k0, base + k1):
+                    obuf[n] = mvb[i] ^ 0xFF
+                    n += 1
+            else:  # Line is a framebuffer column
+                for k in range(k0, k1):
+                    obuf[n] = mvb[column[k] + line] ^ 0xFF
+                    n += 1
+        return n
+
+    # Map a framebuffer rectangle to a RAM window (l0, l1, k0, k1), clipped
+    # to the panel and widened to whole bytes.
+    def _rect_window(self, x, y, w, h):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        if self._lsc:  # Lines run along x, byte 0 is the bottom byte row
+            lb = self._lbytes
+            return x0, x1, lb - (y1 + 7) // 8, lb - y0 // 8
+        return y0, y1, x0 // 8, (x1 + 7) // 8
+
+    # Restrict RAM writes to a window and move the address counters to its
+    # start. Y addresses decrement (data entry mode 0x01).
+    def _set_window(self, l0, l1, k0, k1):
+        cmd = self._command
+        ys = self._lines - 1 - l0
+        ye = self._lines - l1
+        cmd(b"\x44", bytes((k0, k1 - 1)))
+        cmd(b"\x45", bytes((ys & 0xFF, ys >> 8, ye & 0xFF, ye >> 8)))
+        cmd(b"\x4e", bytes((k0,)))
+        cmd(b"\x4f", bytes((ys & 0xFF, ys >> 8)))
+
+    def _start_refresh(self, mode):
+        cmd = self._command
+        cmd(b"\x22", mode)
         sleep_us(20)
+        self._refresh_start = ticks_ms()
         cmd(b"\x20")  # DISPLAY_REFRESH
 
+    def _refresh(self, mode, lightsleep_while_waiting_for_refresh):
+        self._start_refresh(mode)
+
         if lightsleep_while_waiting_for_refresh:
             # set Pin hold=True is needed before entering lightsleep and after you must revert it back to hold=False
             # without this, entering lightsleep results in a low state on the reset pin, and this resets the driver
@@ -195,7 +326,139 @@ class EPD(framebuf.FrameBuffer):
             self._rst = Pin(self._rst_pin, Pin.OUT, value=1, hold=False)
 
         self.wait_until_ready()
+        self.refresh_ms = ticks_diff(ticks_ms(), self._refresh_start)
+
+    def _sleep(self, deepsleep_after_refresh):
         if deepsleep_after_refresh:
-            cmd(b"\x10", b"\x01")
+            self._command(b"\x10", b"\x01")
+            self._ram_synced = False  # RAM is not retained in deep sleep
+        else:
+            self._command(b"\x10", b"\x00")
+
+    # Load the whole frame into RAM. With partial refresh enabled the
+    # "previous image" bank gets it too so that later partial refreshes diff
+    # against what is displayed.
+    def _upload_full(self):
+        cmd = self._command
+        self.transfer_bytes = 0
+        self.updated.clear()
+        self.complete.clear()
+
+        self._prepare_frame()
+        full = (0, self._lines, 0, self._lbytes)
+        self._set_window(*full)
+        cmd(b"\x24", self._obuf)
+        if self.partial_refresh:
+            self._set_window(*full)
+            cmd(b"\x26", self._obuf)
+        cmd(b"\x21", b"\x40\x80")  # Full update ignores the 0x26 RAM
+        self.updated.set()
+
+    def _finish_full(self, deepsleep_after_refresh):
+        self._ram_synced = self.partial_refresh
+        self._sleep(deepsleep_after_refresh)
+        self.complete.set()
+
+    # Load the rectangles [(x, y, w, h), ...] into the new image RAM. Returns
+    # the windows and where their data sits in the output buffer.
+    def _upload_partial(self, rects):
+        cmd = self._command
+        self.transfer_bytes = 0
+        self.updated.clear()
+        self.complete.clear()
+
+        windows = []
+        n = 0
+        for rect in rects:
+            win = self._rect_window(*rect)
+            if win is not None:
+                start = n
+                n = self._prepare_window(n, *win)
+                windows.append((win, start, n))
+        mvo = memoryview(self._obuf)
+
+        for win, start, end in windows:
+            self._set_window(*win)
+            cmd(b"\x24", mvo[start:end])
+        cmd(b"\x21", b"\x00\x80")  # Differential update against 0x26 RAM
+        self.updated.set()
+        return windows
+
+    def _finish_partial(self, windows, deepsleep_after_refresh):
+        # Old image RAM now has to match what is displayed.
+        cmd = self._command
+        mvo = memoryview(self._obuf)
+        for win, start, end in windows:
+            self._set_window(*win)
+            cmd(b"\x26", mvo[start:end])
+        self._sleep(deepsleep_after_refresh)
+        self.complete.set()
+
+    # draw the current frame memory.
+    def show(
+        self,
+        deepsleep_after_refresh=False,
+        lightsleep_while_waiting_for_refresh=False,
+    ):
+        self._wait_pending()
+        if not self.ready():
+            # Hardware reset to exit deep sleep mode
+            self.hw_reset()
+
+        self._upload_full()
+        self._refresh(b"\xf7", lightsleep_while_waiting_for_refresh)
+        self._finish_full(deepsleep_after_refresh)
+
+    # Partial refresh of the given framebuffer rectangles [(x, y, w, h), ...].
+    # Only the bytes inside the rectangles are sent and the panel runs the
+    # differential waveform, so unchanged pixels do not flash. Ghosting builds
+    # up over time: callers should run a full show() every few cycles.
+    # Falls back to a full refresh when RAM does not hold the displayed image
+    # (after reset or deep sleep); returns False in that case.
+    def show_partial(
+        self,
+        rects,
+        deepsleep_after_refresh=False,
+        lightsleep_while_waiting_for_refresh=False,
+    ):
+        self._wait_pending()
+        if not (self._ram_synced and self.ready()):
+            self.show(deepsleep_after_refresh, lightsleep_while_waiting_for_refresh)
+            return False
+
+        windows = self._upload_partial(rects)
+        self._refresh(b"\xfc", lightsleep_while_waiting_for_refresh)
+        self._finish_partial(windows, deepsleep_after_refresh)
+        return True
+
+    # Non-blocking show for asyncio code. Returns as soon as the frame is in
+    # controller RAM (self.updated is set), so the buffer can be redrawn while
+    # the panel refreshes; self.complete is set when the refresh is done.
+    # rects as for show_partial(), None for a full refresh. Returns True if a
+    # partial refresh was started.
+    async def show_async(self, rects=None, deepsleep_after_refresh=False):
+        if self._pending is not None:  # Previous refresh still running
+            task = self._task
+            if task is not None and not task.done():
+                await self.complete.wait()
+            else:  # Its event loop ended before it did
+                await self.wait_until_ready_async()
+                self._settle()
+        if self._busy() == 1:
+            # Hardware reset to exit deep sleep mode
+            await self._hw_reset_async()
+
+        partial = rects is not None and self._ram_synced
+        if partial:
+            windows = self._upload_partial(rects)
         else:
-            cmd(b"\x10", b"\x00")
+            windows = None
+            self._upload_full()
+        self._pending = (windows, deepsleep_after_refresh)
+        self._start_refresh(b"\xfc" if partial else b"\xf7")
+        self._task = asyncio.create_task(self._complete_async())
+        return partial
+
+    async def _complete_async(self):
+        await self.wait_until_ready_async()
+        self._settle()
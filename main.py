@@ -1,3 +1,4 @@
+import asyncio
 import gc
 import time
 import machine
@@ -5,19 +6,39 @@ import sys
 import framebuf
 
 from display.display import EPaperDisplay
+from display.layout import Layout, Region
+from display.writer import Writer
 from widgets.clock import Clock
 from widgets.weather import WeatherAPI
 from widgets.pihole_stats import PiholeStats
 from widgets.website_views import WebsiteStats
 from widgets.network_manager import NetworkManager
+from widgets.http_client import HTTPClient
 import config
-from display.writer import Writer
-from fonts import freesans14, freesans17, freesans20
+import metrics
+from display.bin_font import BinFont
+
+
+def load_font(name):
+    """Open fonts/<name>_subset.bin, built by tools/font_subset.py, if it was
+    uploaded, else the full fonts/<name>.bin."""
+    try:
+        return BinFont(f"fonts/{name}_subset.bin")
+    except OSError:
+        return BinFont(f"fonts/{name}.bin")
+
+
+# Glyphs are read from flash on demand; regenerate the .bin files with
+# tools/font_to_bin.py (or tools/font_subset.py) after changing a font module.
+freesans14 = load_font("freesans14")
+freesans17 = load_font("freesans17")
+freesans20 = load_font("freesans20")
 
 
 class Dashboard:
     def __init__(self):
         self.DISPLAY_UPDATE_INTERVAL = 300  # 5 minutes in seconds
+        self.HTTP_CONCURRENCY = 2  # Requests in flight at once
 
         print("Initializing display...")
         self.display = EPaperDisplay()
@@ -27,6 +48,9 @@ class Dashboard:
             config.Network_Config.WIFI_SSID, config.Network_Config.WIFI_PASSWORD
         )
 
+        # Shared by the widgets; requests beyond the cap wait their turn
+        self.http = HTTPClient(max_concurrent=self.HTTP_CONCURRENCY, timeout=10)
+
         print("Setting up clock...")
         self.clock = Clock(
             timezone_offset=config.Time_Config.TIMEZONE_OFFSET,
@@ -38,12 +62,14 @@ class Dashboard:
             api_key=config.Weather_Config.API_KEY,
             city_id=config.Weather_Config.CITY_ID,
             update_interval=self.DISPLAY_UPDATE_INTERVAL,
+            http=self.http,
         )
 
         print("Setting up website stats client...")
         self.website = WebsiteStats(
             api_url=config.Website_Config.API_URL,
             update_interval=self.DISPLAY_UPDATE_INTERVAL,
+            http=self.http,
         )
 
         print("Setting up Pi-hole client...")
@@ -51,173 +77,154 @@ class Dashboard:
             pihole_ip=config.Pihole_Config.PIHOLE_IP,
             password=config.Pihole_Config.PIHOLE_PASSWORD,
             update_interval=3600,
+            http=self.http,
+            session_file=getattr(
+                config.Pihole_Config, "SESSION_FILE", "pihole_session.json"
+            ),
         )
 
+        self._setup_metrics()
+
         self.last_refresh_time = 0
         self.width = self.display.width
         self.height = self.display.height
 
-        # Define layout regions
-        self.top_section_height = self.height // 2
-        self.bottom_section_height = self.height - self.top_section_height
-        self.left_section_width = self.width // 2
-        self.right_section_width = self.width - self.left_section_width
+        # Quadrants: time and website views on the left, weather and Pi-hole
+        # on the right. Each text line is a slot (font, row within region).
+        top_h = self.height // 2
+        left_w = self.width // 2
+        top_left = Region(0, 0, left_w, top_h)
+        top_right = Region(left_w, 0, self.width - left_w, top_h)
+        bottom_left = Region(0, top_h, left_w, self.height - top_h)
+        bottom_right = Region(left_w, top_h, self.width - left_w, self.height - top_h)
+
+        self.layout = Layout(self.display)
+        self.layout.section(
+            top_left,
+            self.clock.get_time_for_display,
+            ((freesans20, 10), (freesans14, 35)),
+        )
+        self.layout.section(
+            top_right,
+            self.weather.get_formatted_display,
+            ((freesans20, 10), (freesans14, 35)),
+        )
+        self.layout.section(
+            bottom_left,
+            self.get_website_for_display,
+            ((freesans20, 10), (freesans17, 35)),
+        )
+        self.layout.section(
+            bottom_right,
+            self.pihole.get_stats_for_display,
+            ((freesans17, 10), (freesans17, 35)),
+        )
+
+    def _setup_metrics(self):
+        """Enable per-cycle metrics if config.py has a Metrics_Config."""
+        cfg = getattr(config, "Metrics_Config", None)
+        if cfg is None or not getattr(cfg, "ENABLED", False):
+            return
+        sinks = []
+        if getattr(cfg, "UART", None) is not None:
+            # UART id, or -1 for the REPL console
+            uart = sys.stdout if cfg.UART < 0 else machine.UART(cfg.UART, 115200)
+            sinks.append(metrics.UartSink(uart))
+        if getattr(cfg, "FILE", None):
+            sinks.append(metrics.FileSink(cfg.FILE))
+        if getattr(cfg, "UDP_HOST", None):
+            sinks.append(metrics.UdpSink(cfg.UDP_HOST, getattr(cfg, "UDP_PORT", 8094)))
+        metrics.enable(getattr(cfg, "HISTORY", metrics.HISTORY), sinks)
+        print(f"Metrics enabled, {len(sinks)} sink(s)")
 
     def connect_network(self):
         """Connect to Wi-Fi."""
-        return self.network.connect()
+        with metrics.timer(metrics.WIFI):
+            return self.network.connect()
 
     def update_data(self):
         """Try to data update."""
-        success = True
-
-        if not self.network.is_connected():
-            if not self.connect_network():
-                print("Failed to connect to network")
-                return False
-
-        try:
-            self.clock.update_time()
-        except Exception as e:
-            print(f"Error updating time: {e}")
-            sys.print_exception(e)
-            success = False
+        return asyncio.run(self.update_data_async())
 
+    async def _update(self, name, field, update):
         try:
-            self.weather.update_weather()
+            with metrics.timer(field):
+                await update()
+            return True
         except Exception as e:
-            print(f"Error updating weather: {e}")
+            print(f"Error updating {name}: {e}")
             sys.print_exception(e)
-            success = False
+            return False
 
-        try:
-            self.pihole.update_stats()
-        except Exception as e:
-            print(f"Error updating Pi-hole stats: {e}")
-            sys.print_exception(e)
-            success = False
+    async def update_data_async(self):
+        """Fetch all widgets' data concurrently, then turn Wi-Fi off."""
+        if not self.network.is_connected():
+            if not self.connect_network():
+                print("Failed to connect to network")
+                return False
 
-        try:
-            wdt = machine.WDT(timeout=30000)
-            self.website.update_views()
-            wdt.feed()
-        except Exception as e:
-            print(f"Error updating website views: {e}")
-            sys.print_exception(e)
-            success = False
-
-        return success
-
-    def render_time_section(self):
-        """Render date and time section data."""
-        time_str, date_str = self.clock.get_time_for_display()
-
-        w_time = Writer(self.display.fb, freesans20)
-        time_width_main = w_time.stringlen(time_str)
-        left_section_width = self.width - self.right_section_width
-        x_time = (left_section_width - time_width_main) // 2
-        w_time.set_textpos(10, x_time)
-        w_time.printstring(time_str)
-
-        w_date = Writer(self.display.fb, freesans14)
-        date_width_main = w_date.stringlen(date_str)
-        x_date = (left_section_width - date_width_main) // 2
-        w_date.set_textpos(35, x_date)
-        w_date.printstring(date_str)
-
-    def render_weather_section(self):
-        """Render weather section data."""
-
-        weather_main, weather_details = self.weather.get_formatted_display()
-
-        w_main = Writer(self.display.fb, freesans20)
-        text_width_main = w_main.stringlen(weather_main)
-        x_main = (
-            self.width
-            - self.right_section_width
-            + (self.right_section_width - text_width_main) // 2
-        )
-        w_main.set_textpos(10, x_main)
-        w_main.printstring(weather_main)
-
-        w_details = Writer(self.display.fb, freesans14)
-        text_width_details = w_details.stringlen(weather_details)
-        x_details = (
-            self.width
-            - self.right_section_width
-            + (self.right_section_width - text_width_details) // 2
+        # Send the metrics lines queued while the radio was off
+        metrics.flush()
+
+        wdt = machine.WDT(timeout=30000)
+        # Each request has its own timeout and self.http caps how many run
+        # at once, so a slow endpoint no longer holds up the others.
+        results = await asyncio.gather(
+            self._update("time", metrics.NTP, self.clock.update_time_async),
+            self._update("weather", metrics.WEATHER, self.weather.update_weather_async),
+            self._update(
+                "Pi-hole stats", metrics.PIHOLE, self.pihole.update_stats_async
+            ),
+            self._update(
+                "website views", metrics.WEBSITE, self.website.update_views_async
+            ),
         )
-        w_details.set_textpos(35, x_details)
-        w_details.printstring(weather_details)
+        wdt.feed()
+        print(f"HTTP: {self.http.stats()}")
+        self.http.reset_stats()
+        # Pooled connections would not survive the radio going off
+        await self.http.close()
+        self.network.disconnect()
 
-    def render_website_section(self):
-        """Render views of personal website section data."""
+        return all(results)
 
-        label_text = "Site Views:"
-        value_text = self.website.get_views_for_display()
-
-        w_label = Writer(self.display.fb, freesans20)
-        w_value = Writer(self.display.fb, freesans17)
-
-        left_section_width = self.width - self.right_section_width
-
-        label_width = w_label.stringlen(label_text)
-        x_label = (left_section_width - label_width) // 2
-        y_label = self.top_section_height + 10
-        w_label.set_textpos(y_label, x_label)
-        w_label.printstring(label_text)
-
-        value_width = w_value.stringlen(value_text)
-        x_value = (left_section_width - value_width) // 2
-        y_value = y_label + 25  # Space between label and value
-        w_value.set_textpos(y_value, x_value)
-        w_value.printstring(value_text)
-
-    def render_pihole_section(self):
-        """Render pi-hole ad block section data."""
-
-        pihole_total, pihole_blocked = self.pihole.get_stats_for_display()
-
-        w_total = Writer(self.display.fb, freesans17)
-        text_width_total = w_total.stringlen(pihole_total)
-        x_total = (
-            self.width
-            - self.right_section_width
-            + (self.right_section_width - text_width_total) // 2
-        )
-        y_total = self.top_section_height + 10
-        w_total.set_textpos(y_total, x_total)
-        w_total.printstring(pihole_total)
-
-        w_blocked = Writer(self.display.fb, freesans17)
-        text_width_blocked = w_blocked.stringlen(pihole_blocked)
-        x_blocked = (
-            self.width
-            - self.right_section_width
-            + (self.right_section_width - text_width_blocked) // 2
-        )
-        y_blocked = self.top_section_height + 35
-        w_blocked.set_textpos(y_blocked, x_blocked)
-        w_blocked.printstring(pihole_blocked)
+    def get_website_for_display(self):
+        """Label and value lines of the website views section."""
+        return "Site Views:", self.website.get_views_for_display()
 
     def render_dashboard(self):
         """Render whole sections display data."""
 
         try:
-            self.display.fb.fill(0)
-
-            self.render_time_section()
-            self.render_weather_section()
-            self.render_website_section()
-            self.render_pihole_section()
-
-            self.display.fb.show()
+            # Only slots whose text changed are redrawn and sent
+            with metrics.timer(metrics.RENDER):
+                rects = self.layout.update()
+            fb = self.display.fb
+            # Blocking: the data is already fetched and Wi-Fi is off, so
+            # nothing would run during the refresh that show_async() frees.
+            with metrics.timer(metrics.UPLOAD):
+                fb.show(rects=rects, full=rects is None)
+            # The upload timer includes the wait for the panel refresh
+            busy_us = fb.stats.refresh_ms * 1000
+            metrics.record(metrics.BUSY, busy_us)
+            metrics.add(metrics.UPLOAD, -busy_us)
+            self.layout.sent()
+            print(f"Display refreshed: {self.display.fb.stats}")
+            if Writer.run_cache is not None:
+                print(f"Run cache: {Writer.run_cache.stats()}")
             return True
         except Exception as e:
             print(f"Error rendering dashboard: {e}")
             sys.print_exception(e)
             return False
 
+    def end_cycle(self):
+        """Collect garbage and close the cycle's metrics."""
+        metrics.record(metrics.FREE_BEFORE, gc.mem_free())
+        gc.collect()
+        metrics.record(metrics.FREE_AFTER, gc.mem_free())
+        metrics.end_cycle()
+
     def run(self):
         """Run the dashboard"""
         print(
@@ -227,6 +234,7 @@ class Dashboard:
         self.update_data()
         self.render_dashboard()
         self.last_refresh_time = time.time()
+        self.end_cycle()
 
         def get_sleep_time():
             current_time = time.time()
@@ -253,7 +261,7 @@ class Dashboard:
                 self.render_dashboard()
                 self.last_refresh_time = time.time()
 
-                gc.collect()
+                self.end_cycle()
 
                 print(
                     f"Update complete. Next update in {self.DISPLAY_UPDATE_INTERVAL} seconds."
@@ -0,0 +1,261 @@
+# metrics.py Per-cycle timing and heap metrics for the dashboard.
+# Code marks what it spends time on with timers:
+#   with metrics.timer(metrics.NTP):
+#       ...
+#   @metrics.timed(metrics.RENDER)
+#   def render(): ...
+# Every field of a cycle is one slot of a row in a preallocated ring buffer
+# holding the last HISTORY cycles, and each field has one reusable timer, so
+# on MicroPython (where tick counts are small ints) timer blocks and record()
+# allocate nothing. A timed() call allocates its argument tuple. Timers add
+# to their field, so a field covers all the calls made during the cycle.
+# end_cycle() hands the finished row to the sinks as one text line in
+# InfluxDB line protocol: dashboard cycle=N,wifi=...,free_after=...
+# While disabled (the default) timer() returns a shared no-op context manager
+# and record() returns at once. timed() decides when it decorates: with
+# metrics disabled then, the function is left as it is.
+
+# Released under the MIT license see LICENSE
+
+from array import array
+from time import ticks_diff, ticks_us
+
+from micropython import const
+
+# Fields. Times are in us, heap sizes in bytes.
+WIFI = const(0)  # Wi-Fi connect
+NTP = const(1)  # NTP query
+WEATHER = const(2)  # OpenWeatherMap request
+PIHOLE = const(3)  # Pi-hole requests (auth, summary, logout)
+WEBSITE = const(4)  # Website stats request
+PARSE = const(5)  # JSON parsing, all widgets
+RENDER = const(6)  # Drawing changed layout slots
+UPLOAD = const(7)  # Sending the frame over SPI
+BUSY = const(8)  # Waiting for the panel to refresh
+FREE_BEFORE = const(9)  # Free heap before gc.collect()
+FREE_AFTER = const(10)  # Free heap after gc.collect()
+NFIELDS = const(11)
+
+NAMES = (
+    "wifi",
+    "ntp",
+    "weather",
+    "pihole",
+    "website",
+    "parse",
+    "render",
+    "upload",
+    "busy",
+    "free_before",
+    "free_after",
+)
+
+HISTORY = 16  # Default number of cycles kept in the ring buffer
+
+_enabled = False
+_ring = None  # array of (history + 1) * NFIELDS values, one row per cycle
+_row = 0  # Offset of the current cycle's row in _ring
+cycles = 0  # Cycles completed since enable()
+_sinks = []
+
+
+class _Timer:
+    def __init__(self, field):
+        self.field = field
+        self.start = 0
+
+    def __enter__(self):
+        self.start = ticks_us()
+        return self
+
+    def __exit__(self, *_):
+        _ring[_row + self.field] += ticks_diff(ticks_us(), self.start)
+        return False
+
+
+class _NoTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+_no_timer = _NoTimer()
+_timers = [_Timer(field) for field in range(NFIELDS)]
+
+
+def enable(history=HISTORY, sinks=()):
+    """Start recording, keeping the last history cycles."""
+    global _enabled, _ring, _row, cycles
+    # One row more than history: the cycle being recorded
+    _ring = array("i", [0] * ((history + 1) * NFIELDS))
+    _row = 0
+    cycles = 0
+    _sinks[:] = sinks
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def timer(field):
+    """Context manager adding the time spent in its block to field."""
+    # Timers are shared per field, so blocks for one field must not nest.
+    return _timers[field] if _enabled else _no_timer
+
+
+def timed(field):
+    """Decorator adding the time spent in each call to field. Metrics must
+    be enabled before the function is decorated, else it is returned as is."""
+
+    def decorator(func):
+        if not _enabled:
+            return func
+
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            t = ticks_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _ring[_row + field] += ticks_diff(ticks_us(), t)
+
+        return wrapper
+
+    return decorator
+
+
+def record(field, value):
+    """Set a field of the current cycle."""
+    if _enabled:
+        _ring[_row + field] = value
+
+
+def add(field, value):
+    if _enabled:
+        _ring[_row + field] += value
+
+
+def end_cycle():
+    """Finish the current cycle: report it to the sinks and start the next."""
+    global _row, cycles
+    if not _enabled:
+        return
+    if _sinks:
+        line = format_line(cycles, _ring, _row)
+        for sink in _sinks:
+            try:
+                sink.write(line)
+            except Exception as e:  # A failing sink must not stop the dashboard
+                print(f"Metrics sink error: {e}")
+    cycles += 1
+    _row = (_row + NFIELDS) % len(_ring)
+    for i in range(_row, _row + NFIELDS):
+        _ring[i] = 0
+
+
+def flush():
+    """Let sinks that need the network send what they queued. Call while
+    Wi-Fi is connected."""
+    for sink in _sinks:
+        if hasattr(sink, "flush"):
+            try:
+                sink.flush()
+            except Exception as e:
+                print(f"Metrics sink error: {e}")
+
+
+def last(n=0):
+    """Values of the nth most recent completed cycle, or None."""
+    if not _enabled or n >= min(cycles, len(_ring) // NFIELDS - 1):
+        return None
+    start = (_row - (n + 1) * NFIELDS) % len(_ring)
+    return _ring[start : start + NFIELDS]
+
+
+def format_line(cycle, ring, start):
+    parts = ["dashboard cycle={}".format(cycle)]
+    for i in range(NFIELDS):
+        parts.append("{}={}".format(NAMES[i], ring[start + i]))
+    return ",".join(parts) + "\n"
+
+
+# Sinks take each cycle's line through write(line). Sinks that need the
+# network also have flush(), called by flush() while Wi-Fi is up.
+
+
+class UartSink:
+    """Write lines to a machine.UART, or to any stream such as sys.stdout."""
+
+    def __init__(self, uart):
+        self.uart = uart
+
+    def write(self, line):
+        self.uart.write(line)
+
+
+class FileSink:
+    """Append lines to a file on flash. When it grows past max_bytes it is
+    renamed to path + ".1", replacing the previous one, to bound flash use."""
+
+    def __init__(self, path="metrics.log", max_bytes=16384):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def write(self, line):
+        import os
+
+        try:
+            size = os.stat(self.path)[6]
+        except OSError:
+            size = 0
+        if size + len(line) > self.max_bytes:
+            try:
+                os.remove(self.path + ".1")
+            except OSError:
+                pass
+            os.rename(self.path, self.path + ".1")
+        with open(self.path, "a") as f:
+            f.write(line)
+
+
+class UdpSink:
+    """Send each line as a UDP datagram, e.g. to a host running
+    nc -klu <port> or a metrics collector. Wi-Fi is off when a cycle ends, so
+    lines are queued (the oldest dropped past max_lines) and sent by flush().
+    The host is looked up on the first flush, once the network is up."""
+
+    def __init__(self, host, port, max_lines=8):
+        self.host = host
+        self.port = port
+        self.max_lines = max_lines
+        self.addr = None
+        self.sock = None
+        self.pending = []
+
+    def write(self, line):
+        pending = self.pending
+        if len(pending) >= self.max_lines:
+            pending.pop(0)
+        pending.append(line)
+
+    def flush(self):
+        if not self.pending:
+            return
+        if self.addr is None:
+            import socket
+
+            self.addr = socket.getaddrinfo(self.host, self.port)[0][-1]
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        pending = self.pending
+        while pending:
+            self.sock.sendto(pending[0].encode(), self.addr)
+            pending.pop(0)
@@ -0,0 +1,36 @@
+# sim: host-side stand-ins for the MicroPython modules used by the dashboard.
+# Lets the driver, display and widget code run under CPython so the render
+# and transfer paths can be profiled and benchmarked at host speed.
+
+# Released under the MIT license see LICENSE
+
+import sys
+
+_installed = False
+
+
+def install():
+    """Register the stand-in modules in sys.modules. Safe to call repeatedly."""
+    global _installed
+    if _installed:
+        return
+    import json
+    import traceback
+
+    from sim import framebuf, machine, micropython, mpasyncio, mpgc, mptime, network
+    from sim import uctypes
+
+    mptime.install()
+    mpasyncio.install()
+    mpgc.install()
+    sys.modules.setdefault("framebuf", framebuf)
+    sys.modules.setdefault("machine", machine)
+    sys.modules.setdefault("micropython", micropython)
+    sys.modules.setdefault("network", network)
+    sys.modules.setdefault("uctypes", uctypes)
+    sys.modules.setdefault("ujson", json)
+    if not hasattr(sys, "print_exception"):
+        sys.print_exception = lambda e, file=None: traceback.print_exception(
+            type(e), e, e.__traceback__, file=file
+        )
+    _installed = True
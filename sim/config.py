@@ -0,0 +1,37 @@
+# config.py Settings for running the dashboard in the simulator. Host names
+# match the routes in sim/fixtures/dashboard.json.
+
+
+class Network_Config:
+    WIFI_SSID = "sim-wifi"
+    WIFI_PASSWORD = "sim-password"
+
+
+class Time_Config:
+    TIMEZONE_OFFSET = 3
+
+
+class Weather_Config:
+    API_KEY = "sim-api-key"
+    CITY_ID = "703448"
+
+
+class Website_Config:
+    API_URL = "http://stats.example.com/api/views"
+
+
+class Pihole_Config:
+    PIHOLE_IP = "192.168.1.2"
+    PIHOLE_PASSWORD = "sim-app-password"
+    SESSION_FILE = None  # Keep the session in memory only
+
+
+class EPD_Config:
+    RST_PIN = 16
+    DC_PIN = 17
+    CS_PIN = 5
+    BUSY_PIN = 4
+
+
+class Metrics_Config:
+    ENABLED = True  # sim.dashboard prints each cycle from the ring buffer
@@ -0,0 +1,129 @@
+# dashboard.py Run main.Dashboard on the host against recorded API responses
+# and save every frame the SSD1680 receives as a PNG.
+# Wi-Fi is the stand-in network module, HTTP and NTP requests go over real
+# sockets to the local servers in sim/servers.py, time
+# runs on the virtual clock (so the 5 minute update interval passes
+# instantly) and the panel is the SSD1680 model, so frames are exactly what
+# the driver sends over SPI.
+
+# Run from the repository root:
+#   python -m sim.dashboard [--cycles N] [--out DIR] [--fixtures FILE] [-v]
+# -v shows the dashboard's own log output.
+
+import calendar
+import contextlib
+import io
+import os
+import sys
+import time
+
+import sim
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "dashboard.json")
+START = (2025, 10, 16, 6, 0, 0)  # UTC time the simulated NTP server reports
+
+
+def run(cycles=6, out="sim_out", fixtures=FIXTURES, verbose=False):
+    sim.install()
+    from sim import config, mptime
+    from sim.servers import HTTPServer, NTPServer
+    from sim.ssd1680 import SSD1680
+
+    mptime.install_wall_clock()
+    sys.modules["config"] = config
+    httpd = HTTPServer(fixtures)
+    start = calendar.timegm(START + (0, 0, 0))
+    t0 = mptime.now_us()
+    ntpd = NTPServer(lambda: start + (mptime.now_us() - t0) // 1000000)
+
+    log = None if verbose else io.StringIO()
+    quiet = (
+        contextlib.redirect_stdout(log) if log is not None else contextlib.nullcontext()
+    )
+    with quiet:
+        import main
+        import metrics
+
+        dashboard = main.Dashboard()
+        dashboard.http.lookup = httpd.lookup
+        ntpd.attach(dashboard.clock.ntp_client)
+        epd = dashboard.display.epd
+        # Attach the controller model to the driver's bus and BUSY pin, then
+        # repeat the init sequence so the model sees it.
+        panel = SSD1680(epd._spi, epd._dc, busy=epd._busy)
+        epd.init()
+        if not dashboard.connect_network():
+            raise RuntimeError("Simulated Wi-Fi did not connect")
+
+    os.makedirs(out, exist_ok=True)
+    spi = epd._spi
+    saved = 0
+    for cycle in range(cycles):
+        first = len(panel.refreshes)
+        spi.reset_counters()
+        v0 = mptime.now_us()
+        t = time.perf_counter()
+        with quiet:
+            dashboard.update_data()
+            ok = dashboard.render_dashboard()
+            dashboard.end_cycle()
+        host_ms = (time.perf_counter() - t) * 1000
+        device_ms = (mptime.now_us() - v0) // 1000
+        for mode, frame in panel.refreshes[first:]:
+            kind = "partial" if mode == 0xFC else "full"
+            path = os.path.join(out, "frame{:03d}_{}.png".format(saved, kind))
+            panel.save_png(path, frame)
+            saved += 1
+            print("cycle {}: {} refresh -> {}".format(cycle, kind, path))
+        if len(panel.refreshes) == first:
+            print("cycle {}: frame unchanged, no refresh".format(cycle))
+        print(
+            "  {} at {:02d}:{:02d}, {:.1f} ms host, {} ms virtual, {} SPI writes, {} bytes{}".format(
+                "rendered" if ok else "render FAILED",
+                *time.localtime()[3:5],
+                host_ms,
+                device_ms,
+                spi.writes,
+                spi.bytes_written,
+                "" if ok else " (rerun with -v)",
+            )
+        )
+        row = metrics.last()
+        if row is not None:
+            print("  " + metrics.format_line(cycle, row, 0), end="")
+        with quiet:
+            time.sleep(dashboard.DISPLAY_UPDATE_INTERVAL)
+    print("{} HTTP requests, {} frames saved to {}".format(len(httpd.log), saved, out))
+    httpd.close()
+    ntpd.close()
+    machine = sys.modules["machine"]
+    if machine.WDT.expired:
+        print(
+            "Watchdog expired {} times: the board would have reset".format(
+                machine.WDT.expired
+            )
+        )
+    return panel
+
+
+def main(argv):
+    args = argv[1:]
+    opts = {"cycles": 6, "out": "sim_out", "fixtures": FIXTURES, "verbose": False}
+    while args:
+        arg = args.pop(0)
+        if arg in ("--cycles", "--out", "--fixtures") and args:
+            value = args.pop(0)
+            opts[arg[2:]] = int(value) if arg == "--cycles" else value
+        elif arg == "-v":
+            opts["verbose"] = True
+        else:
+            print(
+                "Usage: python -m sim.dashboard [--cycles N] [--out DIR] [--fixtures FILE] [-v]"
+            )
+            return 1
+    run(**opts)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
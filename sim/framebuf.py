@@ -0,0 +1,121 @@
+# framebuf.py Pure Python stand-in for the MicroPython framebuf module.
+# Implements the monochrome formats used by the driver and Writer with the
+# same memory layout as the C implementation, so buffers produced here are
+# byte-for-byte what the device would hold.
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format not in (MONO_VLSB, MONO_HLSB, MONO_HMSB):
+            raise ValueError("invalid format")
+        self._fb_buf = buffer
+        self._fb_width = width
+        self._fb_height = height
+        self._fb_format = format
+        if stride is None:
+            stride = width
+        if format != MONO_VLSB:
+            stride = (stride + 7) & ~7
+        self._fb_stride = stride
+
+    def _locate(self, x, y):
+        if self._fb_format == MONO_VLSB:
+            return (y >> 3) * self._fb_stride + x, y & 7
+        offset = x + y * self._fb_stride
+        if self._fb_format == MONO_HLSB:
+            return offset >> 3, 7 - (offset & 7)
+        return offset >> 3, offset & 7
+
+    def _get(self, x, y):
+        index, bit = self._locate(x, y)
+        return (self._fb_buf[index] >> bit) & 1
+
+    def _set(self, x, y, c):
+        index, bit = self._locate(x, y)
+        if c & 1:
+            self._fb_buf[index] |= 1 << bit
+        else:
+            self._fb_buf[index] &= ~(1 << bit) & 0xFF
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._fb_width and 0 <= y < self._fb_height):
+            return None
+        if c is None:
+            return self._get(x, y)
+        self._set(x, y, c)
+
+    def fill(self, c):
+        buf = self._fb_buf
+        buf[:] = (b"\xff" if c & 1 else b"\x00") * len(buf)
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self._fb_width)
+        y1 = min(y + h, self._fb_height)
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self._set(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self.fill_rect(x, y, 1, h, c)
+        self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    def scroll(self, xstep, ystep):
+        w, h = self._fb_width, self._fb_height
+        xs = range(w - 1, -1, -1) if xstep > 0 else range(w)
+        ys = range(h - 1, -1, -1) if ystep > 0 else range(h)
+        for y in ys:
+            for x in xs:
+                sx, sy = x - xstep, y - ystep
+                if 0 <= sx < w and 0 <= sy < h:
+                    self._set(x, y, self._get(sx, sy))
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            buf, w, h, fmt = fbuf[:4]
+            fbuf = FrameBuffer(buf, w, h, fmt, *fbuf[4:])
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + fbuf._fb_width, self._fb_width)
+        y1 = min(y + fbuf._fb_height, self._fb_height)
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                col = fbuf._get(xx - x, yy - y)
+                if palette is not None:
+                    col = palette._get(col, 0)
+                if col != key:
+                    self._set(xx, yy, col)
@@ -0,0 +1,139 @@
+# machine.py Stand-in for the parts of the MicroPython machine module used
+# by the dashboard. SPI records every transfer so benchmarks can count the
+# transactions and bytes a refresh costs. Pin levels can be scripted on the
+# virtual clock and fire IRQ handlers on matching edges. RTC sets the wall
+# clock used by time.time()/localtime() (see mptime.install_wall_clock) and a
+# WDT that is not fed in time is reported instead of resetting the host.
+
+from sim import mptime
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 2
+    IRQ_RISING = 1
+
+    def __init__(self, id, mode=-1, pull=-1, value=None, hold=False):
+        if isinstance(id, Pin):
+            self.id = id.id
+            self._value = id._value
+        else:
+            self.id = id
+            self._value = 0
+        self.mode = mode
+        self.hold = hold
+        self._handler = None
+        self._trigger = 0
+        if value is not None:
+            self._value = 1 if value else 0
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        value = 1 if value else 0
+        if value == self._value:
+            return
+        self._value = value
+        edge = Pin.IRQ_RISING if value else Pin.IRQ_FALLING
+        if self._handler is not None and self._trigger & edge:
+            self._handler(self)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._handler = handler
+        self._trigger = trigger
+
+    def schedule(self, ms, value):
+        """Script a level change ms from now on the virtual clock."""
+        mptime.call_later_ms(ms, lambda: self.value(value))
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+
+class SPI:
+    def __init__(self, id=1, baudrate=1000000, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self.writes = 0  # Number of write() transactions
+        self.bytes_written = 0
+        self.listener = None  # Optional callable receiving each write
+
+    def write(self, buf):
+        self.writes += 1
+        self.bytes_written += len(buf)
+        if self.listener is not None:
+            self.listener(bytes(buf))
+
+    def read(self, nbytes, write=0x00):
+        return bytes(nbytes)
+
+    def reset_counters(self):
+        self.writes = 0
+        self.bytes_written = 0
+
+
+class RTC:
+    def __init__(self, id=0):
+        self.id = id
+
+    # (year, month, day, weekday, hour, minute, second, subseconds)
+    def datetime(self, datetimetuple=None):
+        if datetimetuple is None:
+            t = mptime.mp_localtime()
+            return (t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0)
+        y, mo, d, _, h, mi, s = datetimetuple[:7]
+        mptime.set_wall((y, mo, d, h, mi, s))
+
+    def init(self, datetimetuple):
+        self.datetime(datetimetuple)
+
+
+class WDT:
+    expired = 0  # Times a watchdog would have reset the board
+
+    def __init__(self, id=0, timeout=5000):
+        self.timeout = timeout
+        self.feeds = 0
+        self._seq = 0
+        self._arm()
+
+    def _arm(self):
+        self._seq += 1
+        seq = self._seq
+        mptime.call_later_ms(self.timeout, lambda: self._expire(seq))
+
+    def _expire(self, seq):
+        if seq == self._seq:
+            WDT.expired += 1
+            print("WDT: not fed for {} ms, the board would reset".format(self.timeout))
+
+    def feed(self):
+        self.feeds += 1
+        self._arm()
+
+
+def idle():
+    mptime.idle()
+
+
+def lightsleep(ms=None):
+    if ms is not None:
+        mptime.sleep_ms(ms)
+
+
+def deepsleep(ms=None):
+    if ms is not None:
+        mptime.sleep_ms(ms)
+
+
+def reset():
+    raise SystemExit("machine.reset()")
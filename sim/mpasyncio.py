@@ -0,0 +1,69 @@
+# mpasyncio.py MicroPython asyncio extensions for CPython.
+# Awaiting a ThreadSafeFlag idles the virtual clock until the next scheduled
+# event, mirroring how the device sleeps until an interrupt sets the flag.
+# Event replaces CPython's, which is bound to one event loop.
+
+import asyncio
+
+from sim import mptime
+
+
+class ThreadSafeFlag:
+    def __init__(self):
+        self._state = False
+
+    def set(self):
+        self._state = True
+
+    def clear(self):
+        self._state = False
+
+    async def wait(self):
+        while not self._state:
+            mptime.idle()
+            await asyncio.sleep(0)
+        self._state = False
+
+
+# As MicroPython's Event, not tied to an event loop. CPython's binds to the
+# first loop that waits on it, so an Event made once (the HTTP client's
+# Limiter, the EPD's complete) breaks in the next asyncio.run(), and the
+# dashboard runs one per cycle.
+class Event:
+    def __init__(self):
+        self._state = False
+        self._waiters = []
+
+    def is_set(self):
+        return self._state
+
+    def set(self):
+        self._state = True
+        waiters = self._waiters
+        self._waiters = []
+        for fut in waiters:
+            if not fut.done() and not fut.get_loop().is_closed():
+                fut.set_result(True)
+
+    def clear(self):
+        self._state = False
+
+    async def wait(self):
+        if not self._state:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            await fut
+        return True
+
+
+async def sleep_ms(ms):
+    mptime.sleep_ms(ms)
+    await asyncio.sleep(0)
+
+
+def install():
+    asyncio.Event = Event
+    if not hasattr(asyncio, "ThreadSafeFlag"):
+        asyncio.ThreadSafeFlag = ThreadSafeFlag
+    if not hasattr(asyncio, "sleep_ms"):
+        asyncio.sleep_ms = sleep_ms
@@ -0,0 +1,52 @@
+# mpgc.py MicroPython gc extensions for CPython.
+# mem_alloc()/mem_free() report the Python heap as traced by tracemalloc,
+# which starts on the first call (so only code that asks pays for tracing).
+# MicroPython does not reuse freed memory until the next collection, so
+# while the collector is disabled mem_alloc() reports the high-water mark
+# since disable() or collect() rather than the live size. The usual pattern
+#   gc.collect(); gc.disable(); a = gc.mem_alloc(); f(); gc.mem_alloc() - a
+# then measures what f() allocates on both, as closely as CPython's
+# reference counting allows.
+
+import gc
+import tracemalloc
+
+HEAP_SIZE = 110 * 1024  # Roughly what an ESP32 without PSRAM offers
+
+_collect = gc.collect
+_disable = gc.disable
+
+
+def _traced():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return tracemalloc.get_traced_memory()
+
+
+def mem_alloc():
+    current, peak = _traced()
+    return current if gc.isenabled() else peak
+
+
+def mem_free():
+    return max(0, HEAP_SIZE - mem_alloc())
+
+
+def collect():
+    n = _collect()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    return n
+
+
+def disable():
+    _disable()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+def install():
+    gc.mem_alloc = mem_alloc
+    gc.mem_free = mem_free
+    gc.collect = collect
+    gc.disable = disable
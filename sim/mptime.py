@@ -0,0 +1,145 @@
+# mptime.py MicroPython time extensions for CPython.
+# Sleeps advance a virtual clock instead of blocking, so code that busy-waits
+# on the panel runs at host speed while ticks_ms()/ticks_us() still report the
+# time the device would have spent. Timers scheduled on the virtual clock
+# stand in for hardware events such as pin edges.
+# install_wall_clock() also replaces time(), localtime() and sleep() with a
+# wall clock that runs on the virtual clock and is set through machine.RTC,
+# counting seconds from 2000-01-01 as MicroPython on the ESP32 does.
+
+import calendar
+import sys
+import time
+
+_TICKS_PERIOD = 1 << 30
+_TICKS_MAX = _TICKS_PERIOD - 1
+_TICKS_HALFPERIOD = _TICKS_PERIOD // 2
+
+_slept_us = 0
+_timers = []  # (due time in us, sequence, callback), sorted
+_seq = 0
+_running = False
+
+EPOCH_OFFSET = 946684800  # 2000-01-01 in Unix time
+_wall_base = 0  # Wall clock seconds (2000 epoch) at virtual time _wall_set_us
+_wall_set_us = 0
+
+
+def _now_us():
+    return time.perf_counter_ns() // 1000 + _slept_us
+
+
+def _run_due():
+    global _running
+    if _running:
+        return
+    _running = True
+    try:
+        while _timers and _timers[0][0] <= _now_us():
+            _timers.pop(0)[2]()
+    finally:
+        _running = False
+
+
+def now_us():
+    """Virtual time in microseconds, without wrapping."""
+    return _now_us()
+
+
+def advance_us(us):
+    """Move the virtual clock forward without sleeping."""
+    global _slept_us
+    _slept_us += int(us)
+    _run_due()
+
+
+def call_later_ms(ms, callback):
+    """Run callback once the virtual clock has advanced by ms."""
+    global _seq
+    _seq += 1
+    _timers.append((_now_us() + int(ms * 1000), _seq, callback))
+    _timers.sort()
+
+
+def idle():
+    """Wait for the next event: jump to the next timer, else one tick."""
+    if _timers:
+        advance_us(max(0, _timers[0][0] - _now_us()))
+    else:
+        advance_us(1000)
+
+
+def sleep_us(us):
+    advance_us(us)
+
+
+def sleep_ms(ms):
+    advance_us(ms * 1000)
+
+
+def ticks_us():
+    _run_due()
+    return _now_us() & _TICKS_MAX
+
+
+def ticks_ms():
+    _run_due()
+    return (_now_us() // 1000) & _TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(end, start):
+    return ((end - start + _TICKS_HALFPERIOD) & _TICKS_MAX) - _TICKS_HALFPERIOD
+
+
+def set_wall(datetime):
+    """Set the wall clock from (year, month, day, hour, minute, second)."""
+    global _wall_base, _wall_set_us
+    _wall_base = calendar.timegm(tuple(datetime[:6]) + (0, 0, 0)) - EPOCH_OFFSET
+    _wall_set_us = _now_us()
+
+
+def wall_time():
+    return _wall_base + (_now_us() - _wall_set_us) / 1000000
+
+
+def mp_time():
+    _run_due()
+    return int(wall_time())
+
+
+def mp_localtime(secs=None):
+    if secs is None:
+        secs = mp_time()
+    return tuple(time.gmtime(int(secs) + EPOCH_OFFSET))[:8]
+
+
+def mp_sleep(seconds):
+    advance_us(seconds * 1000000)
+
+
+def install_wall_clock():
+    time.time = mp_time
+    time.localtime = mp_localtime
+    time.sleep = mp_sleep
+
+
+def install():
+    for name in (
+        "sleep_us",
+        "sleep_ms",
+        "ticks_us",
+        "ticks_ms",
+        "ticks_cpu",
+        "ticks_add",
+        "ticks_diff",
+    ):
+        setattr(time, name, globals()[name])
+    sys.modules.setdefault("utime", time)
@@ -0,0 +1,78 @@
+# network.py Stand-in for the MicroPython network module. WLAN interfaces are
+# per-interface singletons as on the device; connect() succeeds after
+# CONNECT_MS on the virtual clock unless the SSID is in unreachable.
+
+from sim import mptime
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 1000
+STAT_CONNECTING = 1001
+STAT_GOT_IP = 1010
+STAT_NO_AP_FOUND = 201
+
+CONNECT_MS = 1500
+unreachable = set()  # SSIDs that never connect
+
+
+class WLAN:
+    _interfaces = {}
+
+    def __new__(cls, interface_id=STA_IF):
+        wlan = cls._interfaces.get(interface_id)
+        if wlan is None:
+            wlan = super().__new__(cls)
+            wlan._id = interface_id
+            wlan._active = False
+            wlan._status = STAT_IDLE
+            wlan._ssid = None
+            wlan._connected_at = None
+            wlan.connects = 0
+            cls._interfaces[interface_id] = wlan
+        return wlan
+
+    def active(self, is_active=None):
+        if is_active is None:
+            return self._active
+        self._active = bool(is_active)
+        if not self._active:
+            self.disconnect()
+
+    def connect(self, ssid=None, key=None, **kwargs):
+        if not self._active:
+            raise OSError("STA must be active")
+        self.connects += 1
+        self._ssid = ssid
+        if ssid in unreachable:
+            self._status = STAT_NO_AP_FOUND
+            return
+        self._status = STAT_CONNECTING
+        self._connected_at = mptime.ticks_add(mptime.ticks_ms(), CONNECT_MS)
+
+    def disconnect(self):
+        self._status = STAT_IDLE
+        self._connected_at = None
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -61
+        if self._status == STAT_CONNECTING:
+            if mptime.ticks_diff(mptime.ticks_ms(), self._connected_at) >= 0:
+                self._status = STAT_GOT_IP
+        return self._status
+
+    def isconnected(self):
+        return self.status() == STAT_GOT_IP
+
+    def ifconfig(self, config=None):
+        if self.isconnected():
+            return ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+        return ("0.0.0.0", "0.0.0.0", "0.0.0.0", "0.0.0.0")
+
+    def config(self, *args, **kwargs):
+        if args == ("essid",):
+            return self._ssid
+        if args == ("mac",):
+            return b"\x24\x0a\xc4\x00\x00\x01"
+        return None
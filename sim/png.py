@@ -0,0 +1,28 @@
+# png.py Minimal 1-bit greyscale PNG writer, so frames can be saved without
+# Pillow.
+
+import struct
+import zlib
+
+
+def _chunk(kind, data):
+    body = kind + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+
+def write_png(path, width, height, black):
+    """Write a width x height image; black(x, y) is True for a black pixel."""
+    raw = bytearray()
+    stride = (width + 7) // 8
+    for y in range(height):
+        row = bytearray(b"\xff" * stride)  # 1 is white
+        for x in range(width):
+            if black(x, y):
+                row[x >> 3] &= ~(0x80 >> (x & 7)) & 0xFF
+        raw.append(0)  # Filter type: none
+        raw += row
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0)))
+        f.write(_chunk(b"IDAT", zlib.compress(bytes(raw), 9)))
+        f.write(_chunk(b"IEND", b""))
@@ -0,0 +1,182 @@
+# servers.py Local stand-in servers for the widgets' network traffic: an HTTP
+# server answering from recorded responses and an NTP server. Both listen on
+# 127.0.0.1 on free ports and run in background threads, so the real
+# asyncio client code talks to them over real sockets.
+#
+# The HTTP server speaks HTTP/1.1 with keep-alive and counts the
+# connections it accepts; idle_timeout (seconds) closes idle ones.
+#
+# HTTP routes match on method and URL prefix, where the URL is rebuilt from
+# the Host header, so one server stands in for every host. Point a client at
+# it with client.lookup = server.lookup. Each route serves its responses in
+# turn, the last one repeating. A response is a dict with status, optional
+# headers, json (encoded here) or body, delay_ms to answer late, chunked to
+# send the body with chunked transfer encoding and close to close the
+# connection after it. A 200 response whose ETag or Last-Modified header
+# matches the request's If-None-Match or If-Modified-Since is sent as a 304
+# (still using up its turn). Every request is appended to log as
+# (method, url, headers, body).
+
+import json
+import socketserver
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+NTP_DELTA = 2208988800  # Seconds between 1900 and 1970
+
+
+def _wait(ms):
+    # Real time: time.sleep() may be on the virtual clock
+    if ms:
+        threading.Event().wait(ms / 1000)
+
+
+def _unchanged(request, headers):
+    etag = headers.get("ETag")
+    if etag and request.get("If-None-Match") == etag:
+        return True
+    modified = headers.get("Last-Modified")
+    return bool(modified) and request.get("If-Modified-Since") == modified
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        owner = self.server.owner
+        owner.connections += 1
+        self.timeout = owner.idle_timeout
+        super().setup()
+
+    def _serve(self):
+        server = self.server.owner
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = "http://{}{}".format(self.headers.get("Host", ""), self.path)
+        headers = dict(self.headers.items())
+        server.log.append((self.command, url, headers, body))
+        status, rheaders, rbody, spec = server.respond(self.command, url, headers, body)
+        if status == 200 and _unchanged(self.headers, rheaders):
+            status = 304
+            server.not_modified += 1
+        _wait(spec.get("delay_ms", 0))
+        self.send_response(status)
+        for name, value in rheaders.items():
+            self.send_header(name, value)
+        if spec.get("close"):
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        if self.command == "HEAD" or status in (204, 304):
+            self.end_headers()
+        elif spec.get("chunked"):
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(rbody), 64):
+                chunk = rbody[i : i + 64]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(rbody)))
+            self.end_headers()
+            self.wfile.write(rbody)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _serve
+
+
+class HTTPServer:
+    def __init__(self, fixtures=None, idle_timeout=None):
+        self.log = []
+        self.connections = 0
+        self.not_modified = 0  # 304s sent
+        self.idle_timeout = idle_timeout
+        self._routes = []
+        self._lock = threading.Lock()
+        if fixtures:
+            self.load(fixtures)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def route(self, method, url, responses=None, handler=None):
+        """Serve url (a prefix) for method from responses, or from
+        handler(method, url, headers, body) returning (status, headers, body)."""
+        self._routes.insert(
+            0, (method.upper(), url, list(responses or ()), handler, [0])
+        )
+
+    def load(self, path):
+        """Add the routes of a fixture file: {"routes": [{method, url, responses}]}."""
+        with open(path) as f:
+            fixtures = json.load(f)
+        for r in reversed(fixtures["routes"]):
+            self.route(r.get("method", "GET"), r["url"], r["responses"])
+
+    def respond(self, method, url, headers, body):
+        with self._lock:
+            for m, prefix, responses, handler, served in self._routes:
+                if m != method or not url.startswith(prefix):
+                    continue
+                if handler is not None:
+                    status, rheaders, rbody = handler(method, url, headers, body)
+                    return status, rheaders, rbody, {}
+                spec = responses[min(served[0], len(responses) - 1)]
+                served[0] += 1
+                break
+            else:
+                return 404, {}, b"", {}
+        if "json" in spec:
+            rbody = json.dumps(spec["json"]).encode()
+        else:
+            rbody = spec.get("body", "").encode()
+        rheaders = dict(spec.get("headers", {}))
+        return spec.get("status", 200), rheaders, rbody, spec
+
+    def lookup(self, host, port):
+        return "127.0.0.1", self.port
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class NTPServer:
+    """Answers NTP requests with time_fn(), a Unix time, after delay_ms."""
+
+    def __init__(self, time_fn, delay_ms=0):
+        self.time_fn = time_fn
+        self.delay_ms = delay_ms
+        self.requests = 0
+        owner = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                data, sock = self.request
+                if len(data) != 48:
+                    return
+                owner.requests += 1
+                _wait(owner.delay_ms)
+                words = [0] * 12
+                words[0] = 0x1C040000  # LI 0, version 3, server mode, stratum 4
+                words[10] = int(owner.time_fn()) + NTP_DELTA  # Transmit timestamp
+                sock.sendto(struct.pack("!12I", *words), self.client_address)
+
+        self._server = socketserver.ThreadingUDPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def attach(self, ntp_client):
+        """Point an NTPClient at this server."""
+        ntp_client.host = "127.0.0.1"
+        ntp_client.port = self.port
+        ntp_client.backup_hosts = []
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
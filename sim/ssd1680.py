@@ -0,0 +1,135 @@
+# ssd1680.py Model of the SSD1680 e-paper controller as seen over SPI.
+# Decodes the command stream sent by driver/epd29_ssd1680.py into the two
+# RAM banks, honours the RAM window and address counters, and drives a BUSY
+# pin for the duration of each refresh on the virtual clock.
+
+from sim.machine import Pin
+from sim.png import write_png
+
+FULL_REFRESH_MS = 2600
+PARTIAL_REFRESH_MS = 450
+
+# Number of argument bytes for the commands that take them.
+_NARGS = {
+    0x01: 3,
+    0x10: 1,
+    0x11: 1,
+    0x18: 1,
+    0x21: 2,
+    0x22: 1,
+    0x3C: 1,
+    0x44: 2,
+    0x45: 4,
+    0x4E: 1,
+    0x4F: 2,
+}
+
+
+class SSD1680:
+    # busy: the Pin to drive, e.g. the one an existing EPD already watches.
+    def __init__(self, spi, dc, lines=296, line_bytes=16, busy=None):
+        self.lines = lines
+        self.line_bytes = line_bytes
+        self.ram = {
+            0x24: bytearray(lines * line_bytes),
+            0x26: bytearray(lines * line_bytes),
+        }
+        self._dc = dc
+        spi.listener = self._receive
+        self.busy = Pin(4, Pin.IN) if busy is None else busy  # High while refreshing
+        self._cmd = None
+        self._args = bytearray()
+        self._x = (0, line_bytes - 1)  # RAM window, in bytes
+        self._y = (lines - 1, 0)  # RAM window, in gate lines
+        self._xc = 0  # Address counters
+        self._yc = lines - 1
+        self.update_mode = 0xF7
+        self.refreshes = []  # (update mode, displayed image) per 0x20
+        self.deep_sleep = False
+
+    def _receive(self, data):
+        if self._dc.value() == 0:
+            for c in data:
+                self._command(c)
+        elif self._cmd in (0x24, 0x26):
+            self._write_ram(self.ram[self._cmd], data)
+        else:
+            for b in data:
+                self._arg(b)
+
+    def _command(self, c):
+        self._cmd = c
+        self._args = bytearray()
+        if c == 0x20:  # Master activation
+            partial = self.update_mode == 0xFC
+            self.refreshes.append((self.update_mode, self.frame()))
+            duration = PARTIAL_REFRESH_MS if partial else FULL_REFRESH_MS
+            self.busy.value(1)
+            self.busy.schedule(duration, 0)
+            self.deep_sleep = False
+
+    def _arg(self, b):
+        args = self._args
+        args.append(b)
+        if len(args) != _NARGS.get(self._cmd, -1):
+            return
+        c = self._cmd
+        if c == 0x44:
+            self._x = (args[0], args[1])
+        elif c == 0x45:
+            self._y = (args[0] | args[1] << 8, args[2] | args[3] << 8)
+        elif c == 0x4E:
+            self._xc = args[0]
+        elif c == 0x4F:
+            self._yc = args[0] | args[1] << 8
+        elif c == 0x22:
+            self.update_mode = args[0]
+        elif c == 0x10:
+            self.deep_sleep = args[0] != 0
+
+    def _write_ram(self, ram, data):
+        # Data entry mode 0x01: X increments, Y decrements at the end of a line
+        xs, xe = self._x
+        ys, ye = self._y
+        lb = self.line_bytes
+        for b in data:
+            ram[self._yc * lb + self._xc] = b
+            if self._xc < xe:
+                self._xc += 1
+            else:
+                self._xc = xs
+                self._yc = self._yc - 1 if self._yc > ye else ys
+
+    def frame(self, bank=0x24):
+        """RAM contents in upload order (gate line lines-1 first)."""
+        ram = self.ram[bank]
+        lb = self.line_bytes
+        out = bytearray(len(ram))
+        for line in range(self.lines):
+            y = self.lines - 1 - line
+            out[line * lb : (line + 1) * lb] = ram[y * lb : (y + 1) * lb]
+        return out
+
+    def save_png(self, path, frame=None, landscape=True):
+        """Save a frame (default: bank 0x24) as the panel would show it.
+
+        Landscape matches the driver's default: RAM gate lines are x and the
+        last byte of each line holds the top rows.
+        """
+        if frame is None:
+            frame = self.frame()
+        lb = self.line_bytes
+        if landscape:
+            write_png(
+                path,
+                self.lines,
+                lb * 8,
+                lambda x, y: not frame[x * lb + lb - 1 - (y >> 3)] >> (y & 7) & 1,
+            )
+        else:
+            write_png(
+                path,
+                lb * 8,
+                self.lines,
+                lambda x, y: not frame[y * lb + (x >> 3)] >> (7 - (x & 7)) & 1,
+            )
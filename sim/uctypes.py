@@ -0,0 +1,10 @@
+# uctypes.py Stand-in for the MicroPython uctypes module. Raw memory access
+# has no CPython equivalent: these exist so importing modules succeeds.
+
+
+def addressof(obj):
+    raise NotImplementedError("uctypes.addressof is not available on the host")
+
+
+def bytearray_at(addr, size):
+    raise NotImplementedError("uctypes.bytearray_at is not available on the host")
@@ -0,0 +1,130 @@
+# font_subset.py Build binary fonts holding only the characters the
+# dashboard can draw. The charset is scanned from the string literals of the
+# display functions in main.py and the widgets (plus digits and number
+# punctuation), or given explicitly. Characters outside the subset are drawn
+# with the font's fallback glyph.
+
+# Run from the repository root:
+#   python -m tools.font_subset [--chars "Kyiv,UA"] [--only] fonts.freesans14 ...
+# writes fonts/freesans14_subset.bin etc. --chars adds characters to the
+# scanned set (e.g. the city name OpenWeatherMap returns); with --only they
+# replace it. Upload the result to the board under the same name; main.py
+# loads fonts/<name>_subset.bin in place of fonts/<name>.bin when present.
+
+# Released under the MIT license see LICENSE
+
+import ast
+import importlib
+import sys
+
+from tools.font_to_bin import encode, glyphs
+
+SOURCES = (
+    "main.py",
+    "widgets/clock.py",
+    "widgets/weather.py",
+    "widgets/pihole_stats.py",
+    "widgets/website_views.py",
+)
+# Functions whose strings reach the screen: those with "display" in the name
+# and the methods they call on self.
+DISPLAY_NAME = "display"
+# Digits and signs of formatted numbers
+ALWAYS = "0123456789 .-"
+
+
+# String constants under node, skipping print() calls and docstrings.
+def _strings(node):
+    if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "print":
+        return
+    if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+        return
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        yield node.value
+    for child in ast.iter_child_nodes(node):
+        yield from _strings(child)
+
+
+def _self_calls(node):
+    for sub in ast.walk(node):
+        if (
+            isinstance(sub, ast.Call)
+            and isinstance(sub.func, ast.Attribute)
+            and isinstance(sub.func.value, ast.Name)
+            and sub.func.value.id == "self"
+        ):
+            yield sub.func.attr
+
+
+def scan(paths=SOURCES):
+    """Return the characters the display functions in paths can produce."""
+    chars = set(ALWAYS)
+    for path in paths:
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        for cls in [n for n in ast.walk(tree) if isinstance(n, ast.ClassDef)]:
+            methods = {n.name: n for n in cls.body if isinstance(n, ast.FunctionDef)}
+            todo = [name for name in methods if DISPLAY_NAME in name]
+            seen = set()
+            while todo:
+                name = todo.pop()
+                if name in seen or name not in methods:
+                    continue
+                seen.add(name)
+                node = methods[name]
+                for s in _strings(node):
+                    chars.update(s)
+                todo.extend(_self_calls(node))
+    chars.discard("\n")
+    return chars
+
+
+def subset(font, chars):
+    """Return the binary subset of font covering chars and the chars dropped."""
+    min_ch, max_ch, entries = glyphs(font)
+    keep = sorted(c for c in set(chars) if min_ch <= ord(c) <= max_ch)
+    dropped = sorted(c for c in set(chars) if not min_ch <= ord(c) <= max_ch)
+    if not keep:
+        raise ValueError("No characters of the set are in the font")
+    lo = ord(keep[0])
+    hi = ord(keep[-1])
+    remap = bytearray(hi - lo + 1)
+    out = [entries[0]]  # Fallback glyph
+    for c in keep:
+        out.append(entries[ord(c) - min_ch + 1])
+        remap[ord(c) - lo] = len(out) - 1
+    return encode(font, lo, hi, out, remap), dropped
+
+
+def main(argv):
+    args = argv[1:]
+    extra = ""
+    only = False
+    names = []
+    while args:
+        arg = args.pop(0)
+        if arg == "--chars" and args:
+            extra = args.pop(0)
+        elif arg == "--only":
+            only = True
+        else:
+            names.append(arg)
+    if not names or (only and not extra):
+        print('Usage: python -m tools.font_subset [--chars "..."] [--only] module ...')
+        return 1
+    chars = set(extra) if only else scan() | set(extra)
+    print("Charset ({}): {}".format(len(chars), "".join(sorted(chars))))
+    for name in names:
+        font = importlib.import_module(name)
+        data, dropped = subset(font, chars)
+        path = name.replace(".", "/") + "_subset.bin"
+        with open(path, "wb") as f:
+            f.write(data)
+        print("{}: {} bytes -> {}".format(name, len(data), path))
+        if dropped:
+            print("  not in font, drawn as fallback: {!r}".format("".join(dropped)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
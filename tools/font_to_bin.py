@@ -0,0 +1,101 @@
+# font_to_bin.py Convert font-to-py Python fonts to the binary container
+# read by display/bin_font.py.
+
+# Run from the repository root:
+#   python -m tools.font_to_bin fonts.freesans14 [fonts.freesans17 ...]
+# writes fonts/freesans14.bin etc. next to each module. Use -o to name the
+# output when converting a single font.
+
+# Released under the MIT license see LICENSE
+
+import importlib
+import struct
+import sys
+
+from display.bin_font import HMAP, MAGIC, MONOSPACED, REVERSE, SUBSET, VERSION
+
+
+def _flag(font, name, bit):
+    return bit if hasattr(font, name) and getattr(font, name)() else 0
+
+
+# Glyphs in BinFont index order: the fallback glyph, then min_ch..max_ch.
+# Older modules without min_ch/max_ch cover 32..126.
+def glyphs(font):
+    min_ch = font.min_ch() if hasattr(font, "min_ch") else 32
+    max_ch = font.max_ch() if hasattr(font, "max_ch") else 126
+    default = font.get_ch(chr(max_ch + 1))
+    out = [default]
+    for code in range(min_ch, max_ch + 1):
+        out.append(font.get_ch(chr(code)))
+    return min_ch, max_ch, out
+
+
+def encode(font, min_ch, max_ch, entries, remap=None):
+    """Return the binary font for entries [(bitmap, height, width), ...].
+
+    With remap (glyph number per character min_ch..max_ch, 0 for none) the
+    entries are a subset: the fallback glyph followed by the kept glyphs.
+    """
+    if not font.hmap():
+        raise ValueError("Font must be horizontally mapped.")
+    flags = (
+        _flag(font, "hmap", HMAP)
+        | _flag(font, "reverse", REVERSE)
+        | _flag(font, "monospaced", MONOSPACED)
+    )
+    if remap is not None:
+        if len(entries) > 256:
+            raise ValueError("A subset holds at most 255 glyphs")
+        flags |= SUBSET
+    widths = bytearray()
+    offsets = bytearray()
+    bitmaps = bytearray()
+    for bitmap, _, width in entries:
+        widths.append(width)
+        offsets += struct.pack("<H", len(bitmaps))
+        bitmaps += bytes(bitmap)
+    if len(bitmaps) > 0xFFFF:
+        raise ValueError("Font bitmaps exceed 64KiB")
+    offsets += struct.pack("<H", len(bitmaps))
+    header = struct.pack(
+        "<4sBBBBHH",
+        MAGIC,
+        VERSION,
+        flags,
+        font.height(),
+        font.max_width(),
+        min_ch,
+        max_ch,
+    )
+    if remap is not None:
+        header += bytes(remap)
+    return header + widths + offsets + bitmaps
+
+
+def convert(font):
+    min_ch, max_ch, entries = glyphs(font)
+    return encode(font, min_ch, max_ch, entries)
+
+
+def main(argv):
+    out = None
+    if len(argv) > 2 and argv[-2] == "-o":
+        out = argv[-1]
+        argv = argv[:-2]
+    names = argv[1:]
+    if not names or (out and len(names) > 1):
+        print("Usage: python -m tools.font_to_bin module [module ...] [-o file]")
+        return 1
+    for name in names:
+        font = importlib.import_module(name)
+        data = convert(font)
+        path = out or name.replace(".", "/") + ".bin"
+        with open(path, "wb") as f:
+            f.write(data)
+        print("{}: {} bytes -> {}".format(name, len(data), path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,116 @@
+# png_to_icons.py Build an icon set for display/icons.py from PNG files.
+# Each file is named after its icon code, e.g. 01d.png, 10n.png for the
+# OpenWeatherMap weather[0].icon values. Dark, opaque pixels become the
+# foreground. All icons must have the same size. Needs Pillow.
+
+# Run from the repository root:
+#   python -m tools.png_to_icons icons/weather.bin path/to/01d.png ...
+# or pass a directory to take every *.png in it.
+
+# Released under the MIT license see LICENSE
+
+import os
+import struct
+import sys
+
+from display.icons import ENTRY_SIZE, MAGIC, VERSION
+
+
+def encode_rows(rows, width):
+    """Run-length encode rows of 0/1 pixels (1 = foreground)."""
+    out = bytearray()
+    for row in rows:
+        if len(row) != width:
+            raise ValueError("Row width differs from icon width")
+        fg = 0
+        col = 0
+        while col < width:
+            end = col
+            while end < width and row[end] == fg:
+                end += 1
+            run = end - col
+            while run > 255:
+                out += bytes((255, 0))
+                run -= 255
+            out.append(run)
+            col = end
+            fg ^= 1
+    return bytes(out)
+
+
+def load_png(path, threshold=128):
+    """Return (width, height, rows) of a PNG as 0/1 pixels."""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise SystemExit("Pillow is needed to read PNG files: pip install Pillow")
+    img = Image.open(path).convert("LA")
+    width, height = img.size
+    px = img.load()
+    rows = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            lum, alpha = px[x, y]
+            row.append(1 if alpha >= 128 and lum < threshold else 0)
+        rows.append(row)
+    return width, height, rows
+
+
+def build(icons):
+    """Return an icon set for icons {code: (width, height, rows)}."""
+    if not icons:
+        raise ValueError("No icons")
+    if len(icons) > 255:
+        raise ValueError("At most 255 icons per set")
+    sizes = {(w, h) for w, h, _ in icons.values()}
+    if len(sizes) != 1:
+        raise ValueError("Icons differ in size: {}".format(sorted(sizes)))
+    width, height = sizes.pop()
+    if width > 255 or height > 255:
+        raise ValueError("Icons are limited to 255x255 pixels")
+    index = bytearray()
+    data = bytearray()
+    for code in sorted(icons):
+        if len(code) != 3:
+            raise ValueError("Icon codes have three characters: {!r}".format(code))
+        runs = encode_rows(icons[code][2], width)
+        index += struct.pack("<3sHH", code.encode(), len(data), len(runs))
+        data += runs
+    if len(data) > 0xFFFF:
+        raise ValueError("Icon data exceeds 64KiB")
+    assert len(index) == ENTRY_SIZE * len(icons)
+    header = struct.pack("<4sBBBB", MAGIC, VERSION, len(icons), width, height)
+    return header + index + data
+
+
+def main(argv):
+    if len(argv) < 3:
+        print("Usage: python -m tools.png_to_icons out.bin icon.png|dir ...")
+        return 1
+    paths = []
+    for arg in argv[2:]:
+        if os.path.isdir(arg):
+            paths += sorted(
+                os.path.join(arg, n) for n in os.listdir(arg) if n.endswith(".png")
+            )
+        else:
+            paths.append(arg)
+    icons = {}
+    for path in paths:
+        code = os.path.splitext(os.path.basename(path))[0]
+        icons[code] = load_png(path)
+    data = build(icons)
+    with open(argv[1], "wb") as f:
+        f.write(data)
+    raw = sum((w + 7) // 8 * h for w, h, _ in icons.values())
+    print(
+        "{} icons, {} bytes -> {} ({} bytes as raw bitmaps)".format(
+            len(icons), len(data), argv[1], raw
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from machine import RTC
 from widgets.ntp_client import NTPClient
@@ -35,13 +36,17 @@ class Clock:
 
     def update_time(self, force=False):
         """Update system time from NTP server if update_interval has passed."""
+        return asyncio.run(self.update_time_async(force))
+
+    async def update_time_async(self, force=False):
+        """As update_time(), for running alongside other fetches."""
         current_time = time.time()
 
         if force or (current_time - self.last_update > self.update_interval):
             print("Updating time from NTP server...")
             try:
                 # Get time from NTP
-                ntp_time = self.ntp_client.get_time()
+                ntp_time = await self.ntp_client.get_time_async()
 
                 if ntp_time[0] > 2030:
                     print(f"Invalid year from NTP: {ntp_time[0]}")
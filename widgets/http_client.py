@@ -0,0 +1,486 @@
+# http_client.py Small HTTP/1.1 client on asyncio streams, shared by the
+# widgets so their requests can run concurrently. Each request has a timeout
+# and at most max_concurrent requests are in flight, which bounds the sockets
+# and buffers held at once. Responses look like urequests ones (status_code,
+# headers, text, json(), close()).
+# Connections are kept alive and pooled per host, so requests to the same
+# host (a Pi-hole login and the summary) share one TCP (and TLS) handshake,
+# and resolved addresses are reused instead of looked up for each request.
+# Bodies may be sent with Content-Length, chunked, or up to the close.
+# Passing extract=(paths) streams a 200 body through a json_stream.Extractor
+# in CHUNK byte reads instead of holding it; response.values then maps each
+# path found to its value and content is empty.
+# GET requests made with cache=True go through a ResponseCache (see below),
+# which answers from memory while a response is fresh and otherwise makes the
+# request conditional on the stored ETag / Last-Modified.
+
+# https URLs need a MicroPython build whose asyncio.open_connection() takes
+# ssl=True (1.22 and later).
+
+import asyncio
+import socket
+import ujson
+from time import ticks_diff, ticks_ms
+
+import metrics
+from widgets.json_stream import Extractor
+
+
+class Response:
+    def __init__(self, status_code, headers, content, values=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.values = values  # {path: value} from extract=, else None
+        self.cached = False  # Served from the ResponseCache
+
+    @property
+    def text(self):
+        return self.content.decode()
+
+    def json(self):
+        return ujson.loads(self.content)
+
+    def close(self):
+        pass  # The body is read by then and the connection back in the pool
+
+
+# Counting semaphore; MicroPython's asyncio has no Semaphore.
+class Limiter:
+    def __init__(self, n):
+        self.free = n
+        self._released = asyncio.Event()
+
+    async def acquire(self):
+        while self.free <= 0:
+            self._released.clear()
+            await self._released.wait()
+        self.free -= 1
+
+    def release(self):
+        self.free += 1
+        self._released.set()
+
+
+def parse_url(url):
+    """Split url into (https, host, port, path)."""
+    scheme, _, rest = url.partition("://")
+    if scheme not in ("http", "https"):
+        raise ValueError("Unsupported URL: {}".format(url))
+    https = scheme == "https"
+    host, sep, path = rest.partition("/")
+    path = sep + path if sep else "/"
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+    else:
+        port = 443 if https else 80
+    return https, host, port, path
+
+
+# A pooled connection the server closed while it sat idle.
+class _Stale(Exception):
+    pass
+
+
+def header(headers, name):
+    """Value of a response header, matched without regard to case."""
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+# Response cache. A 200 response that carries a validator (ETag or
+# Last-Modified) or a Cache-Control max-age is kept with its body or, for
+# extract= requests, just the extracted values. While max-age has not run out
+# the request is answered without touching the network (a hit); after that it
+# is sent with If-None-Match / If-Modified-Since and a 304 answer is served
+# from the cache without reading or parsing a body. no-store responses are not
+# kept and no-cache ones are always revalidated. A widget seeing
+# response.cached can keep what it built from the previous response.
+
+
+def max_age(cache_control, age=None):
+    """Seconds a response stays fresh, from its Cache-Control and Age
+    headers; None if it must not be stored."""
+    seconds = 0
+    for directive in (cache_control or "").lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "no-store":
+            return None
+        if name == "no-cache":
+            return 0
+        if name == "max-age":
+            try:
+                seconds = int(value.strip('"'))
+            except ValueError:
+                pass
+    if age:
+        try:
+            seconds -= int(age)
+        except ValueError:
+            pass
+    return max(0, seconds)
+
+
+class _Entry:
+    def __init__(self, extract, etag, modified, fresh_ms, headers, content, values):
+        self.extract = extract
+        self.etag = etag
+        self.modified = modified
+        self.stored = ticks_ms()
+        self.fresh_ms = fresh_ms
+        self.headers = headers
+        self.content = content
+        self.values = values
+
+    def fresh(self):
+        age = ticks_diff(ticks_ms(), self.stored)
+        return 0 <= age < self.fresh_ms  # Negative once ticks have wrapped
+
+    def response(self):
+        response = Response(200, self.headers, self.content, self.values)
+        response.cached = True
+        return response
+
+
+class ResponseCache:
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries  # One per URL, the widgets use two; 0 disables
+        self._entries = {}  # url: _Entry
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0  # Answered from the cache, no request
+        self.misses = 0  # Full responses fetched
+        self.not_modified = 0  # Revalidated by a 304
+
+    def stats(self):
+        return "{} hits, {} misses, {} not modified".format(
+            self.hits, self.misses, self.not_modified
+        )
+
+    def lookup(self, url, extract):
+        entry = self._entries.get(url)
+        if entry is not None and entry.extract != extract:
+            return None  # Stored for other fields
+        return entry
+
+    def conditions(self, entry):
+        """Headers that make the request conditional on entry."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.modified:
+            headers["If-Modified-Since"] = entry.modified
+        return headers
+
+    def store(self, url, extract, response):
+        """Keep response if its headers allow."""
+        headers = response.headers
+        seconds = max_age(header(headers, "Cache-Control"), header(headers, "Age"))
+        etag = header(headers, "ETag")
+        modified = header(headers, "Last-Modified")
+        if seconds is None or not (seconds or etag or modified) or not self.max_entries:
+            self._entries.pop(url, None)
+            return
+        if url not in self._entries and len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[url] = _Entry(
+            extract,
+            etag,
+            modified,
+            seconds * 1000,
+            headers,
+            response.content,
+            response.values,
+        )
+
+    def revalidated(self, entry, headers):
+        """Refresh entry from a 304's headers. Only the headers it carries are
+        updated: without Cache-Control the stored max-age still holds."""
+        cache_control = header(headers, "Cache-Control")
+        if cache_control is not None:
+            seconds = max_age(cache_control, header(headers, "Age"))
+            if seconds is not None:
+                entry.fresh_ms = seconds * 1000
+        entry.etag = header(headers, "ETag") or entry.etag
+        entry.modified = header(headers, "Last-Modified") or entry.modified
+        entry.stored = ticks_ms()
+
+    def clear(self):
+        self._entries = {}
+
+
+class HTTPClient:
+    # Idle connections older than this are closed rather than reused; most
+    # servers drop them after 5 to 75 s.
+    IDLE_MS = 30000
+    CHUNK = 256  # Bytes per read when streaming a body to an Extractor
+
+    def __init__(self, max_concurrent=2, timeout=10, keep_alive=True, cache_entries=4):
+        self.timeout = timeout  # Seconds per request, connect to last byte
+        self.keep_alive = keep_alive
+        self._limit = Limiter(max_concurrent)
+        self._idle = {}  # (host, port, https): [(reader, writer, idle since)]
+        self._addrs = {}  # (host, port): resolved address
+        self.cache = ResponseCache(cache_entries)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.timeouts = 0
+        self.connects = 0  # TCP connections opened (TLS handshakes for https)
+        self.lookups = 0  # DNS lookups
+        self.cache.reset_stats()
+
+    def stats(self):
+        fmt = "{} requests, {} connections ({} handshakes saved), {} lookups, {} timeouts; cache {}"
+        return fmt.format(
+            self.requests,
+            self.connects,
+            self.requests - self.connects,
+            self.lookups,
+            self.timeouts,
+            self.cache.stats(),
+        )
+
+    def lookup(self, host, port):
+        """Resolve host, port to an address (a DNS lookup)."""
+        return socket.getaddrinfo(host, port)[0][-1]
+
+    def resolve(self, host, port):
+        """Address for host, port; looked up once and then reused."""
+        key = (host, port)
+        addr = self._addrs.get(key)
+        if addr is None:
+            self.lookups += 1
+            addr = self.lookup(host, port)
+            self._addrs[key] = addr
+        return addr
+
+    async def request(
+        self,
+        method,
+        url,
+        data=None,
+        json=None,
+        headers=None,
+        timeout=None,
+        extract=None,
+        cache=False,
+    ):
+        """Send a request and read the whole response, or with extract (a
+        sequence of JSON paths) just those values of a 200 response. With
+        cache, a GET may be answered or revalidated from self.cache.
+
+        A request that takes longer than timeout (default self.timeout)
+        seconds is abandoned with OSError(ETIMEDOUT), like a socket timeout.
+        """
+        entry = None
+        if cache and method == "GET":
+            entry = self.cache.lookup(url, extract)
+            if entry is not None:
+                if entry.fresh():
+                    self.cache.hits += 1
+                    return entry.response()
+                headers = dict(headers) if headers else {}
+                headers.update(self.cache.conditions(entry))
+        await self._limit.acquire()
+        try:
+            self.requests += 1
+            response = await asyncio.wait_for(
+                self._request(method, url, data, json, headers, extract),
+                timeout or self.timeout,
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise OSError(110, "ETIMEDOUT: {} {}".format(method, url))
+        finally:
+            self._limit.release()
+        if cache and method == "GET":
+            if response.status_code == 304 and entry is not None:
+                self.cache.not_modified += 1
+                self.cache.revalidated(entry, response.headers)
+                return entry.response()
+            self.cache.misses += 1
+            if response.status_code == 200:
+                self.cache.store(url, extract, response)
+        return response
+
+    async def get(self, url, **kw):
+        return await self.request("GET", url, **kw)
+
+    async def post(self, url, **kw):
+        return await self.request("POST", url, **kw)
+
+    async def close(self):
+        """Close the idle connections, e.g. before turning Wi-Fi off."""
+        idle = self._idle
+        self._idle = {}
+        for conns in idle.values():
+            for _, writer, _ in conns:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except Exception:
+                    pass
+
+    async def _connect(self, https, host, port):
+        self.connects += 1
+        if https:
+            # By name, for the certificate check and SNI
+            return await asyncio.open_connection(host, port, ssl=True)
+        addr = self.resolve(host, port)
+        try:
+            return await asyncio.open_connection(addr[0], addr[1])
+        except OSError:
+            self._addrs.pop((host, port), None)  # The host may have moved
+            raise
+
+    def _take_idle(self, key):
+        conns = self._idle.get(key)
+        now = ticks_ms()
+        while conns:
+            reader, writer, since = conns.pop()
+            if ticks_diff(now, since) < self.IDLE_MS:
+                return reader, writer
+            writer.close()
+        return None
+
+    async def _request(self, method, url, data, json, headers, extract):
+        https, host, port, path = parse_url(url)
+        if json is not None:
+            data = ujson.dumps(json)
+        if isinstance(data, str):
+            data = data.encode()
+        head = "{} {} HTTP/1.1\r\nHost: {}\r\nConnection: {}\r\n".format(
+            method, path, host, "keep-alive" if self.keep_alive else "close"
+        )
+        if headers:
+            for name, value in headers.items():
+                head += "{}: {}\r\n".format(name, value)
+        if json is not None:
+            head += "Content-Type: application/json\r\n"
+        if data or method in ("POST", "PUT", "PATCH"):
+            head += "Content-Length: {}\r\n".format(len(data or b""))
+        head = (head + "\r\n").encode()
+
+        key = (host, port, https)
+        conn = self._take_idle(key) if self.keep_alive else None
+        if conn is not None:
+            try:
+                return await self._exchange(
+                    key, conn, method, head, data, extract, True
+                )
+            except _Stale:
+                pass  # Closed by the server while idle: open a new one
+        conn = await self._connect(https, host, port)
+        return await self._exchange(key, conn, method, head, data, extract, False)
+
+    async def _exchange(self, key, conn, method, head, data, extract, reused):
+        reader, writer = conn
+        keep = False
+        try:
+            try:
+                writer.write(head)
+                if data:
+                    writer.write(data)
+                await writer.drain()
+                line = await reader.readline()
+            except OSError:
+                if reused:
+                    raise _Stale()
+                raise
+            if not line:
+                if reused:
+                    raise _Stale()
+                raise OSError(-1, "Connection closed by server")
+            response, keep = await self._read_response(reader, line, method, extract)
+            return response
+        finally:
+            if keep and self.keep_alive:
+                self._idle.setdefault(key, []).append((reader, writer, ticks_ms()))
+            else:
+                writer.close()
+
+    # Read the rest of a response after its status line. Returns the
+    # response and whether the connection can carry another request.
+    async def _read_response(self, reader, line, method, extract):
+        parts = line.split(None, 2)
+        if len(parts) < 2:
+            raise OSError(-1, "Bad status line: {}".format(line))
+        version = parts[0]
+        status = int(parts[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line or line == b"\r\n":
+                break
+            name, _, value = line.decode().partition(":")
+            headers[name.strip()] = value.strip()
+
+        connection = (header(headers, "Connection") or "").lower()
+        if version == b"HTTP/1.1":
+            keep = connection != "close"
+        else:
+            keep = connection == "keep-alive"
+        length = header(headers, "Content-Length")
+        sink = Extractor(extract) if extract and status == 200 else None
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            content = b""
+        elif (header(headers, "Transfer-Encoding") or "").lower() == "chunked":
+            content = await self._read_chunked(reader, sink)
+        elif length is not None:
+            content = await self._read_length(reader, int(length), sink)
+        else:  # Body runs to the end of the connection
+            keep = False
+            content = b""
+            while True:
+                chunk = await reader.read(self.CHUNK if sink else 512)
+                if not chunk:
+                    break
+                if sink:
+                    self._feed(sink, chunk)
+                else:
+                    content += chunk
+        values = None
+        if sink:
+            with metrics.timer(metrics.PARSE):
+                values = sink.finish()
+        return Response(status, headers, content, values), keep
+
+    def _feed(self, sink, chunk):
+        with metrics.timer(metrics.PARSE):
+            sink.feed(chunk)
+
+    # Read n body bytes: all at once, or CHUNK at a time into sink.
+    async def _read_length(self, reader, n, sink):
+        if sink is None:
+            return await reader.readexactly(n)
+        while n > 0:
+            chunk = await reader.read(min(n, self.CHUNK))
+            if not chunk:
+                raise OSError(-1, "Connection closed in body")
+            self._feed(sink, chunk)
+            n -= len(chunk)
+        return b""
+
+    async def _read_chunked(self, reader, sink):
+        content = b""
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise OSError(-1, "Connection closed in chunked body")
+            size = int(line.split(b";")[0].strip().decode(), 16)
+            if size == 0:
+                break
+            content += await self._read_length(reader, size, sink)
+            await reader.readline()  # CRLF after the chunk
+        while True:  # Trailers, if any, end with an empty line
+            line = await reader.readline()
+            if not line or line == b"\r\n":
+                break
+        return content
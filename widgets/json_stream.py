@@ -0,0 +1,194 @@
+# json_stream.py Streaming JSON field extractor. The widgets only use a few
+# values from each API response, so rather than read the whole body and
+# ujson.loads() it into dicts and lists, the HTTP client feeds the body to an
+# Extractor a chunk at a time as it comes off the socket:
+#   ex = Extractor((("main", "temp"), ("weather", 0, "icon")))
+#   ex.feed(chunk)  # Any split, even mid-token
+#   ex.finish()
+#   ex.values  # {("main", "temp"): 14.6, ("weather", 0, "icon"): "10d"}
+# A path is a tuple of object keys and array indices naming a string, number,
+# true, false or null; paths that are absent from the document are absent from
+# values. Containers on the way to a wanted path are walked, everything else
+# is scanned past without building anything, so the heap used is a chunk plus
+# the wanted values whatever the size of the document.
+# nest(values) turns the result back into the nested dicts and lists that
+# ujson.loads() would have returned, pruned to the wanted paths.
+
+import ujson
+from micropython import const
+
+_QUOTE = const(0x22)
+_OPEN_OBJ = const(0x7B)
+_CLOSE_OBJ = const(0x7D)
+_OPEN_ARR = const(0x5B)
+_CLOSE_ARR = const(0x5D)
+_COLON = const(0x3A)
+_COMMA = const(0x2C)
+_SPACE = b" \t\r\n"
+
+
+class Extractor:
+    def __init__(self, paths):
+        self.values = {}
+        self._leaves = set()
+        self._prefixes = set()  # Containers on the way to a leaf
+        for path in paths:
+            path = tuple(path)
+            self._leaves.add(path)
+            for n in range(len(path)):
+                self._prefixes.add(path[:n])
+        self._path = []  # Key or index of each open container being walked
+        self._arrays = []  # Whether each of them is an array
+        self._key = False  # The next string is an object key
+        self._skip = 0  # Depth within a container nobody wants
+        self._str = 0  # 1 in a string, 2 just after a backslash in one
+        self._scalar = False  # In a number, true, false or null
+        self._tok = None  # bytearray collecting a wanted token, or None
+
+    def feed(self, buf):
+        i = 0
+        n = len(buf)
+        while i < n:
+            if self._str:
+                i = self._string(buf, i, n)
+                continue
+            c = buf[i]
+            i += 1
+            if self._skip:
+                if c == _QUOTE:
+                    self._str = 1
+                elif c == _OPEN_OBJ or c == _OPEN_ARR:
+                    self._skip += 1
+                elif c == _CLOSE_OBJ or c == _CLOSE_ARR:
+                    self._skip -= 1
+                continue
+            if self._scalar:
+                if c in _SPACE or c == _COMMA or c == _CLOSE_OBJ or c == _CLOSE_ARR:
+                    self._end_scalar()
+                else:
+                    if self._tok is not None:
+                        self._tok.append(c)
+                    continue
+            if c in _SPACE or c == _COLON:
+                continue
+            if c == _COMMA:
+                if self._arrays[-1]:
+                    self._path[-1] += 1
+                else:
+                    self._key = True
+            elif c == _CLOSE_OBJ or c == _CLOSE_ARR:
+                self._path.pop()
+                self._arrays.pop()
+                self._key = False
+            elif c == _QUOTE:
+                self._str = 1
+                if self._key or tuple(self._path) in self._leaves:
+                    self._tok = bytearray()
+            elif c == _OPEN_OBJ or c == _OPEN_ARR:
+                if tuple(self._path) in self._prefixes:
+                    is_array = c == _OPEN_ARR
+                    self._path.append(0 if is_array else None)
+                    self._arrays.append(is_array)
+                    self._key = not is_array
+                else:
+                    self._skip = 1
+            else:
+                self._scalar = True
+                if tuple(self._path) in self._leaves:
+                    self._tok = bytearray((c,))
+
+    def finish(self):
+        """Complete a document that ends in a bare number."""
+        if self._scalar:
+            self._end_scalar()
+        return self.values
+
+    # Scan string contents from buf[i]; returns where scanning stopped.
+    def _string(self, buf, i, n):
+        tok = self._tok
+        if self._str == 2:  # The character after a backslash
+            if tok is not None:
+                tok.append(buf[i])
+            self._str = 1
+            return i + 1
+        end = buf.find(b'"', i)
+        esc = buf.find(b"\\", i, n if end < 0 else end)
+        if esc >= 0:
+            if tok is not None:
+                tok.extend(buf[i : esc + 1])
+            self._str = 2
+            return esc + 1
+        if end < 0:
+            if tok is not None:
+                tok.extend(buf[i:])
+            return n
+        if tok is not None:
+            tok.extend(buf[i:end])
+        self._str = 0
+        self._end_string()
+        return end + 1
+
+    def _end_string(self):
+        tok = self._tok
+        self._tok = None
+        if self._skip:
+            return
+        if self._key:
+            self._key = False
+            self._path[-1] = _decode(tok)
+        elif tok is not None:
+            self.values[tuple(self._path)] = _decode(tok)
+
+    def _end_scalar(self):
+        tok = self._tok
+        self._tok = None
+        self._scalar = False
+        if tok is None:
+            return
+        if tok == b"true":
+            value = True
+        elif tok == b"false":
+            value = False
+        elif tok == b"null":
+            value = None
+        elif b"." in tok or b"e" in tok or b"E" in tok:
+            value = float(str(tok, "ascii"))
+        else:
+            value = int(str(tok, "ascii"))
+        self.values[tuple(self._path)] = value
+
+
+def _decode(tok):
+    if b"\\" in tok:
+        return ujson.loads(b'"' + tok + b'"')
+    return str(tok, "utf-8")
+
+
+def extract(data, paths, chunk=256):
+    """Values at paths in the JSON document data (bytes), fed chunk bytes at
+    a time."""
+    ex = Extractor(paths)
+    for i in range(0, len(data), chunk):
+        ex.feed(data[i : i + chunk])
+    return ex.finish()
+
+
+def nest(values):
+    """Rebuild nested dicts and lists from extracted {path: value}."""
+    root = {}
+    for path, value in values.items():
+        node = root
+        for n, key in enumerate(path):
+            if n == len(path) - 1:
+                child = value
+            else:
+                child = [] if isinstance(path[n + 1], int) else {}
+            if isinstance(key, int):
+                while len(node) <= key:
+                    node.append(None)
+                if node[key] is None:
+                    node[key] = child
+            elif key not in node:
+                node[key] = child
+            node = node[key]
+    return root
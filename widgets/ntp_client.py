@@ -1,11 +1,16 @@
+import asyncio
 import socket
 import struct
 import time
 
 
 class NTPClient:
-    def __init__(self, host="pool.ntp.org", timezone_offset=0):
+    POLL_S = 0.02  # Interval between checks for the reply
+
+    def __init__(self, host="pool.ntp.org", timezone_offset=0, port=123, timeout=5):
         self.host = host
+        self.port = port
+        self.timeout = timeout  # Seconds to wait for each server
         self.timezone_offset = timezone_offset  # Offset in hours
         # NTP constants
         self.NTP_PACKET_FORMAT = "!12I"
@@ -23,85 +28,63 @@ class NTPClient:
 
         return packet
 
-    def get_time(self):
-        """Query NTP server and return local timestamp."""
-        # Try primary host first
-        try:
-            # Create NTP packet
-            packet = self._create_ntp_packet()
-
-            # Create UDP socket and set timeout
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(5)
-
-            # Get IP address of the NTP server and send packet
-            try:
-                addr = socket.getaddrinfo(self.host, 123)[0][-1]
-                sock.sendto(packet, addr)
+    def _decode(self, msg):
+        """Local time tuple from an NTP reply."""
+        unpacked = struct.unpack(self.NTP_PACKET_FORMAT, msg[0:48])
 
-                # Receive response
-                msg = sock.recv(48)
-                sock.close()
+        # The timestamp starts at the 10th word, contains seconds
+        # since 1900-01-01
+        ntp_time = unpacked[10]
 
-                # Extract time value from packet
-                unpacked = struct.unpack(self.NTP_PACKET_FORMAT, msg[0:48])
+        # Convert to unix time (seconds since 1970-01-01)
+        unix_time = ntp_time - self.NTP_DELTA
 
-                # The timestamp starts at the 10th word, contains seconds
-                # since 1900-01-01
-                ntp_time = unpacked[10]
+        # Apply timezone offset
+        unix_time += int(self.timezone_offset * 3600)
 
-                # Convert to unix time (seconds since 1970-01-01)
-                unix_time = ntp_time - self.NTP_DELTA
+        # Get time tuple
+        time_tuple = time.localtime(unix_time)
 
-                # Apply timezone offset
-                unix_time += int(self.timezone_offset * 3600)
+        if time_tuple[0] > 2030:
+            corrected_time = list(time_tuple)
+            corrected_time[0] = 2025  # Set to current year
+            return tuple(corrected_time)
 
-                # Get time tuple
-                time_tuple = time.localtime(unix_time)
+        return time_tuple
 
-                if time_tuple[0] > 2030:
-                    corrected_time = list(time_tuple)
-                    corrected_time[0] = 2025  # Set to current year
-                    return tuple(corrected_time)
+    async def _query_async(self, host):
+        """Send one request to host and wait for the reply without blocking."""
+        addr = socket.getaddrinfo(host, self.port)[0][-1]
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setblocking(False)
+            sock.sendto(self._create_ntp_packet(), addr)
+            start = time.ticks_ms()
+            while True:
+                try:
+                    return sock.recv(48)
+                except OSError:  # Nothing received yet
+                    if time.ticks_diff(time.ticks_ms(), start) > self.timeout * 1000:
+                        raise OSError(110, "ETIMEDOUT")
+                await asyncio.sleep(self.POLL_S)
+        finally:
+            sock.close()
 
-                return time_tuple
+    def get_time(self):
+        """Query NTP server and return local timestamp."""
+        return asyncio.run(self.get_time_async())
 
+    async def get_time_async(self):
+        """As get_time(), for running alongside other fetches."""
+        # Try primary host first, then the backup servers
+        for host in [self.host] + self.backup_hosts:
+            try:
+                if host != self.host:
+                    print(f"Trying backup NTP server: {host}")
+                return self._decode(await self._query_async(host))
             except Exception as e:
-                print(f"NTP error with primary server: {e}")
-                # If primary fails, try backup servers
-                sock.close()
-                for backup_host in self.backup_hosts:
-                    try:
-                        print(f"Trying backup NTP server: {backup_host}")
-                        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                        sock.settimeout(5)
-                        addr = socket.getaddrinfo(backup_host, 123)[0][-1]
-                        sock.sendto(packet, addr)
-                        msg = sock.recv(48)
-                        sock.close()
-
-                        unpacked = struct.unpack(self.NTP_PACKET_FORMAT, msg[0:48])
-                        ntp_time = unpacked[10]
-                        unix_time = ntp_time - self.NTP_DELTA
-                        unix_time += int(self.timezone_offset * 3600)
-
-                        time_tuple = time.localtime(unix_time)
-                        # Same verification for backup servers
-                        if time_tuple[0] > 2030:
-                            corrected_time = list(time_tuple)
-                            corrected_time[0] = 2025
-                            return tuple(corrected_time)
-
-                        return time_tuple
-                    except Exception as e:
-                        print(f"Backup server error: {e}")
-                        sock.close()
-                        continue
-
-                # If all servers fail, return system time
-                print("All NTP servers failed, using system time")
-                return time.localtime()
-
-        except Exception as e:
-            print(f"Error getting NTP time: {e}")
-            return time.localtime()
+                print(f"NTP error with {host}: {e}")
+
+        # If all servers fail, return system time
+        print("All NTP servers failed, using system time")
+        return time.localtime()
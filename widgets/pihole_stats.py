@@ -1,11 +1,39 @@
-import urequests
-import ujson
+import asyncio
 import time
+import ujson
+from widgets.http_client import HTTPClient
+from widgets.json_stream import nest
 
 
 class PiholeStats:
-    def __init__(self, pihole_ip, password=None, api_token=None, update_interval=7200):
+    # The fields read from each response; the rest is skipped while streaming
+    AUTH_FIELDS = (
+        ("session", "valid"),
+        ("session", "sid"),
+        ("session", "csrf"),
+        ("session", "validity"),
+    )
+    STATS_FIELDS = (
+        ("queries", "total"),
+        ("queries", "blocked"),
+        ("dns", "queries"),  # Older v6 betas
+        ("dns", "blocked"),
+        ("status",),  # A string in v5, {"state": ...} in some builds
+        ("status", "state"),
+        ("core", "status"),
+    )
+
+    def __init__(
+        self,
+        pihole_ip,
+        password=None,
+        api_token=None,
+        update_interval=7200,
+        http=None,
+        session_file=None,
+    ):
         self.pihole_ip = pihole_ip
+        self.http = http or HTTPClient()
         self.password = password
         self.api_token = api_token
         self.update_interval = update_interval
@@ -14,15 +42,28 @@ class PiholeStats:
         self.summary_endpoint = "/stats/summary"
         self.logout_endpoint = "/logout"
 
+        # The session is kept between updates rather than logged out, so an
+        # update is one request. Every authenticated request extends it by
+        # session_validity seconds; between updates it is renewed with a
+        # GET /auth (no password check) once it is within renew_margin of
+        # expiring, which must exceed the caller's update period. A renewal
+        # is only made if it lasts until the next update: when the session
+        # timeout is shorter than update_interval it would take several, and
+        # logging in again at the update costs one request.
         self.session_sid = None
         self.csrf_token = None
+        self.session_validity = 1800  # Pi-hole's default webserver.session.timeout
+        self.session_expires = 0
+        self.renew_margin = 600
+        self.session_file = session_file  # Keeps the session over soft resets
         self.last_update = 0
         self.stats_data = None
         self.auth_failed = False
 
         # Rate limiting protection
         self.request_times = []
-        self.max_requests_per_minute = 1  # Maximum allowed requests per minute
+        # A stale session costs three requests: summary (401), auth, summary
+        self.max_requests_per_minute = 3  # Maximum allowed requests per minute
         self.rate_limit_window = 60  # Window in seconds for rate limiting
         self.rate_limited_until = 0  # Timestamp until rate limiting expires
 
@@ -31,6 +72,8 @@ class PiholeStats:
         self.base_retry_delay = 5  # Base delay in seconds
         self.cached_stats = None
 
+        self._load_session()
+
     def _is_rate_limited(self):
         """Check if we should avoid making requests due to rate limiting"""
         # If we're in a rate limited state
@@ -58,8 +101,116 @@ class PiholeStats:
         """Record a request timestamp for rate limiting"""
         self.request_times.append(time.time())
 
+    def _session_headers(self):
+        headers = {"X-FTL-SID": self.session_sid}
+        if self.csrf_token:
+            headers["X-FTL-CSRF"] = self.csrf_token
+        return headers
+
+    def _touch_session(self):
+        """Note the session was used just now, which extends it."""
+        self.session_expires = time.time() + self.session_validity
+        self._save_session()
+
+    def _drop_session(self):
+        self.session_sid = None
+        self.csrf_token = None
+        self.session_expires = 0
+        self._save_session()
+
+    def _load_session(self):
+        """Resume a session saved before a soft reset, if it is still valid."""
+        if not self.session_file:
+            return
+        try:
+            with open(self.session_file) as f:
+                saved = ujson.load(f)
+        except (OSError, ValueError):
+            return
+        if (
+            saved.get("ip") == self.pihole_ip
+            and saved.get("sid")
+            and saved.get("expires", 0) > time.time()
+        ):
+            self.session_sid = saved["sid"]
+            self.csrf_token = saved.get("csrf")
+            self.session_validity = saved.get("validity", self.session_validity)
+            self.session_expires = saved["expires"]
+            print("Resuming saved Pi-hole session")
+
+    def _save_session(self):
+        if not self.session_file:
+            return
+        saved = {
+            "ip": self.pihole_ip,
+            "sid": self.session_sid,
+            "csrf": self.csrf_token,
+            "validity": self.session_validity,
+            "expires": self.session_expires,
+        }
+        try:
+            with open(self.session_file, "w") as f:
+                ujson.dump(saved, f)
+        except OSError as e:
+            print(f"Error saving Pi-hole session: {e}")
+
+    def _session_expiring(self):
+        return (
+            self.session_sid and self.session_expires - time.time() < self.renew_margin
+        )
+
+    def _renewal_pays(self):
+        """True if the session is expiring, still alive and, renewed now,
+        lasts until the next update. That update may come up to one caller
+        period after update_interval, which renew_margin covers."""
+        now = time.time()
+        next_update = self.last_update + self.update_interval + self.renew_margin
+        return (
+            self._session_expiring()
+            and now < self.session_expires
+            and now + self.session_validity >= next_update
+        )
+
+    def renew_session(self):
+        return asyncio.run(self.renew_session_async())
+
+    async def renew_session_async(self):
+        """Extend the session with GET /auth, which checks the SID rather
+        than hashing the password. A session Pi-hole no longer knows (401)
+        is dropped, so the next update authenticates; on other errors it is
+        kept and the renewal retried next time."""
+        if not self.session_sid or self._is_rate_limited():
+            return False
+        try:
+            self._track_request()
+            response = await self.http.get(
+                self.base_url + self.auth_endpoint,
+                headers=self._session_headers(),
+                extract=self.AUTH_FIELDS,
+            )
+            response.close()
+        except Exception as e:
+            print(f"Error renewing Pi-hole session: {e}")
+            return False
+        values = response.values
+        if response.status_code == 200 and values.get(("session", "valid")):
+            self.session_validity = values.get(
+                ("session", "validity"), self.session_validity
+            )
+            self._touch_session()
+            print("Pi-hole session renewed")
+            return True
+        print(f"Pi-hole session not renewed: {response.status_code}")
+        # A 200 with session.valid false is a forgotten session too
+        if response.status_code in (200, 401):
+            self._drop_session()
+        return False
+
     def authenticate(self):
         """Authenticate with Pi-hole API"""
+        return asyncio.run(self.authenticate_async())
+
+    async def authenticate_async(self):
         if self._is_rate_limited():
             print("Rate limited. Skipping authentication")
             return False
@@ -82,7 +233,12 @@ class PiholeStats:
                 auth_payload = {"password": self.password}
                 headers = {"Content-Type": "application/json"}
 
-                response = urequests.post(auth_url, json=auth_payload, headers=headers)
+                response = await self.http.post(
+                    auth_url,
+                    json=auth_payload,
+                    headers=headers,
+                    extract=self.AUTH_FIELDS,
+                )
                 print(f"Auth response status: {response.status_code}")
 
                 # Handle rate limiting specifically
@@ -104,10 +260,14 @@ class PiholeStats:
 
                 if response.status_code == 200:
                     try:
-                        auth_data = ujson.loads(response.text)
+                        auth_data = nest(response.values)
                         if auth_data.get("session") and auth_data["session"].get("sid"):
                             self.session_sid = auth_data["session"]["sid"]
                             self.csrf_token = auth_data["session"].get("csrf")
+                            self.session_validity = auth_data["session"].get(
+                                "validity", self.session_validity
+                            )
+                            self._touch_session()
                             print("Authentication successful. SID obtained.")
                             response.close()
                             return True
@@ -128,7 +288,7 @@ class PiholeStats:
                     print(
                         f"Retrying authentication in {retry_delay} seconds... (Attempt {attempt+1}/{self.max_retries})"
                     )
-                    time.sleep(retry_delay)
+                    await asyncio.sleep(retry_delay)
 
             except Exception as e:
                 print(
@@ -136,12 +296,15 @@ class PiholeStats:
                 )
                 if attempt < self.max_retries - 1:
                     retry_delay = self.base_retry_delay * (2**attempt)
-                    time.sleep(retry_delay)
+                    await asyncio.sleep(retry_delay)
 
         self.auth_failed = True
         return False
 
     def logout(self):
+        return asyncio.run(self.logout_async())
+
+    async def logout_async(self):
         # Skip logout if using API token
         if self.api_token and not self.session_sid:
             return
@@ -149,8 +312,7 @@ class PiholeStats:
         if self.session_sid:
             if self._is_rate_limited():
                 print("Rate limited. Skipping logout")
-                self.session_sid = None  # Just clear it locally
-                self.csrf_token = None
+                self._drop_session()  # Just clear it locally
                 return
 
             try:
@@ -158,20 +320,20 @@ class PiholeStats:
                 self._track_request()
 
                 logout_url = self.base_url + self.logout_endpoint
-                headers = {
-                    "X-FTL-SID": self.session_sid,
-                    "X-FTL-CSRF": self.csrf_token,
-                }
-                response = urequests.post(logout_url, headers=headers)
+                response = await self.http.post(
+                    logout_url, headers=self._session_headers()
+                )
                 response.close()
                 print("Logged out from Pi-hole session.")
             except Exception as e:
                 print(f"Error during logout: {e}")
 
-            self.session_sid = None
-            self.csrf_token = None
+            self._drop_session()
 
     def update_stats(self, force=False):
+        return asyncio.run(self.update_stats_async(force))
+
+    async def update_stats_async(self, force=False):
         current_time = time.time()
 
         # Check rate limiting
@@ -194,13 +356,23 @@ class PiholeStats:
             print(
                 f"Skipping update. Only {int(time_since_update)}s since last update (min: {int(self.update_interval * 0.5)}s)"
             )
+            if self._renewal_pays():
+                await self.renew_session_async()
             return True
 
         if force or time_since_update > self.update_interval:
             print("Updating Pi-hole stats...")
 
+            if self.session_sid and current_time >= self.session_expires:
+                print("Pi-hole session expired")
+                self._drop_session()
+
             # Only authenticate if needed and not using token
-            if not self.api_token and not self.session_sid and not self.authenticate():
+            if (
+                not self.api_token
+                and not self.session_sid
+                and not await self.authenticate_async()
+            ):
                 return False
 
             for attempt in range(self.max_retries):
@@ -221,12 +393,12 @@ class PiholeStats:
 
                     # Otherwise use session-based auth
                     elif self.session_sid:
-                        headers["X-FTL-SID"] = self.session_sid
-                        if self.csrf_token:
-                            headers["X-FTL-CSRF"] = self.csrf_token
+                        headers = self._session_headers()
 
                     print(f"Requesting from: {summary_url}")
-                    response = urequests.get(summary_url, headers=headers)
+                    response = await self.http.get(
+                        summary_url, headers=headers, extract=self.STATS_FIELDS
+                    )
 
                     # Handle rate limiting error
                     if response.status_code == 429:
@@ -252,10 +424,8 @@ class PiholeStats:
                     if response.status_code == 200:
                         try:
                             print("Received valid response from Pi-hole API")
-                            response_text = response.text
-                            print(f"Response content length: {len(response_text)}")
-                            new_stats = ujson.loads(response_text)
-                            print("Successfully parsed JSON response")
+                            new_stats = nest(response.values)
+                            print(f"Extracted {len(response.values)} fields")
 
                             if self._validate_stats_data(new_stats):
                                 self.stats_data = new_stats
@@ -263,9 +433,9 @@ class PiholeStats:
                                 self.last_update = current_time
                                 print("Pi-hole stats updated successfully")
                                 response.close()
-                                # Don't logout if using API token
-                                if not self.api_token:
-                                    self.logout()  # free session after success
+                                # Keep the session for the next update
+                                if self.session_sid:
+                                    self._touch_session()
                                 return True
                             else:
                                 print("Invalid stats data structure received")
@@ -281,9 +451,8 @@ class PiholeStats:
                     elif response.status_code == 401:
                         print("Session expired, re-authenticating...")
                         response.close()
-                        self.session_sid = None
-                        self.csrf_token = None
-                        if not self.api_token and not self.authenticate():
+                        self._drop_session()
+                        if not self.api_token and not await self.authenticate_async():
                             break
                         else:
                             continue
@@ -298,7 +467,7 @@ class PiholeStats:
                         print(
                             f"Retrying stats update in {retry_delay} seconds... (Attempt {attempt+1}/{self.max_retries})"
                         )
-                        time.sleep(retry_delay)
+                        await asyncio.sleep(retry_delay)
                     else:
                         if self.cached_stats:
                             print("Using cached stats after all retries failed")
@@ -311,10 +480,12 @@ class PiholeStats:
                     )
                     if attempt < self.max_retries - 1:
                         retry_delay = self.base_retry_delay * (2**attempt)
-                        time.sleep(retry_delay)
+                        await asyncio.sleep(retry_delay)
 
             return False
 
+        if self._renewal_pays():
+            await self.renew_session_async()
         return True
 
     def _validate_stats_data(self, data):
@@ -334,8 +505,8 @@ class PiholeStats:
             print("Detected Pi-hole data structure with direct queries object")
             return True
 
-        # Pi-hole v6 structure
-        if "gravity" in data and "dns" in data:
+        # Pi-hole v6 structure (gravity is not extracted, dns is enough)
+        if "dns" in data:
             print("Detected Pi-hole v6 data structure")
             has_queries = (
                 isinstance(data.get("dns"), dict)
@@ -1,29 +1,48 @@
-import urequests
-import ujson
+import asyncio
 import time
+from widgets.http_client import HTTPClient
+from widgets.json_stream import nest
 
 
 class WeatherAPI:
-    def __init__(self, api_key, city_id, update_interval=3600):
+    # The fields the getters read; the rest of the response is skipped
+    FIELDS = (
+        ("name",),
+        ("sys", "country"),
+        ("weather", 0, "icon"),
+        ("main", "temp"),
+        ("main", "humidity"),
+        ("rain", "1h"),
+        ("rain", "3h"),
+    )
+
+    def __init__(self, api_key, city_id, update_interval=3600, http=None):
         self.api_key = api_key
         self.city_id = city_id
         self.update_interval = update_interval
+        self.http = http or HTTPClient()
         self.last_update = 0
         self.weather_data = None
 
     def update_weather(self, force=False):
         """Fetch weather data from OpenWeatherMap API."""
+        return asyncio.run(self.update_weather_async(force))
+
+    async def update_weather_async(self, force=False):
+        """As update_weather(), for running alongside other fetches."""
         current_time = time.time()
 
         if force or (current_time - self.last_update) > self.update_interval:
             print("Updating weather data...")
             try:
                 url = f"http://api.openweathermap.org/data/2.5/weather?id={self.city_id}&appid={self.api_key}&units=metric"
-                # Add timeout to prevent hanging indefinitely
-                response = urequests.get(url, timeout=10)
+                # Times out after self.http.timeout seconds; fresh or
+                # unchanged (304) responses come from the cache
+                response = await self.http.get(url, extract=self.FIELDS, cache=True)
 
                 if response.status_code == 200:
-                    self.weather_data = ujson.loads(response.text)
+                    if not (response.cached and self.weather_data):
+                        self.weather_data = nest(response.values)
                     self.last_update = current_time
                     print("Weather data updated successfully")
                 else:
@@ -49,6 +68,12 @@ class WeatherAPI:
             return f"{city},{country}"
         return "Location Unknown"
 
+    def get_icon_code(self):
+        """Get the OpenWeatherMap icon code, e.g. "10d" for day rain."""
+        if self.weather_data and self.weather_data.get("weather"):
+            return self.weather_data["weather"][0].get("icon")
+        return None
+
     def get_temperature(self):
         """Get current temperature in Celsius."""
         if (
@@ -1,15 +1,18 @@
-import urequests
+import asyncio
 import ujson
 import time
+import metrics
 import config
 import network
 import sys
+from widgets.http_client import HTTPClient
 
 
 class WebsiteStats:
-    def __init__(self, api_url, update_interval=3600):
+    def __init__(self, api_url, update_interval=3600, http=None):
         self.api_url = api_url
         self.update_interval = update_interval
+        self.http = http or HTTPClient()
         self.last_update = 0
         self.root_views = None
         self.total_views = None
@@ -50,81 +53,100 @@ class WebsiteStats:
         else:
             print("WiFi not connected")
 
+    def _due(self, force):
+        return force or (time.time() - self.last_update) > self.update_interval
+
     def update_views(self, force=False):
-        """Fetch website statistics and extract total views."""
-        current_time = time.time()
-        if force or (current_time - self.last_update) > self.update_interval:
-            print("Updating website views...")
+        """Connect, fetch website statistics and extract total views, then
+        disconnect to turn the radio off."""
+        if self._due(force):
             try:
                 if not self.connect_wifi():
                     print("Failed to connect to WiFi")
                     return False
-
+                return asyncio.run(self.update_views_async(force))
+            finally:
                 try:
-                    print(f"Fetching from URL: {self.api_url}")
-                    # Add timeout to prevent hanging indefinitely
-                    response = urequests.get(self.api_url, timeout=10)
-                    print(f"Initial response status code: {response.status_code}")
-
-                    # If got a redirect (301 or 302), try with trailing slash
-                    if response.status_code in (301, 302):
-                        print(
-                            f"Got redirect {response.status_code}, trying with trailing slash"
-                        )
-                        response.close()
-
-                        # Ensure URL ends with trailing slash
-                        url_with_slash = self.api_url
-                        if not url_with_slash.endswith("/"):
-                            url_with_slash += "/"
-
-                        print(f"New URL: {url_with_slash}")
-                        response = urequests.get(url_with_slash, timeout=10)
-                        print(f"Second response status code: {response.status_code}")
-
-                    if response.status_code == 200:
-                        text = response.text
-                        print(f"Response text: {text}")
+                    self.disconnect_wifi()
+                except:
+                    pass
+
+        return True
+
+    async def update_views_async(self, force=False):
+        """Fetch website statistics over an existing connection. Wi-Fi is up
+        to the caller, as other fetches may share it."""
+        current_time = time.time()
+        if self._due(force):
+            print("Updating website views...")
+            try:
+                print(f"Fetching from URL: {self.api_url}")
+                # Times out after self.http.timeout seconds; fresh or
+                # unchanged (304) responses come from the cache
+                response = await self.http.get(self.api_url, cache=True)
+                print(f"Initial response status code: {response.status_code}")
+
+                # If got a redirect (301 or 302), try with trailing slash
+                if response.status_code in (301, 302):
+                    print(
+                        f"Got redirect {response.status_code}, trying with trailing slash"
+                    )
+                    response.close()
+
+                    # Ensure URL ends with trailing slash
+                    url_with_slash = self.api_url
+                    if not url_with_slash.endswith("/"):
+                        url_with_slash += "/"
+
+                    print(f"New URL: {url_with_slash}")
+                    response = await self.http.get(url_with_slash, cache=True)
+                    print(f"Second response status code: {response.status_code}")
+
+                if (
+                    response.status_code == 200
+                    and response.cached
+                    and self.root_views is not None
+                ):
+                    print("Website views unchanged")
+                    self.last_update = current_time
+                elif response.status_code == 200:
+                    text = response.text
+                    print(f"Response text: {text}")
+                    with metrics.timer(metrics.PARSE):
                         data = ujson.loads(text)
-                        print(f"Parsed data: {data}")
-
-                        # Update this part to handle new structure
-                        if "pages" in data:
-                            # New structured format
-                            for page in data["pages"]:
-                                if page["path"] == "/":
-                                    self.root_views = page["count"]
-                                    break
-                            else:
-                                # If root page not found in pages list
-                                self.root_views = 0
+                    print(f"Parsed data: {data}")
+
+                    # Update this part to handle new structure
+                    if "pages" in data:
+                        # New structured format
+                        for page in data["pages"]:
+                            if page["path"] == "/":
+                                self.root_views = page["count"]
+                                break
                         else:
-                            # Old format (fallback)
-                            self.root_views = data.get("/", 0)
-
-                        self.last_update = current_time
-                        print("Website views updated successfully")
-                        print("Root page views:", self.root_views)
+                            # If root page not found in pages list
+                            self.root_views = 0
                     else:
-                        print(f"Error fetching website stats: {response.status_code}")
+                        # Old format (fallback)
+                        self.root_views = data.get("/", 0)
 
-                    response.close()
-                    return True
+                    self.last_update = current_time
+                    print("Website views updated successfully")
+                    print("Root page views:", self.root_views)
+                else:
+                    print(f"Error fetching website stats: {response.status_code}")
 
-                except OSError as e:
-                    print(f"Network error updating website stats: {e}")
-                    sys.print_exception(e)
-                    return False
-                except Exception as e:
-                    print(f"Error updating website stats: {e}")
-                    sys.print_exception(e)
-                    return False
+                response.close()
+                return True
 
-            finally:
-                try:
-                    self.disconnect_wifi()
-                except:
-                    pass
+            except OSError as e:
+                print(f"Network error updating website stats: {e}")
+                sys.print_exception(e)
+                return False
+            except Exception as e:
+                print(f"Error updating website stats: {e}")
+                sys.print_exception(e)
+                return False
 
         return True
 